@@ -91,8 +91,21 @@ def run_migrations_online() -> None:
     )
 
     with connectable.connect() as connection:
+        if connection.dialect.name == "postgresql":
+            # A DDL statement waiting for its lock blocks every write queued
+            # behind it, so fail fast and let scripts/deploy.py retry.
+            # Index builds and backfills may run for a long time.
+            connection.exec_driver_sql(f"SET lock_timeout = {int(settings.MIGRATION_LOCK_TIMEOUT_MS)}")
+            connection.exec_driver_sql("SET statement_timeout = 0")
+            connection.commit()
+
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection,
+            target_metadata=target_metadata,
+            # Commit each revision on its own, so a retried or interrupted
+            # deploy keeps the ones that finished (and concurrent index
+            # builds can step outside the transaction)
+            transaction_per_migration=True,
         )
 
         with context.begin_transaction():
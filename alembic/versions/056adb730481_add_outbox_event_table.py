@@ -0,0 +1,41 @@
+"""Add outbox event table
+
+Revision ID: 056adb730481
+Revises: 6ff09a43503e
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '056adb730481'
+down_revision = '6ff09a43503e'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('outboxevent',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('aggregate_type', sa.String(), nullable=False),
+    sa.Column('aggregate_id', sa.String(), nullable=False),
+    sa.Column('event_type', sa.String(), nullable=False),
+    sa.Column('payload', sa.JSON(), nullable=True),
+    sa.Column('attempts', sa.Integer(), nullable=True),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('processed_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_outboxevent_id'), 'outboxevent', ['id'], unique=False)
+    op.create_index('ix_outboxevent_pending', 'outboxevent', ['created_at'], unique=False,
+                    postgresql_where=sa.text('processed_at IS NULL'),
+                    sqlite_where=sa.text('processed_at IS NULL'))
+
+
+def downgrade() -> None:
+    op.drop_index('ix_outboxevent_pending', table_name='outboxevent')
+    op.drop_index(op.f('ix_outboxevent_id'), table_name='outboxevent')
+    op.drop_table('outboxevent')
@@ -0,0 +1,31 @@
+"""Add product recommendation table
+
+Revision ID: 11696cc560ef
+Revises: e089f6a118e3
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '11696cc560ef'
+down_revision = 'e089f6a118e3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('productrecommendation',
+    sa.Column('product_id', sa.String(), nullable=False),
+    sa.Column('related_product_ids', sa.JSON(), nullable=False),
+    sa.Column('scores', sa.JSON(), nullable=False),
+    sa.Column('computed_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['product_id'], ['product.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('product_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('productrecommendation')
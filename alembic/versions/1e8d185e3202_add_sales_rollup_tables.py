@@ -0,0 +1,50 @@
+"""Add sales rollup tables
+
+Revision ID: 1e8d185e3202
+Revises: 827b60ee32a7
+Create Date: 2026-10-19 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '1e8d185e3202'
+down_revision = '827b60ee32a7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('salesdaily',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('order_count', sa.Integer(), nullable=False),
+    sa.Column('items_sold', sa.Integer(), nullable=False),
+    sa.Column('revenue', sa.Float(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('day')
+    )
+    op.create_table('saleshourly',
+    sa.Column('hour', sa.DateTime(), nullable=False),
+    sa.Column('order_count', sa.Integer(), nullable=False),
+    sa.Column('items_sold', sa.Integer(), nullable=False),
+    sa.Column('revenue', sa.Float(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('hour')
+    )
+    op.create_table('productsalesdaily',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('product_id', sa.String(), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('revenue', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['product_id'], ['product.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('day', 'product_id')
+    )
+    # Backfill with scripts/backfill_sales_rollups.py
+
+
+def downgrade() -> None:
+    op.drop_table('productsalesdaily')
+    op.drop_table('saleshourly')
+    op.drop_table('salesdaily')
@@ -0,0 +1,40 @@
+"""Add unique constraint on cart item user and product
+
+Revision ID: 2614b07447f2
+Revises: 41b5d17274ca
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2614b07447f2'
+down_revision = '41b5d17274ca'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Merge duplicate lines into the first one before enforcing uniqueness
+    op.execute(
+        "UPDATE cartitem SET quantity = ("
+        "SELECT SUM(dup.quantity) FROM cartitem dup "
+        "WHERE dup.user_id = cartitem.user_id AND dup.product_id = cartitem.product_id"
+        ") WHERE id IN ("
+        "SELECT MIN(id) FROM cartitem GROUP BY user_id, product_id HAVING COUNT(*) > 1"
+        ")"
+    )
+    op.execute(
+        "DELETE FROM cartitem WHERE id NOT IN ("
+        "SELECT MIN(id) FROM cartitem GROUP BY user_id, product_id"
+        ")"
+    )
+    with op.batch_alter_table('cartitem') as batch_op:
+        batch_op.create_unique_constraint('uq_cartitem_user_product', ['user_id', 'product_id'])
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('cartitem') as batch_op:
+        batch_op.drop_constraint('uq_cartitem_user_product', type_='unique')
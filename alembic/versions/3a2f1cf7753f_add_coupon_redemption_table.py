@@ -0,0 +1,40 @@
+"""Add coupon redemption table
+
+Revision ID: 3a2f1cf7753f
+Revises: 47bfc51f3605
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3a2f1cf7753f'
+down_revision = '47bfc51f3605'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('couponredemption',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('coupon_id', sa.String(), nullable=False),
+    sa.Column('user_id', sa.String(), nullable=False),
+    sa.Column('order_id', sa.String(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['coupon_id'], ['coupon.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['order_id'], ['order.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_couponredemption_id'), 'couponredemption', ['id'], unique=False)
+    op.create_index(op.f('ix_couponredemption_order_id'), 'couponredemption', ['order_id'], unique=False)
+    op.create_index('ix_couponredemption_coupon_user', 'couponredemption', ['coupon_id', 'user_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_couponredemption_coupon_user', table_name='couponredemption')
+    op.drop_index(op.f('ix_couponredemption_order_id'), table_name='couponredemption')
+    op.drop_index(op.f('ix_couponredemption_id'), table_name='couponredemption')
+    op.drop_table('couponredemption')
@@ -0,0 +1,36 @@
+"""Add notification counter table
+
+Revision ID: 41b5d17274ca
+Revises: 056adb730481
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '41b5d17274ca'
+down_revision = '056adb730481'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('notificationcounter',
+    sa.Column('user_id', sa.String(), nullable=False),
+    sa.Column('unread_count', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    # Backfill from the existing notifications
+    op.execute(
+        "INSERT INTO notificationcounter (user_id, unread_count, updated_at) "
+        "SELECT user_id, COUNT(*), CURRENT_TIMESTAMP FROM notification "
+        "WHERE is_read = false GROUP BY user_id"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('notificationcounter')
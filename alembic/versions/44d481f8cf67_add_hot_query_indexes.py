@@ -0,0 +1,49 @@
+"""Add indexes for hot foreign-key and filter queries
+
+Revision ID: 44d481f8cf67
+Revises: 1e8d185e3202
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from app.db.migrations import create_index_concurrently, drop_index_concurrently
+
+
+# revision identifiers, used by Alembic.
+revision = '44d481f8cf67'
+down_revision = '1e8d185e3202'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Built concurrently: product and order are too big and busy to lock
+    # for writes. Cart lines by user are already served by uq_cartitem_user_product
+    create_index_concurrently('ix_order_user_created', 'order', ['user_id', 'created_at'])
+    create_index_concurrently('ix_order_created', 'order', ['created_at', 'id'])
+    create_index_concurrently('ix_orderitem_order_product', 'orderitem', ['order_id', 'product_id'])
+    create_index_concurrently('ix_review_product_created', 'review', ['product_id', 'created_at'])
+    create_index_concurrently('ix_review_user_created', 'review', ['user_id', 'created_at'])
+    create_index_concurrently('ix_notification_user_created', 'notification', ['user_id', 'created_at'])
+    create_index_concurrently('ix_notification_user_unread', 'notification', ['user_id', 'created_at'],
+                              postgresql_where='is_read = false',
+                              sqlite_where='is_read = 0')
+    create_index_concurrently('ix_address_user_id', 'address', ['user_id'])
+    create_index_concurrently('ix_wishlistitem_user_product', 'wishlistitem', ['user_id', 'product_id'])
+    create_index_concurrently('ix_product_category_active_name', 'product', ['category_id', 'is_active', 'name'])
+    create_index_concurrently('ix_product_featured', 'product', ['name'],
+                              postgresql_where='is_featured = true AND is_active = true',
+                              sqlite_where='is_featured = 1 AND is_active = 1')
+
+
+def downgrade() -> None:
+    drop_index_concurrently('ix_product_featured', 'product')
+    drop_index_concurrently('ix_product_category_active_name', 'product')
+    drop_index_concurrently('ix_wishlistitem_user_product', 'wishlistitem')
+    drop_index_concurrently('ix_address_user_id', 'address')
+    drop_index_concurrently('ix_notification_user_unread', 'notification')
+    drop_index_concurrently('ix_notification_user_created', 'notification')
+    drop_index_concurrently('ix_review_user_created', 'review')
+    drop_index_concurrently('ix_review_product_created', 'review')
+    drop_index_concurrently('ix_orderitem_order_product', 'orderitem')
+    drop_index_concurrently('ix_order_created', 'order')
+    drop_index_concurrently('ix_order_user_created', 'order')
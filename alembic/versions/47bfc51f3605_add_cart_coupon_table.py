@@ -0,0 +1,32 @@
+"""Add cart coupon table
+
+Revision ID: 47bfc51f3605
+Revises: 2614b07447f2
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '47bfc51f3605'
+down_revision = '2614b07447f2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('cartcoupon',
+    sa.Column('user_id', sa.String(), nullable=False),
+    sa.Column('coupon_id', sa.String(), nullable=False),
+    sa.Column('code', sa.String(), nullable=False),
+    sa.Column('applied_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['coupon_id'], ['coupon.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('cartcoupon')
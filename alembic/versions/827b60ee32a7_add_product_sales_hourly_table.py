@@ -0,0 +1,32 @@
+"""Add product sales hourly table
+
+Revision ID: 827b60ee32a7
+Revises: 11696cc560ef
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '827b60ee32a7'
+down_revision = '11696cc560ef'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('productsaleshourly',
+    sa.Column('product_id', sa.String(), nullable=False),
+    sa.Column('hour', sa.DateTime(), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['product_id'], ['product.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('product_id', 'hour')
+    )
+    op.create_index('ix_productsaleshourly_hour', 'productsaleshourly', ['hour'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_productsaleshourly_hour', table_name='productsaleshourly')
+    op.drop_table('productsaleshourly')
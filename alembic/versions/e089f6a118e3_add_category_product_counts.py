@@ -0,0 +1,33 @@
+"""Add category product counts
+
+Revision ID: e089f6a118e3
+Revises: 3a2f1cf7753f
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e089f6a118e3'
+down_revision = '3a2f1cf7753f'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('category', sa.Column('product_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('category', sa.Column('active_product_count', sa.Integer(), server_default='0', nullable=False))
+    # Backfill from the existing products
+    op.execute(
+        "UPDATE category SET "
+        "product_count = (SELECT COUNT(*) FROM product WHERE product.category_id = category.id), "
+        "active_product_count = (SELECT COUNT(*) FROM product "
+        "WHERE product.category_id = category.id AND product.is_active = true)"
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('category', 'active_product_count')
+    op.drop_column('category', 'product_count')
@@ -1,14 +1,31 @@
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Any, List, Optional, Tuple
+from datetime import date, datetime, timedelta
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile, status
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from sqlalchemy.orm import Session
+import threading
 import uuid
 
 from app.api.deps import get_db, get_current_active_admin
+from app.core.config import settings
+from app.crud.analytics import get_sales_series, get_top_selling_products, summarize_sales
 from app.models.user import User
 from app.models.category import Category
 from app.models.product import Product
+from app.crud.product import bulk_update_products_by_sku, rebuild_category_product_counts
+from app.schemas.analytics import SalesReport, TopProduct
+from app.schemas.order import OrderStatus
+from app.schemas.product import ProductBulkUpdate, ProductBulkUpdateResult, ProductImportResult
+from app.schemas.slow_query import SlowQueryReport
+from app.services.order_export import EXPORT_FORMATS, stream_order_export
+from app.services.product_import import import_products
+from app.services.profiler import SamplingProfiler
+from app.services.slow_queries import slow_query_log
 
 router = APIRouter()
 
+IMPORT_EXTENSIONS = {".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson"}
+
 
 def create_slug(name: str) -> str:
     """Create URL-friendly slug from name"""
@@ -100,6 +117,7 @@ def seed_products(
                 products_created += 1
         
         db.commit()
+        rebuild_category_product_counts(db)
         
         # Get totals
         total_categories = db.query(Category).count()
@@ -119,3 +137,220 @@ def seed_products(
             status_code=500,
             detail=f"Error seeding database: {str(e)}"
         )
+
+
+def _analytics_range(start: Optional[date], end: Optional[date], max_days: int) -> Tuple[date, date]:
+    """Default to the last 30 days and validate the range"""
+    end = end or datetime.utcnow().date()
+    start = start or end - timedelta(days=29)
+    if start > end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start must not be after end"
+        )
+    if (end - start).days >= max_days:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Date range is limited to {max_days} days"
+        )
+    return start, end
+
+
+@router.get("/analytics/sales", response_model=SalesReport)
+def get_sales_analytics(
+    db: Session = Depends(get_db),
+    start: Optional[date] = Query(None),
+    end: Optional[date] = Query(None),
+    granularity: str = Query("day", regex="^(day|hour)$"),
+    current_admin: User = Depends(get_current_active_admin)
+) -> Any:
+    """
+    Get orders, items sold, revenue and average order value per day or hour (Admin only)
+    
+    Read from the sales rollup tables; cancelled and refunded orders are
+    excluded. Dates are UTC and the range is inclusive.
+    """
+    start, end = _analytics_range(start, end, max_days=31 if granularity == "hour" else 366)
+    series = get_sales_series(db, start, end, granularity)
+    return {
+        "start": start,
+        "end": end,
+        "granularity": granularity,
+        "totals": summarize_sales(series),
+        "series": series,
+    }
+
+
+@router.get("/analytics/top-products", response_model=List[TopProduct])
+def get_top_products_analytics(
+    db: Session = Depends(get_db),
+    start: Optional[date] = Query(None),
+    end: Optional[date] = Query(None),
+    limit: int = Query(10, ge=1, le=100),
+    current_admin: User = Depends(get_current_active_admin)
+) -> Any:
+    """
+    Get the best selling products by units sold (Admin only)
+    """
+    start, end = _analytics_range(start, end, max_days=366)
+    return get_top_selling_products(db, start, end, limit=limit)
+
+
+@router.get("/orders/export")
+def export_orders(
+    export_format: str = Query("csv", alias="format", regex="^(csv|ndjson)$"),
+    start: Optional[date] = Query(None),
+    end: Optional[date] = Query(None),
+    status_filter: Optional[List[OrderStatus]] = Query(None, alias="status"),
+    current_admin: User = Depends(get_current_active_admin)
+) -> Any:
+    """
+    Export orders as a CSV or NDJSON download (Admin only)
+    
+    Filter by placement date (UTC, inclusive) and one or more statuses.
+    Rows are streamed, so exports of any size use constant memory.
+    """
+    if start and end and start > end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start must not be after end"
+        )
+    
+    statuses = [order_status.value for order_status in status_filter] if status_filter else None
+    filename = f"orders-{datetime.utcnow():%Y%m%d%H%M%S}.{export_format}"
+    return StreamingResponse(
+        stream_order_export(export_format, start=start, end=end, statuses=statuses),
+        media_type=EXPORT_FORMATS[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.post("/products/import", response_model=ProductImportResult)
+def import_product_feed(
+    file: UploadFile = File(...),
+    import_format: Optional[str] = Query(None, alias="format", regex="^(csv|ndjson)$"),
+    db: Session = Depends(get_db),
+    current_admin: User = Depends(get_current_active_admin)
+) -> Any:
+    """
+    Create or update products from a CSV or NDJSON feed, matched by SKU (Admin only)
+    
+    The format is taken from ?format= or the file extension. Rows are
+    validated as they are read and upserted in batches; rejected rows are
+    reported and do not stop the import. Columns left out of a row (or empty
+    CSV cells) keep their current values on existing products.
+    """
+    if import_format is None:
+        extension = "." + (file.filename or "").rsplit(".", 1)[-1].lower()
+        import_format = IMPORT_EXTENSIONS.get(extension)
+    if import_format is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cannot tell the file format; pass format=csv or format=ndjson"
+        )
+    
+    try:
+        return import_products(db, file.file, import_format)
+    except UnicodeDecodeError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="File must be UTF-8 encoded"
+        )
+
+
+@router.patch("/products/bulk", response_model=ProductBulkUpdateResult)
+def bulk_update_products(
+    update_in: ProductBulkUpdate,
+    db: Session = Depends(get_db),
+    current_admin: User = Depends(get_current_active_admin)
+) -> Any:
+    """
+    Update the price and stock of many products by SKU (Admin only)
+    
+    For price and stock syncs: the changes are applied in chunked set-based
+    updates and committed together. Omitted fields are left unchanged, and
+    unknown SKUs are listed in the response rather than failing the request.
+    """
+    updated, not_found = bulk_update_products_by_sku(
+        db, [item.dict() for item in update_in.items]
+    )
+    db.commit()
+    return {"received": len(update_in.items), "updated": updated, "not_found": not_found}
+
+
+@router.post("/profile", response_class=PlainTextResponse)
+def profile_worker(
+    seconds: float = Query(10.0, gt=0),
+    interval_ms: float = Query(5.0, ge=1, le=100),
+    current_admin: User = Depends(get_current_active_admin)
+) -> Any:
+    """
+    Sample every thread of this worker and download the collapsed stacks (Admin only)
+    
+    For diagnosing latency in production: the file feeds flamegraph.pl or
+    speedscope. Only the worker process serving this request is profiled.
+    Requires PROFILING_ENABLED; one profile runs at a time.
+    """
+    if not settings.PROFILING_ENABLED:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profiling is disabled"
+        )
+    if seconds > settings.PROFILING_MAX_SECONDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"seconds must not exceed {settings.PROFILING_MAX_SECONDS:g}"
+        )
+    
+    profiler = SamplingProfiler(interval_ms / 1000)
+    if not profiler.start():
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A profile is already running"
+        )
+    try:
+        # Waiting on an Event parks this thread in threading.wait, which the profiler skips
+        threading.Event().wait(seconds)
+    finally:
+        profiler.stop()
+    
+    filename = f"profile-{datetime.utcnow():%Y%m%d%H%M%S}.folded"
+    return PlainTextResponse(
+        profiler.collapsed(),
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.get("/slow-queries", response_model=SlowQueryReport)
+def get_slow_queries(
+    limit: int = Query(50, ge=1, le=500),
+    explain: bool = Query(False),
+    current_admin: User = Depends(get_current_active_admin)
+) -> Any:
+    """
+    List statements slower than SLOW_QUERY_THRESHOLD_MS, most total time first (Admin only)
+    
+    Statements are grouped by normalized SQL, with the routes that ran them.
+    With explain=true, the slowest run of each listed SELECT without a plan
+    is explained now (EXPLAIN ANALYZE on PostgreSQL), outside the requests
+    that issued it. Covers only the worker process serving this request.
+    """
+    explained = slow_query_log.explain(limit) if explain else 0
+    return {
+        "threshold_ms": slow_query_log.threshold_ms,
+        "statements": len(slow_query_log),
+        "dropped": slow_query_log.dropped,
+        "explained": explained,
+        "queries": slow_query_log.report(limit),
+    }
+
+
+@router.delete("/slow-queries")
+def reset_slow_queries(
+    current_admin: User = Depends(get_current_active_admin)
+) -> Any:
+    """
+    Clear the slow query log of this worker (Admin only)
+    """
+    slow_query_log.reset()
+    return {"message": "Slow query log cleared"}
@@ -4,13 +4,14 @@ from sqlalchemy.orm import Session
 
 from app.api.deps import get_db, get_current_user
 from app.crud.cart import (
-    get_user_cart, add_item_to_cart, update_cart_item, 
+    get_user_cart, add_item_to_cart, add_items_to_cart, update_cart_item, 
     remove_cart_item, clear_user_cart, apply_discount_to_cart,
     remove_discount_from_cart
 )
 from app.models.user import User as DBUser
 from app.schemas.cart import (
-    Cart, CartItem, CartItemCreate, CartItemUpdate, DiscountCode
+    Cart, CartItem, CartItemBatchCreate, CartItemBatchResult, CartItemCreate,
+    CartItemUpdate, DiscountCode
 )
 
 router = APIRouter()
@@ -49,6 +50,25 @@ def add_item_to_cart_endpoint(
     return cart_item
 
 
+@router.post("/items:batch", response_model=CartItemBatchResult)
+def add_items_to_cart_endpoint(
+    *,
+    db: Session = Depends(get_db),
+    batch_in: CartItemBatchCreate,
+    current_user: DBUser = Depends(get_current_user),
+) -> Any:
+    """
+    Add several items to cart in one request
+    
+    Quantities are added to existing lines. Unavailable products are
+    skipped and listed in rejected_product_ids.
+    """
+    items, rejected = add_items_to_cart(
+        db, user_id=current_user.id, items_in=batch_in.items
+    )
+    return {"items": items, "rejected_product_ids": rejected}
+
+
 @router.put("/items/{item_id}", response_model=CartItem)
 def update_cart_item_endpoint(
     *,
@@ -8,7 +8,8 @@ from app.crud.category import (
     create_category, update_category, delete_category
 )
 from app.models.user import User as DBUser
-from app.schemas.category import Category, CategoryCreate, CategoryUpdate
+from app.schemas.category import Category, CategoryCreate, CategoryTreeNode, CategoryUpdate
+from app.services.category_tree import get_category_tree
 
 router = APIRouter()
 
@@ -30,6 +31,16 @@ def get_all_categories(
     return categories
 
 
+@router.get("/tree", response_model=List[CategoryTreeNode])
+def get_category_tree_endpoint(
+    db: Session = Depends(get_db),
+) -> Any:
+    """
+    Get the full tree of active categories
+    """
+    return get_category_tree(db).to_dicts()
+
+
 @router.get("/{category_id}", response_model=Category)
 def get_category_by_id(
     *,
@@ -1,14 +1,19 @@
 from typing import Any, List, Optional
+from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
 from app.api.deps import get_db, get_current_user, get_current_active_admin
 from app.crud.coupon import (
     get_coupon, get_coupons, create_coupon, update_coupon, 
-    delete_coupon, validate_coupon_code
+    delete_coupon, validate_coupon_code, bulk_create_coupons
 )
 from app.models.user import User as DBUser
-from app.schemas.coupon import Coupon, CouponCreate, CouponUpdate, CouponValidation
+from app.schemas.coupon import (
+    Coupon, CouponBulkGenerate, CouponCreate, CouponUpdate, CouponValidation
+)
+from app.services.coupon_codes import iter_codes_csv
 
 router = APIRouter()
 
@@ -67,6 +72,34 @@ def create_coupon_admin(
     return coupon
 
 
+@router.post("/bulk-generate")
+def bulk_generate_coupons_admin(
+    *,
+    db: Session = Depends(get_db),
+    bulk_in: CouponBulkGenerate,
+    current_user: DBUser = Depends(get_current_active_admin),
+) -> Any:
+    """
+    Generate a campaign of unique coupon codes (admin only)
+    
+    All codes are inserted in one transaction, then streamed back as CSV.
+    """
+    try:
+        codes = bulk_create_coupons(db, bulk_in=bulk_in)
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Could not generate coupons"
+        )
+    
+    filename = f"coupons-{datetime.utcnow():%Y%m%d%H%M%S}.csv"
+    return StreamingResponse(
+        iter_codes_csv(codes),
+        media_type="text/csv",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
 @router.get("/{coupon_id}", response_model=Coupon)
 def get_coupon_admin(
     *,
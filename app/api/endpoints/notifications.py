@@ -1,14 +1,28 @@
-from typing import Any, List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+import asyncio
+import json
+from typing import Any, Dict, List, Optional
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, Query, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 from app.api.deps import get_db, get_current_user, get_current_active_admin
 from app.crud.notification import (
     get_user_notifications, get_notification, mark_notification_as_read,
-    mark_all_notifications_as_read, delete_notification, create_notification
+    mark_all_notifications_as_read, delete_notification, create_notification,
+    get_unread_count
 )
+from app.crud.category import get_category
+from app.core.config import settings
 from app.models.user import User as DBUser
-from app.schemas.notification import Notification, NotificationCreate, NotificationMarkRead
+from app.schemas.notification import (
+    BroadcastJob, BroadcastSegment, Notification, NotificationBroadcast, NotificationCreate,
+    NotificationMarkRead
+)
+from app.services.notification_broadcast import (
+    create_broadcast_job, get_broadcast_job, run_broadcast
+)
+from app.services.notification_broker import notification_broker
 
 router = APIRouter()
 
@@ -30,6 +44,64 @@ def get_notifications(
     return notifications
 
 
+def _sse_message(event: str, data: Dict[str, Any]) -> str:
+    """Format a Server-Sent Events message"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+@router.get("/stream")
+async def stream_notifications(
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: DBUser = Depends(get_current_user),
+) -> Any:
+    """
+    Stream new notifications as Server-Sent Events
+    
+    Sends an `unread_count` event on connect, then a `notification` event
+    for each notification created for the user. Idle connections cost no
+    database queries.
+    """
+    user_id = current_user.id
+    unread_count = await run_in_threadpool(get_unread_count, db, user_id)
+    # Return the connection to the pool; the stream itself never queries
+    db.close()
+    
+    subscription = notification_broker.subscribe(user_id)
+    keepalive = settings.NOTIFICATION_STREAM_KEEPALIVE_SECONDS
+    
+    async def event_stream():
+        try:
+            yield "retry: 5000\n\n"
+            yield _sse_message("unread_count", {"unread_count": unread_count})
+            while not await request.is_disconnected():
+                try:
+                    item = await asyncio.wait_for(subscription.queue.get(), timeout=keepalive)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield _sse_message("notification", item)
+        finally:
+            notification_broker.unsubscribe(subscription)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/unread-count")
+def get_unread_count_endpoint(
+    db: Session = Depends(get_db),
+    current_user: DBUser = Depends(get_current_user),
+) -> Any:
+    """
+    Get the number of unread notifications
+    """
+    return {"unread_count": get_unread_count(db, user_id=current_user.id)}
+
+
 @router.get("/{notification_id}", response_model=Notification)
 def get_notification_endpoint(
     *,
@@ -156,3 +228,47 @@ def send_notification_admin(
         )
     
     return {"message": "Notification sent successfully"}
+
+
+@router.post("/broadcast", response_model=BroadcastJob, status_code=status.HTTP_202_ACCEPTED)
+def broadcast_notification_admin(
+    *,
+    db: Session = Depends(get_db),
+    broadcast_in: NotificationBroadcast,
+    background_tasks: BackgroundTasks,
+    current_user: DBUser = Depends(get_current_active_admin),
+) -> Any:
+    """
+    Broadcast a notification to a user segment (admin only)
+    
+    Runs as a background job; poll GET /broadcast/{job_id} for progress.
+    """
+    if broadcast_in.segment == BroadcastSegment.CATEGORY_PURCHASERS:
+        if not get_category(db, category_id=broadcast_in.category_id):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Category not found"
+            )
+    
+    job = create_broadcast_job(broadcast_in)
+    background_tasks.add_task(run_broadcast, job.id, broadcast_in)
+    return job
+
+
+@router.get("/broadcast/{job_id}", response_model=BroadcastJob)
+def get_broadcast_job_admin(
+    *,
+    job_id: str,
+    current_user: DBUser = Depends(get_current_active_admin),
+) -> Any:
+    """
+    Get broadcast job progress (admin only)
+    """
+    job = get_broadcast_job(job_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Broadcast job not found"
+        )
+    
+    return job
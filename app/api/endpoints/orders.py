@@ -8,7 +8,9 @@ from app.crud.order import (
     get_order, get_user_orders, create_order, 
     update_order_status, cancel_order, get_all_orders
 )
+from app.crud.cart import reorder_to_cart
 from app.models.user import User as DBUser
+from app.schemas.cart import CartItemBatchResult
 from app.schemas.order import (
     Order, OrderCreate, OrderStatusUpdate, OrderStatus
 )
@@ -124,6 +126,37 @@ def cancel_order_endpoint(
     return {"message": "Order cancelled successfully"}
 
 
+@router.post("/{order_id}/reorder", response_model=CartItemBatchResult)
+def reorder_endpoint(
+    *,
+    db: Session = Depends(get_db),
+    order_id: str,
+    current_user: DBUser = Depends(get_current_user),
+) -> Any:
+    """
+    Add a past order's items to the cart
+    
+    Items are priced at the current product price and capped at available
+    stock. Products no longer available are listed in rejected_product_ids.
+    """
+    order = get_order(db, order_id=order_id)
+    if not order:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Order not found"
+        )
+    
+    # Check if user owns the order
+    if order.user_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    
+    items, skipped = reorder_to_cart(db, user_id=current_user.id, order_id=order_id)
+    return {"items": items, "rejected_product_ids": skipped}
+
+
 # Admin endpoints
 @router.get("/admin/all", response_model=List[Order])
 def get_all_orders_admin(
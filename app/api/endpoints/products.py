@@ -5,13 +5,14 @@ from sqlalchemy.orm import Session
 from app.api.deps import get_db, get_current_user, get_current_active_admin
 from app.crud.product import (
     get_product, get_product_by_slug, get_products, get_featured_products,
-    get_related_products, search_products, create_product, update_product, 
-    delete_product, update_product_stock
+    get_related_products, get_trending_products, search_products, create_product,
+    update_product, delete_product, update_product_stock
 )
 from app.models.user import User as DBUser
 from app.schemas.product import (
     Product, ProductSummary, ProductCreate, ProductUpdate, ProductStockUpdate
 )
+from app.services.product_counters import product_counters
 
 router = APIRouter()
 
@@ -22,13 +23,14 @@ def get_all_products(
     page: int = Query(1, ge=1),
     limit: int = Query(20, ge=1, le=100),
     category: Optional[str] = Query(None),
+    include_subcategories: bool = Query(False),
     search: Optional[str] = Query(None),
     min_price: Optional[float] = Query(None, ge=0),
     max_price: Optional[float] = Query(None, ge=0),
     in_stock: Optional[bool] = Query(None),
     is_organic: Optional[bool] = Query(None),
     is_on_sale: Optional[bool] = Query(None),
-    sort_by: Optional[str] = Query("name", regex="^(price|name|rating|newest)$"),
+    sort_by: Optional[str] = Query("name", regex="^(price|name|rating|newest|popular)$"),
     sort_order: Optional[str] = Query("asc", regex="^(asc|desc)$"),
 ) -> Any:
     """
@@ -38,6 +40,7 @@ def get_all_products(
     
     filters = {
         "category": category,
+        "include_subcategories": include_subcategories,
         "search": search,
         "min_price": min_price,
         "max_price": max_price,
@@ -65,6 +68,19 @@ def get_featured_products_endpoint(
     return products
 
 
+@router.get("/trending", response_model=List[ProductSummary])
+def get_trending_products_endpoint(
+    db: Session = Depends(get_db),
+    window: str = Query("24h", regex="^(24h|7d)$"),
+    limit: int = Query(10, ge=1, le=50),
+) -> Any:
+    """
+    Get the best selling products over the last 24 hours or 7 days
+    """
+    products = get_trending_products(db, window=window, limit=limit)
+    return products
+
+
 @router.get("/search", response_model=List[ProductSummary])
 def search_products_endpoint(
     db: Session = Depends(get_db),
@@ -98,6 +114,7 @@ def get_product_by_id(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Product not found"
         )
+    product_counters.record_view(product.id)
     return product
 
 
@@ -116,6 +133,7 @@ def get_product_by_slug_endpoint(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Product not found"
         )
+    product_counters.record_view(product.id)
     return product
 
 
@@ -0,0 +1,78 @@
+"""
+Per-request profiling
+With PROFILING_ENABLED, an admin can add ?profile=1 to any request: it is
+served as usual while the sampling profiler runs, and the response is
+replaced by the request's call tree. Samples cover every busy thread of the
+worker, so profile on a quiet worker to keep other requests out of the tree.
+
+Profiling stops after PROFILING_MAX_SECONDS even if the response has not
+finished, so a never-ending response (the notification stream) cannot hold
+the profiler; the call tree is then marked truncated.
+"""
+import time
+
+import anyio
+from fastapi import HTTPException, Request, status
+from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
+
+from app.api.deps import get_current_user
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.services.profiler import SamplingProfiler
+
+# Finer than whole-worker profiles: a single request may last only milliseconds
+REQUEST_SAMPLE_INTERVAL = 0.001
+
+
+def _is_admin_token(token: str) -> bool:
+    """Check whether a bearer token belongs to an active admin"""
+    db = SessionLocal()
+    try:
+        user = get_current_user(db=db, token=token)
+        return user.is_active and user.is_admin
+    except HTTPException:
+        return False
+    finally:
+        db.close()
+
+
+async def profile_request(request: Request, call_next):
+    """Answer ?profile=1 requests from admins with their call tree"""
+    if request.query_params.get("profile") != "1":
+        return await call_next(request)
+
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not await run_in_threadpool(_is_admin_token, token):
+        return JSONResponse(
+            status_code=status.HTTP_403_FORBIDDEN,
+            content={"detail": "Profiling a request requires an admin token"},
+        )
+
+    profiler = SamplingProfiler(REQUEST_SAMPLE_INTERVAL)
+    if not profiler.start():
+        return JSONResponse(
+            status_code=status.HTTP_409_CONFLICT,
+            content={"detail": "A profile is already running"},
+        )
+    started = time.perf_counter()
+    response = None
+    try:
+        with anyio.move_on_after(settings.PROFILING_MAX_SECONDS) as deadline:
+            response = await call_next(request)
+            # Drain the body so streamed responses are profiled to the end
+            async for _ in response.body_iterator:
+                pass
+    finally:
+        profiler.stop()
+    truncated = deadline.cancel_called
+
+    return JSONResponse(content={
+        "method": request.method,
+        "path": request.url.path,
+        "status_code": response.status_code if response is not None else None,
+        "truncated": truncated,
+        "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+        "samples": profiler.samples,
+        "call_tree": profiler.call_tree(),
+    })
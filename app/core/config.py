@@ -39,6 +39,61 @@ class Settings(BaseSettings):
     STRIPE_PUBLISHABLE_KEY: str = ""  # Optional: For reference, safe to expose to frontend
     STRIPE_WEBHOOK_SECRET: str = ""  # Required: For webhook signature verification
 
+    # In-process background loops (outbox relay, counter flushes, trending
+    # sync, notification bridge); tests turn them off
+    BACKGROUND_TASKS_ENABLED: bool = True
+
+    # Transactional outbox relay
+    OUTBOX_RELAY_ENABLED: bool = True
+    OUTBOX_RELAY_INTERVAL_SECONDS: float = 2.0
+    OUTBOX_BATCH_SIZE: int = 500
+    OUTBOX_MAX_ATTEMPTS: int = 5
+
+    # Notification stream (Server-Sent Events)
+    NOTIFICATION_STREAM_KEEPALIVE_SECONDS: float = 15.0
+    NOTIFICATION_STREAM_PG_BRIDGE: bool = False  # Enable when running several workers on PostgreSQL
+    NOTIFICATION_STREAM_CHANNEL: str = "notifications"
+
+    # Notification broadcasts
+    NOTIFICATION_BROADCAST_BATCH_SIZE: int = 2000
+    NOTIFICATION_BROADCAST_THROTTLE_SECONDS: float = 0.2  # Pause between batches to leave room for OLTP traffic
+
+    # Cart pricing
+    CART_TAX_RATE: float = 0.08
+    CART_DELIVERY_FEE: float = 5.99
+    CART_FREE_DELIVERY_THRESHOLD: float = 50.0
+    CART_PRICING_CACHE_TTL_SECONDS: float = 300.0
+
+    # Catalog
+    CATEGORY_TREE_CACHE_TTL_SECONDS: float = 300.0
+    RECOMMENDATIONS_TOP_K: int = 20
+    RECOMMENDATIONS_MIN_CO_PURCHASES: int = 2  # Ignore pairs bought together fewer times
+
+    # Product view/purchase counters
+    PRODUCT_COUNTERS_ENABLED: bool = True
+    PRODUCT_COUNTER_FLUSH_INTERVAL_SECONDS: float = 10.0
+
+    # Trending products
+    TRENDING_SYNC_ENABLED: bool = True
+    TRENDING_SYNC_INTERVAL_SECONDS: float = 60.0
+    TRENDING_RETENTION_DAYS: int = 8
+
+    # Coupons
+    COUPON_CACHE_TTL_SECONDS: float = 30.0
+
+    # Sampling profiler (admin-only diagnostics)
+    PROFILING_ENABLED: bool = False
+    PROFILING_MAX_SECONDS: float = 60.0
+
+    # Migrations (PostgreSQL): give up on a blocked DDL lock instead of queueing writes behind it
+    MIGRATION_LOCK_TIMEOUT_MS: int = 5000
+
+    # Slow query log
+    SLOW_QUERY_LOG_ENABLED: bool = True
+    SLOW_QUERY_THRESHOLD_MS: float = 100.0
+    SLOW_QUERY_MAX_STATEMENTS: int = 500  # Distinct statements kept per process
+    SLOW_QUERY_EXPLAIN_TIMEOUT_MS: int = 5000
+
     class Config:
         env_file = ".env"
         case_sensitive = True
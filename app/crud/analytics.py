@@ -0,0 +1,173 @@
+from typing import Any, Dict, List, Optional, Tuple
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from sqlalchemy.orm import Session
+from sqlalchemy import func
+
+from app.db.dialects import upsert
+from app.models.analytics import ProductSalesDaily, SalesDaily, SalesHourly
+from app.models.order import Order, OrderItem
+from app.models.product import Product
+
+# Orders in these states do not count as sales
+VOID_ORDER_STATUSES = ("cancelled", "refunded")
+
+
+class SalesRollup:
+    """Sales deltas aggregated in memory before being added to the rollup tables"""
+
+    def __init__(self):
+        # bucket -> [order_count, items_sold, revenue]
+        self.daily: Dict[date, List[float]] = defaultdict(lambda: [0, 0, 0.0])
+        self.hourly: Dict[datetime, List[float]] = defaultdict(lambda: [0, 0, 0.0])
+        # (day, product_id) -> [quantity, revenue]
+        self.products: Dict[Tuple[date, str], List[float]] = defaultdict(lambda: [0, 0.0])
+
+    def add_order(self, created_at: datetime, total_amount: Optional[float], sign: int = 1) -> None:
+        """Count an order (sign=-1 takes it back out)"""
+        for entry in (self.daily[created_at.date()], self.hourly[_hour(created_at)]):
+            entry[0] += sign
+            entry[2] += sign * (total_amount or 0.0)
+
+    def add_item(
+        self,
+        created_at: datetime,
+        product_id: str,
+        quantity: int,
+        revenue: float,
+        sign: int = 1,
+    ) -> None:
+        """Count an order line (sign=-1 takes it back out)"""
+        for entry in (self.daily[created_at.date()], self.hourly[_hour(created_at)]):
+            entry[1] += sign * quantity
+        entry = self.products[(created_at.date(), product_id)]
+        entry[0] += sign * quantity
+        entry[1] += sign * revenue
+
+
+def _hour(moment: datetime) -> datetime:
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+def _upsert_add(db: Session, model: Any, rows: List[Dict[str, Any]], keys: List[str], counters: List[str]) -> None:
+    """Insert rows, adding their counters to any existing row (caller commits)"""
+    if not rows:
+        return
+    table = model.__table__
+    stmt = upsert(db, table)
+    set_ = {column: table.c[column] + stmt.excluded[column] for column in counters}
+    if "updated_at" in table.c:
+        set_["updated_at"] = stmt.excluded.updated_at
+    stmt = stmt.on_conflict_do_update(index_elements=[table.c[key] for key in keys], set_=set_)
+    for start in range(0, len(rows), 1000):
+        db.execute(stmt, rows[start:start + 1000])
+
+
+def apply_sales_rollup(db: Session, rollup: SalesRollup) -> None:
+    """Add aggregated sales deltas to the rollup tables (caller commits)"""
+    now = datetime.utcnow()
+    # Sorted so concurrent writers lock rollup rows in one order
+    _upsert_add(db, SalesDaily, [
+        {"day": day, "order_count": orders, "items_sold": items, "revenue": revenue, "updated_at": now}
+        for day, (orders, items, revenue) in sorted(rollup.daily.items())
+    ], ["day"], ["order_count", "items_sold", "revenue"])
+    _upsert_add(db, SalesHourly, [
+        {"hour": hour, "order_count": orders, "items_sold": items, "revenue": revenue, "updated_at": now}
+        for hour, (orders, items, revenue) in sorted(rollup.hourly.items())
+    ], ["hour"], ["order_count", "items_sold", "revenue"])
+    _upsert_add(db, ProductSalesDaily, [
+        {"day": day, "product_id": product_id, "quantity": quantity, "revenue": revenue}
+        for (day, product_id), (quantity, revenue) in sorted(rollup.products.items())
+    ], ["day", "product_id"], ["quantity", "revenue"])
+
+
+def rebuild_sales_rollups(db: Session, batch_size: int = 5000) -> int:
+    """Recompute the rollup tables from all orders, returning how many orders were counted"""
+    rollup = SalesRollup()
+    order_count = 0
+    counted = Order.status.notin_(VOID_ORDER_STATUSES)
+
+    orders = db.query(Order.created_at, Order.total_amount).filter(
+        counted, Order.created_at.isnot(None)
+    ).execution_options(yield_per=batch_size)
+    for created_at, total_amount in orders:
+        rollup.add_order(created_at, total_amount)
+        order_count += 1
+
+    items = db.query(
+        Order.created_at, OrderItem.product_id, OrderItem.quantity, OrderItem.total_price
+    ).join(Order, Order.id == OrderItem.order_id).filter(
+        counted, Order.created_at.isnot(None)
+    ).execution_options(yield_per=batch_size)
+    for created_at, product_id, quantity, total_price in items:
+        rollup.add_item(created_at, product_id, quantity, total_price)
+
+    # Replaced in one transaction, so readers see either the old or the new rollups
+    for model in (SalesDaily, SalesHourly, ProductSalesDaily):
+        db.query(model).delete(synchronize_session=False)
+    apply_sales_rollup(db, rollup)
+    db.commit()
+    return order_count
+
+
+def _sales_point(period: Any, order_count: int, items_sold: int, revenue: float) -> Dict[str, Any]:
+    return {
+        "period": period,
+        "order_count": order_count,
+        "items_sold": items_sold,
+        "revenue": round(revenue, 2),
+        "average_order_value": round(revenue / order_count, 2) if order_count else 0.0,
+    }
+
+
+def get_sales_series(db: Session, start: date, end: date, granularity: str = "day") -> List[Dict[str, Any]]:
+    """Get sales per day or hour between two dates (inclusive), with empty periods filled in"""
+    if granularity == "hour":
+        first = datetime.combine(start, time.min)
+        stop = datetime.combine(end + timedelta(days=1), time.min)
+        rows = db.query(SalesHourly).filter(SalesHourly.hour >= first, SalesHourly.hour < stop)
+        by_period = {row.hour: row for row in rows}
+        step = timedelta(hours=1)
+    else:
+        first, stop = start, end + timedelta(days=1)
+        rows = db.query(SalesDaily).filter(SalesDaily.day >= start, SalesDaily.day <= end)
+        by_period = {row.day: row for row in rows}
+        step = timedelta(days=1)
+
+    series = []
+    period = first
+    while period < stop:
+        row = by_period.get(period)
+        if row:
+            series.append(_sales_point(period, row.order_count, row.items_sold, row.revenue))
+        else:
+            series.append(_sales_point(period, 0, 0, 0.0))
+        period += step
+    return series
+
+
+def summarize_sales(series: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Get totals and average order value over a sales series"""
+    order_count = sum(point["order_count"] for point in series)
+    items_sold = sum(point["items_sold"] for point in series)
+    revenue = sum(point["revenue"] for point in series)
+    point = _sales_point(None, order_count, items_sold, revenue)
+    del point["period"]
+    return point
+
+
+def get_top_selling_products(db: Session, start: date, end: date, limit: int = 10) -> List[Dict[str, Any]]:
+    """Get the products with the most units sold between two dates (inclusive)"""
+    quantity = func.sum(ProductSalesDaily.quantity)
+    revenue = func.sum(ProductSalesDaily.revenue)
+    rows = db.query(
+        ProductSalesDaily.product_id, Product.name, quantity, revenue
+    ).join(Product, Product.id == ProductSalesDaily.product_id).filter(
+        ProductSalesDaily.day >= start, ProductSalesDaily.day <= end
+    ).group_by(ProductSalesDaily.product_id, Product.name).having(
+        quantity > 0
+    ).order_by(quantity.desc(), ProductSalesDaily.product_id).limit(limit).all()
+    return [
+        {"product_id": product_id, "product_name": name, "quantity": units, "revenue": round(total or 0.0, 2)}
+        for product_id, name, units, total in rows
+    ]
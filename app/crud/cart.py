@@ -1,11 +1,18 @@
-from typing import Any, Dict, Optional, Union, List
+from typing import Any, Dict, Optional, Union, List, Tuple
 import uuid
+from datetime import datetime
+from sqlalchemy import and_, case, func, literal, select, update
 from sqlalchemy.orm import Session
 
-from app.models.cart import CartItem
+from app.crud.coupon import get_coupon_by_code_cached, user_can_redeem
+from app.db.dialects import upsert, uuid_expression
+from app.models.cart import CartCoupon, CartItem
+from app.models.order import OrderItem
 from app.models.product import Product
-from app.models.coupon import Coupon
 from app.schemas.cart import CartItemCreate, CartItemUpdate, Cart
+from app.services.cart_pricing import (
+    eligible_subtotal, get_cart_pricing, invalidate_cart_pricing
+)
 
 
 def get_user_cart_items(db: Session, user_id: str) -> List[CartItem]:
@@ -16,24 +23,18 @@ def get_user_cart_items(db: Session, user_id: str) -> List[CartItem]:
 def get_user_cart(db: Session, user_id: str) -> Cart:
     """Get user's complete cart with calculations"""
     cart_items = get_user_cart_items(db, user_id)
-    
-    # Calculate totals
-    total_items = sum(item.quantity for item in cart_items)
-    subtotal = sum(item.total_price for item in cart_items)
-    
-    # TODO: Apply any active discount codes
-    discount_amount = 0.0
-    discount_code = None
-    
-    total = subtotal - discount_amount
+    pricing = get_cart_pricing(db, user_id, cart_items)
     
     return Cart(
         items=cart_items,
-        total_items=total_items,
-        subtotal=subtotal,
-        discount_amount=discount_amount,
-        discount_code=discount_code,
-        total=total
+        total_items=sum(item.quantity for item in cart_items),
+        subtotal=pricing.subtotal,
+        discount_amount=pricing.discount_amount,
+        discount_code=pricing.discount_code,
+        total=pricing.total,
+        tax_amount=pricing.tax_amount,
+        delivery_fee=pricing.delivery_fee,
+        order_total=pricing.order_total,
     )
 
 
@@ -68,6 +69,7 @@ def add_item_to_cart(db: Session, user_id: str, item_in: CartItemCreate) -> Opti
         existing_item.quantity += item_in.quantity
         db.add(existing_item)
         db.commit()
+        invalidate_cart_pricing(user_id)
         db.refresh(existing_item)
         return existing_item
     else:
@@ -82,10 +84,151 @@ def add_item_to_cart(db: Session, user_id: str, item_in: CartItemCreate) -> Opti
         )
         db.add(db_cart_item)
         db.commit()
+        invalidate_cart_pricing(user_id)
         db.refresh(db_cart_item)
         return db_cart_item
 
 
+def add_items_to_cart(
+    db: Session, user_id: str, items_in: List[CartItemCreate]
+) -> Tuple[List[CartItem], List[str]]:
+    """Add several items to cart in one statement, returning the lines and rejected product IDs"""
+    # Merge repeated products so each line is upserted once
+    quantities: Dict[str, int] = {}
+    rejected: List[str] = []
+    for item_in in items_in:
+        if item_in.quantity <= 0:
+            rejected.append(item_in.product_id)
+            continue
+        quantities[item_in.product_id] = quantities.get(item_in.product_id, 0) + item_in.quantity
+    
+    prices = dict(
+        db.query(Product.id, Product.price).filter(
+            Product.id.in_(list(quantities)),
+            Product.is_active == True,
+            Product.in_stock == True
+        ).all()
+    ) if quantities else {}
+    rejected.extend(product_id for product_id in quantities if product_id not in prices)
+    
+    accepted = [product_id for product_id in quantities if product_id in prices]
+    if not accepted:
+        return [], rejected
+    
+    try:
+        now = datetime.utcnow()
+        rows = [
+            {
+                "id": str(uuid.uuid4()),
+                "user_id": user_id,
+                "product_id": product_id,
+                "quantity": quantities[product_id],
+                "price_at_time": prices[product_id],
+                "created_at": now,
+                "updated_at": now,
+            }
+            for product_id in accepted
+        ]
+        table = CartItem.__table__
+        stmt = upsert(db, table).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.user_id, table.c.product_id],
+            set_={
+                "quantity": table.c.quantity + stmt.excluded.quantity,
+                "updated_at": stmt.excluded.updated_at,
+            },
+        )
+        db.execute(stmt)
+        db.commit()
+    except Exception:
+        # Only unavailable products are rejected; database errors surface
+        db.rollback()
+        raise
+    invalidate_cart_pricing(user_id)
+    
+    items = db.query(CartItem).filter(
+        CartItem.user_id == user_id,
+        CartItem.product_id.in_(accepted)
+    ).populate_existing().all()
+    return items, rejected
+
+
+def reorder_to_cart(
+    db: Session, user_id: str, order_id: str
+) -> Tuple[List[CartItem], List[str]]:
+    """Copy an order's lines into the cart at current prices, returning the lines and skipped product IDs"""
+    available = and_(
+        Product.is_active == True,
+        Product.in_stock == True,
+        Product.stock_quantity > 0
+    )
+    ordered = db.query(
+        OrderItem.product_id, func.max(case((available, 1), else_=0))
+    ).outerjoin(Product, Product.id == OrderItem.product_id).filter(
+        OrderItem.order_id == order_id
+    ).group_by(OrderItem.product_id).all()
+    accepted = [product_id for product_id, is_available in ordered if is_available]
+    skipped = [product_id for product_id, is_available in ordered if not is_available]
+    if not accepted:
+        return [], skipped
+    
+    try:
+        now = datetime.utcnow()
+        quantity = func.sum(OrderItem.quantity)
+        lines = select(
+            uuid_expression(db),
+            literal(user_id),
+            OrderItem.product_id,
+            # Never put more in the cart than is in stock
+            case((quantity > Product.stock_quantity, Product.stock_quantity), else_=quantity),
+            Product.price,
+            literal(now),
+            literal(now),
+        ).join(Product, Product.id == OrderItem.product_id).where(
+            OrderItem.order_id == order_id,
+            available
+        ).group_by(OrderItem.product_id, Product.stock_quantity, Product.price)
+        
+        table = CartItem.__table__
+        stmt = upsert(db, table).from_select(
+            ["id", "user_id", "product_id", "quantity", "price_at_time", "created_at", "updated_at"],
+            lines,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.user_id, table.c.product_id],
+            set_={
+                "quantity": table.c.quantity + stmt.excluded.quantity,
+                # Lines already in the cart move to the current price too
+                "price_at_time": stmt.excluded.price_at_time,
+                "updated_at": stmt.excluded.updated_at,
+            },
+        )
+        db.execute(stmt)
+        # Merged lines can exceed stock; cap them in the same transaction
+        stock = select(Product.stock_quantity).where(
+            Product.id == table.c.product_id
+        ).scalar_subquery()
+        db.execute(
+            update(table).where(
+                table.c.user_id == user_id,
+                table.c.product_id.in_(accepted),
+                table.c.quantity > stock
+            ).values(quantity=stock)
+        )
+        db.commit()
+    except Exception:
+        # Only unavailable products are skipped; database errors surface
+        db.rollback()
+        raise
+    invalidate_cart_pricing(user_id)
+    
+    items = db.query(CartItem).filter(
+        CartItem.user_id == user_id,
+        CartItem.product_id.in_(accepted)
+    ).populate_existing().all()
+    return items, skipped
+
+
 def update_cart_item(
     db: Session, 
     item_id: str, 
@@ -101,11 +244,13 @@ def update_cart_item(
         # Remove item if quantity is 0 or negative
         db.delete(cart_item)
         db.commit()
+        invalidate_cart_pricing(user_id)
         return None
     
     cart_item.quantity = item_in.quantity
     db.add(cart_item)
     db.commit()
+    invalidate_cart_pricing(user_id)
     db.refresh(cart_item)
     return cart_item
 
@@ -119,6 +264,7 @@ def remove_cart_item(db: Session, item_id: str, user_id: str) -> bool:
         
         db.delete(cart_item)
         db.commit()
+        invalidate_cart_pricing(user_id)
         return True
     except Exception:
         db.rollback()
@@ -130,6 +276,7 @@ def clear_user_cart(db: Session, user_id: str) -> bool:
     try:
         db.query(CartItem).filter(CartItem.user_id == user_id).delete()
         db.commit()
+        invalidate_cart_pricing(user_id)
         return True
     except Exception:
         db.rollback()
@@ -139,32 +286,59 @@ def clear_user_cart(db: Session, user_id: str) -> bool:
 def apply_discount_to_cart(db: Session, user_id: str, code: str) -> Dict[str, Any]:
     """Apply discount code to cart"""
     # Get coupon
-    coupon = db.query(Coupon).filter(Coupon.code == code).first()
+    coupon = get_coupon_by_code_cached(db, code)
     if not coupon:
         return {"success": False, "message": "Invalid discount code"}
     
-    # Get cart total
-    cart = get_user_cart(db, user_id)
+    cart_items = get_user_cart_items(db, user_id)
+    subtotal = sum(item.total_price for item in cart_items)
     
     # Validate coupon
-    is_valid, message = coupon.is_valid(user_id=user_id, cart_total=cart.subtotal)
+    is_valid, message = coupon.is_valid(user_id=user_id, cart_total=subtotal)
     if not is_valid:
         return {"success": False, "message": message}
     
-    # Calculate discount
-    discount_amount = coupon.calculate_discount(cart.subtotal)
+    if not user_can_redeem(db, coupon, user_id):
+        return {"success": False, "message": "You have already used this discount code"}
     
-    # TODO: Store discount code application in session or database
-    # For now, just return the discount amount
+    if coupon.type != "free_shipping" and not eligible_subtotal(db, coupon, cart_items):
+        return {"success": False, "message": "Discount code does not apply to items in your cart"}
+    
+    # Store on the cart, replacing any previously applied code
+    try:
+        stmt = upsert(db, CartCoupon.__table__).values(
+            user_id=user_id, coupon_id=coupon.id, code=coupon.code, applied_at=datetime.utcnow()
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[CartCoupon.__table__.c.user_id],
+            set_={
+                "coupon_id": stmt.excluded.coupon_id,
+                "code": stmt.excluded.code,
+                "applied_at": stmt.excluded.applied_at,
+            },
+        )
+        db.execute(stmt)
+        db.commit()
+    except Exception:
+        db.rollback()
+        return {"success": False, "message": "Could not apply discount code"}
+    invalidate_cart_pricing(user_id)
     
+    pricing = get_cart_pricing(db, user_id, cart_items)
     return {
         "success": True, 
         "message": "Discount code applied successfully",
-        "discount_amount": discount_amount
+        "discount_amount": pricing.discount_amount
     }
 
 
 def remove_discount_from_cart(db: Session, user_id: str) -> bool:
     """Remove discount code from cart"""
-    # TODO: Remove stored discount code from session or database
-    return True
+    try:
+        db.query(CartCoupon).filter(CartCoupon.user_id == user_id).delete()
+        db.commit()
+        invalidate_cart_pricing(user_id)
+        return True
+    except Exception:
+        db.rollback()
+        return False
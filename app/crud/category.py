@@ -4,6 +4,7 @@ from sqlalchemy.orm import Session
 
 from app.models.category import Category
 from app.schemas.category import CategoryCreate, CategoryUpdate
+from app.services.category_tree import invalidate_category_tree
 
 
 def get_category(db: Session, category_id: str) -> Optional[Category]:
@@ -50,6 +51,7 @@ def create_category(db: Session, category_in: CategoryCreate) -> Category:
     )
     db.add(db_category)
     db.commit()
+    invalidate_category_tree()
     db.refresh(db_category)
     return db_category
 
@@ -72,6 +74,7 @@ def update_category(
             
     db.add(db_category)
     db.commit()
+    invalidate_category_tree()
     db.refresh(db_category)
     return db_category
 
@@ -87,6 +90,7 @@ def delete_category(db: Session, category_id: str) -> bool:
         # For now, we'll just delete it
         db.delete(category)
         db.commit()
+        invalidate_category_tree()
         return True
     except Exception:
         db.rollback()
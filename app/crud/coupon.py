@@ -1,10 +1,13 @@
 from typing import Any, Dict, Optional, Union, List
 import uuid
 from datetime import datetime
+from sqlalchemy import func, insert, or_
 from sqlalchemy.orm import Session
 
-from app.models.coupon import Coupon
-from app.schemas.coupon import CouponCreate, CouponUpdate
+from app.models.coupon import Coupon, CouponRedemption
+from app.schemas.coupon import CouponBulkGenerate, CouponCreate, CouponUpdate
+from app.services.coupon_cache import coupon_cache
+from app.services.coupon_codes import generate_codes
 
 
 def get_coupon(db: Session, coupon_id: str) -> Optional[Coupon]:
@@ -17,6 +20,19 @@ def get_coupon_by_code(db: Session, code: str) -> Optional[Coupon]:
     return db.query(Coupon).filter(Coupon.code == code).first()
 
 
+def get_coupon_by_code_cached(db: Session, code: str) -> Optional[Coupon]:
+    """Get coupon by code through the in-process cache"""
+    return coupon_cache.get(db, code)
+
+
+def get_user_redemption_count(db: Session, coupon_id: str, user_id: str) -> int:
+    """Get how many times a user has redeemed a coupon"""
+    return db.query(func.count(CouponRedemption.id)).filter(
+        CouponRedemption.coupon_id == coupon_id,
+        CouponRedemption.user_id == user_id
+    ).scalar()
+
+
 def get_coupons(
     db: Session, 
     skip: int = 0, 
@@ -58,16 +74,72 @@ def create_coupon(db: Session, coupon_in: CouponCreate) -> Optional[Coupon]:
     )
     db.add(db_coupon)
     db.commit()
+    coupon_cache.invalidate(db_coupon.code)
     db.refresh(db_coupon)
     return db_coupon
 
 
+def bulk_create_coupons(
+    db: Session, bulk_in: CouponBulkGenerate, batch_size: int = 1000
+) -> List[str]:
+    """Generate and insert a campaign of coupons in multi-row batches, returning the codes"""
+    template = {
+        "name": bulk_in.name,
+        "description": bulk_in.description,
+        "type": bulk_in.discount_type.value,
+        "value": bulk_in.discount_value,
+        "minimum_order_amount": bulk_in.minimum_order_amount,
+        "maximum_discount_amount": bulk_in.maximum_discount_amount,
+        "usage_limit": bulk_in.usage_limit,
+        "user_usage_limit": bulk_in.usage_limit_per_user,
+        "current_usage": 0,
+        "applicable_categories": bulk_in.applicable_categories,
+        "applicable_products": bulk_in.applicable_products,
+        "valid_from": bulk_in.valid_from,
+        "valid_until": bulk_in.valid_until,
+        "is_active": bulk_in.is_active,
+        "is_public": bulk_in.is_public,
+    }
+    
+    pending = generate_codes(bulk_in.count, bulk_in.code_length, bulk_in.prefix)
+    generated = set(pending)
+    codes: List[str] = []
+    try:
+        while pending:
+            batch, pending = pending[:batch_size], pending[batch_size:]
+            existing = {
+                code for (code,) in db.query(Coupon.code).filter(Coupon.code.in_(batch))
+            }
+            if existing:
+                # Replace codes that collide with earlier campaigns
+                batch = [code for code in batch if code not in existing]
+                pending.extend(generate_codes(
+                    len(existing), bulk_in.code_length, bulk_in.prefix, exclude=generated
+                ))
+                generated.update(pending[-len(existing):])
+            
+            now = datetime.utcnow()
+            db.execute(insert(Coupon), [
+                {"id": str(uuid.uuid4()), "code": code, "created_at": now, "updated_at": now, **template}
+                for code in batch
+            ])
+            codes.extend(batch)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    # New codes may have been cached as missing
+    coupon_cache.invalidate()
+    return codes
+
+
 def update_coupon(
     db: Session, 
     db_coupon: Coupon, 
     coupon_in: Union[CouponUpdate, Dict[str, Any]]
 ) -> Coupon:
     """Update coupon"""
+    old_code = db_coupon.code
     if isinstance(coupon_in, dict):
         update_data = coupon_in
     else:
@@ -80,6 +152,8 @@ def update_coupon(
             
     db.add(db_coupon)
     db.commit()
+    coupon_cache.invalidate(old_code)
+    coupon_cache.invalidate(db_coupon.code)
     db.refresh(db_coupon)
     return db_coupon
 
@@ -91,8 +165,10 @@ def delete_coupon(db: Session, coupon_id: str) -> bool:
         if not coupon:
             return False
         
+        code = coupon.code
         db.delete(coupon)
         db.commit()
+        coupon_cache.invalidate(code)
         return True
     except Exception:
         db.rollback()
@@ -106,7 +182,7 @@ def validate_coupon_code(
     cart_total: float
 ) -> Dict[str, Any]:
     """Validate coupon code and return discount information"""
-    coupon = get_coupon_by_code(db, code)
+    coupon = get_coupon_by_code_cached(db, code)
     if not coupon:
         return {"valid": False, "message": "Invalid coupon code"}
     
@@ -116,6 +192,9 @@ def validate_coupon_code(
     if not is_valid:
         return {"valid": False, "message": message}
     
+    if not user_can_redeem(db, coupon, user_id):
+        return {"valid": False, "message": "You have already used this coupon"}
+    
     # Calculate discount
     discount_amount = coupon.calculate_discount(cart_total)
     
@@ -131,3 +210,58 @@ def validate_coupon_code(
             "discount_value": coupon.discount_value
         }
     }
+
+
+def user_can_redeem(db: Session, coupon: Coupon, user_id: str) -> bool:
+    """Check the coupon's per-user usage limit"""
+    if not coupon.user_usage_limit:
+        return True
+    return get_user_redemption_count(db, coupon.id, user_id) < coupon.user_usage_limit
+
+
+def claim_coupon_usage(db: Session, coupon_id: str, user_id: str, order_id: str) -> bool:
+    """Atomically claim one use of a coupon for an order (caller commits or rolls back)"""
+    now = datetime.utcnow()
+    claimed = db.query(Coupon).filter(
+        Coupon.id == coupon_id,
+        Coupon.is_active == True,
+        Coupon.valid_from <= now,
+        Coupon.valid_until >= now,
+        or_(Coupon.usage_limit.is_(None), Coupon.current_usage < Coupon.usage_limit)
+    ).update(
+        {Coupon.current_usage: Coupon.current_usage + 1},
+        synchronize_session=False
+    )
+    if not claimed:
+        return False
+    
+    # The UPDATE holds the coupon row lock until commit, so concurrent
+    # claims for the same coupon count redemptions one at a time
+    limit = db.query(Coupon.user_usage_limit).filter(Coupon.id == coupon_id).scalar()
+    if limit and get_user_redemption_count(db, coupon_id, user_id) >= limit:
+        return False
+    
+    db.add(CouponRedemption(
+        id=str(uuid.uuid4()),
+        coupon_id=coupon_id,
+        user_id=user_id,
+        order_id=order_id,
+    ))
+    return True
+
+
+def release_coupon_usage(db: Session, order_id: str) -> int:
+    """Give back the coupon uses claimed by an order (caller commits)"""
+    redemptions = db.query(CouponRedemption).filter(
+        CouponRedemption.order_id == order_id
+    ).all()
+    for redemption in redemptions:
+        db.query(Coupon).filter(
+            Coupon.id == redemption.coupon_id,
+            Coupon.current_usage > 0
+        ).update(
+            {Coupon.current_usage: Coupon.current_usage - 1},
+            synchronize_session=False
+        )
+        db.delete(redemption)
+    return len(redemptions)
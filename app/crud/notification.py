@@ -1,10 +1,14 @@
 from typing import Any, Dict, Optional, Union, List
 import uuid
+from collections import Counter
 from datetime import datetime
+from sqlalchemy import bindparam, case, func, insert, literal, select, update
 from sqlalchemy.orm import Session
 
-from app.models.notification import Notification
+from app.db.dialects import copy_rows, is_postgres, upsert
+from app.models.notification import Notification, NotificationCounter
 from app.schemas.notification import NotificationCreate
+from app.services.notification_broker import notification_event, publish_after_commit
 
 
 def get_notification(db: Session, notification_id: str) -> Optional[Notification]:
@@ -28,6 +32,34 @@ def get_user_notifications(
     return query.order_by(Notification.created_at.desc()).offset(skip).limit(limit).all()
 
 
+def _adjust_unread_counts(db: Session, deltas: Dict[str, int]) -> None:
+    """Atomically add per-user deltas to the unread counters (caller commits)"""
+    now = datetime.utcnow()
+    # Sorted so concurrent multi-user updates lock counter rows in one order
+    rows = [
+        {"user_id": user_id, "initial": max(delta, 0), "delta": delta, "now": now}
+        for user_id, delta in sorted(deltas.items()) if delta
+    ]
+    if not rows:
+        return
+
+    new_count = NotificationCounter.__table__.c.unread_count + bindparam("delta")
+    # Core table insert: the ORM bulk path would drop the non-column keys
+    stmt = upsert(db, NotificationCounter.__table__).values(
+        user_id=bindparam("user_id"),
+        unread_count=bindparam("initial"),
+        updated_at=bindparam("now"),
+    ).on_conflict_do_update(
+        index_elements=[NotificationCounter.user_id],
+        set_={
+            # Never go negative; drift is repaired by reconciliation
+            "unread_count": case((new_count < 0, 0), else_=new_count),
+            "updated_at": bindparam("now"),
+        },
+    )
+    db.execute(stmt, rows)
+
+
 def create_notification(db: Session, notification_in: NotificationCreate) -> Optional[Notification]:
     """Create new notification"""
     try:
@@ -39,10 +71,12 @@ def create_notification(db: Session, notification_in: NotificationCreate) -> Opt
             message=notification_in.message,
             type=notification_in.type,
             data=notification_in.data,
-            channels=notification_in.channels,
             is_read=False,
         )
         db.add(db_notification)
+        db.flush()
+        _adjust_unread_counts(db, {db_notification.user_id: 1})
+        publish_after_commit(db, db_notification.user_id, notification_event(db_notification))
         db.commit()
         db.refresh(db_notification)
         return db_notification
@@ -51,6 +85,75 @@ def create_notification(db: Session, notification_in: NotificationCreate) -> Opt
         return None
 
 
+def bulk_create_notifications(db: Session, notifications_in: List[NotificationCreate]) -> int:
+    """Insert many notifications in one statement (caller commits)"""
+    if not notifications_in:
+        return 0
+
+    now = datetime.utcnow()
+    rows = [
+        {
+            "id": str(uuid.uuid4()),
+            "user_id": notification_in.user_id,
+            "title": notification_in.title,
+            "message": notification_in.message,
+            "type": notification_in.type,
+            "data": notification_in.data,
+            "is_read": False,
+            "created_at": now,
+        }
+        for notification_in in notifications_in
+    ]
+    db.execute(insert(Notification), rows)
+    _adjust_unread_counts(db, Counter(row["user_id"] for row in rows))
+    for row in rows:
+        publish_after_commit(db, row["user_id"], notification_event(row))
+    return len(rows)
+
+
+def broadcast_notification_batch(
+    db: Session,
+    user_ids: List[str],
+    title: str,
+    message: str,
+    notification_type: str,
+    data: Optional[Dict[str, Any]] = None,
+) -> int:
+    """Insert the same notification for many users, COPY on PostgreSQL (caller commits)"""
+    if not user_ids:
+        return 0
+
+    now = datetime.utcnow()
+    # COPY skips column defaults, so every column is sent explicitly
+    rows = [
+        {
+            "id": str(uuid.uuid4()),
+            "user_id": user_id,
+            "title": title,
+            "message": message,
+            "type": notification_type,
+            "data": data,
+            "is_read": False,
+            "is_sent": False,
+            "sent_email": False,
+            "sent_push": False,
+            "sent_sms": False,
+            "created_at": now,
+        }
+        for user_id in user_ids
+    ]
+    if is_postgres(db):
+        columns = list(rows[0])
+        copy_rows(db, Notification.__tablename__, columns, ([row[name] for name in columns] for row in rows))
+    else:
+        db.execute(insert(Notification), rows)
+
+    _adjust_unread_counts(db, {user_id: 1 for user_id in user_ids})
+    for row in rows:
+        publish_after_commit(db, row["user_id"], notification_event(row), local_only=True)
+    return len(rows)
+
+
 def mark_notification_as_read(db: Session, notification_id: str) -> bool:
     """Mark notification as read"""
     try:
@@ -58,9 +161,16 @@ def mark_notification_as_read(db: Session, notification_id: str) -> bool:
         if not notification:
             return False
         
-        notification.is_read = True
-        notification.read_at = datetime.utcnow()
-        db.add(notification)
+        # Conditional update so concurrent requests decrement only once
+        updated = db.query(Notification).filter(
+            Notification.id == notification_id,
+            Notification.is_read == False
+        ).update({
+            "is_read": True,
+            "read_at": datetime.utcnow()
+        }, synchronize_session="fetch")
+        if updated:
+            _adjust_unread_counts(db, {notification.user_id: -updated})
         db.commit()
         return True
     except Exception:
@@ -71,13 +181,16 @@ def mark_notification_as_read(db: Session, notification_id: str) -> bool:
 def mark_all_notifications_as_read(db: Session, user_id: str) -> bool:
     """Mark all user notifications as read"""
     try:
-        db.query(Notification).filter(
+        updated = db.query(Notification).filter(
             Notification.user_id == user_id,
             Notification.is_read == False
         ).update({
             "is_read": True,
             "read_at": datetime.utcnow()
-        })
+        }, synchronize_session=False)
+        # Subtract what was actually marked rather than zeroing, so
+        # notifications created concurrently keep their count
+        _adjust_unread_counts(db, {user_id: -updated})
         db.commit()
         return True
     except Exception:
@@ -92,7 +205,15 @@ def delete_notification(db: Session, notification_id: str) -> bool:
         if not notification:
             return False
         
-        db.delete(notification)
+        user_id = notification.user_id
+        unread_deleted = db.query(Notification).filter(
+            Notification.id == notification_id,
+            Notification.is_read == False
+        ).delete(synchronize_session="fetch")
+        if unread_deleted:
+            _adjust_unread_counts(db, {user_id: -unread_deleted})
+        else:
+            db.delete(notification)
         db.commit()
         return True
     except Exception:
@@ -102,7 +223,74 @@ def delete_notification(db: Session, notification_id: str) -> bool:
 
 def get_unread_count(db: Session, user_id: str) -> int:
     """Get count of unread notifications for user"""
-    return db.query(Notification).filter(
-        Notification.user_id == user_id,
-        Notification.is_read == False
-    ).count()
+    counter = db.get(NotificationCounter, user_id)
+    return counter.unread_count if counter else 0
+
+
+def _reconcile_counter_batch(db: Session, user_ids: List[str], now: datetime) -> int:
+    """Correct the counters of a few users, holding their counter rows locked (commits)"""
+    counters = NotificationCounter.__table__
+    # Create missing counters first, so they are locked along with the rest
+    unread_users = select(Notification.user_id, literal(0), literal(now)).where(
+        Notification.is_read == False, Notification.user_id.in_(user_ids)
+    ).distinct()
+    db.execute(
+        upsert(db, counters).from_select(["user_id", "unread_count", "updated_at"], unread_users)
+        .on_conflict_do_nothing(index_elements=["user_id"])
+    )
+    # Notification writes adjust the counter after changing notifications, so
+    # once the rows are locked they wait for this transaction, and anything
+    # they committed before is seen by the count below
+    stored = dict(
+        db.query(NotificationCounter.user_id, NotificationCounter.unread_count)
+        .filter(NotificationCounter.user_id.in_(user_ids))
+        .order_by(NotificationCounter.user_id)
+        .with_for_update()
+        .all()
+    )
+    actual = dict(
+        db.query(Notification.user_id, func.count(Notification.id))
+        .filter(Notification.is_read == False, Notification.user_id.in_(user_ids))
+        .group_by(Notification.user_id)
+        .all()
+    )
+
+    rows = [
+        {"counter_user_id": user_id, "actual": actual.get(user_id, 0)}
+        for user_id, unread_count in stored.items()
+        if actual.get(user_id, 0) != unread_count
+    ]
+    if rows:
+        db.execute(
+            update(counters)
+            .where(counters.c.user_id == bindparam("counter_user_id"))
+            .values(unread_count=bindparam("actual"), updated_at=now),
+            rows,
+        )
+    db.commit()
+    return len(rows)
+
+
+def reconcile_unread_counters(
+    db: Session, user_ids: Optional[List[str]] = None, batch_size: int = 1000
+) -> int:
+    """
+    Recompute unread counters from the notification table, returning how many were corrected
+
+    Users are reconciled batch_size at a time, each batch in its own short
+    transaction with its counter rows locked, so concurrent notification
+    writes are neither lost nor blocked for long.
+    """
+    if user_ids is None:
+        user_ids = {user_id for user_id, in db.query(NotificationCounter.user_id)}
+        user_ids.update(
+            user_id for user_id, in db.query(Notification.user_id).filter(Notification.is_read == False).distinct()
+        )
+        db.commit()
+    user_ids = sorted(set(user_ids))
+
+    now = datetime.utcnow()
+    return sum(
+        _reconcile_counter_batch(db, user_ids[start:start + batch_size], now)
+        for start in range(0, len(user_ids), batch_size)
+    )
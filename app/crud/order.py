@@ -1,20 +1,41 @@
 from typing import Any, Dict, Optional, Union, List
 import uuid
-from datetime import datetime
-from sqlalchemy.orm import Session
+from datetime import date, datetime, time, timedelta
+from sqlalchemy.orm import Query, Session
 from sqlalchemy import and_
 
 from app.models.order import Order, OrderItem, OrderStatusHistory
-from app.models.cart import CartItem
+from app.models.cart import CartCoupon, CartItem
 from app.models.address import Address
+from app.models.user import User
 from app.schemas.order import OrderCreate, OrderStatus
-from app.crud.cart import get_user_cart_items, clear_user_cart
+from app.crud.cart import get_user_cart_items
+from app.crud.coupon import claim_coupon_usage, release_coupon_usage
+from app.crud.outbox import add_outbox_event
+from app.services.cart_pricing import get_cart_pricing, invalidate_cart_pricing
+from app.services.product_counters import product_counters
+from app.services.trending import trending
+
+
+def _order_event_payload(order: Order, **extra: Any) -> Dict[str, Any]:
+    """Build the outbox payload shared by all order events"""
+    payload = {
+        "order_id": order.id,
+        "order_number": order.order_number,
+        "user_id": order.user_id,
+        "status": order.status,
+        "total_amount": order.total_amount,
+        "created_at": order.created_at.isoformat() if order.created_at else None,
+    }
+    payload.update(extra)
+    return payload
 
 
 def generate_order_number() -> str:
     """Generate unique order number"""
     timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-    return f"ORD-{timestamp}"
+    # The random suffix keeps orders placed in the same second apart
+    return f"ORD-{timestamp}-{uuid.uuid4().hex[:6].upper()}"
 
 
 def get_order(db: Session, order_id: str) -> Optional[Order]:
@@ -53,6 +74,31 @@ def get_all_orders(
     return query.order_by(Order.created_at.desc()).offset(skip).limit(limit).all()
 
 
+def query_orders_for_export(
+    db: Session,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    statuses: Optional[List[str]] = None,
+) -> Query:
+    """Build a query of order rows for export, placed between two dates (inclusive)"""
+    query = db.query(
+        Order.id, Order.order_number, Order.status, Order.user_id,
+        User.email.label("customer_email"),
+        Order.subtotal, Order.tax_amount, Order.delivery_fee, Order.discount_amount,
+        Order.total_amount, Order.discount_code, Order.tracking_number,
+        Order.created_at, Order.confirmed_at, Order.delivered_at, Order.cancelled_at,
+    ).outerjoin(User, User.id == Order.user_id)
+    
+    if start:
+        query = query.filter(Order.created_at >= datetime.combine(start, time.min))
+    if end:
+        query = query.filter(Order.created_at < datetime.combine(end + timedelta(days=1), time.min))
+    if statuses:
+        query = query.filter(Order.status.in_(statuses))
+    
+    return query.order_by(Order.created_at, Order.id)
+
+
 def create_order(db: Session, user_id: str, order_in: OrderCreate) -> Optional[Order]:
     """Create new order from user's cart"""
     try:
@@ -80,12 +126,8 @@ def create_order(db: Session, user_id: str, order_in: OrderCreate) -> Optional[O
             if not billing_address:
                 return None
         
-        # Calculate totals
-        subtotal = sum(item.total_price for item in cart_items)
-        tax_amount = subtotal * 0.08  # 8% tax (configurable)
-        shipping_cost = 5.99 if subtotal < 50 else 0  # Free shipping over $50
-        discount_amount = 0.0  # TODO: Apply discount codes
-        total_amount = subtotal + tax_amount + shipping_cost - discount_amount
+        # Reuse the cart's priced totals (cached unless the cart changed)
+        pricing = get_cart_pricing(db, user_id, cart_items)
         
         # Create order
         order_id = str(uuid.uuid4())
@@ -101,17 +143,21 @@ def create_order(db: Session, user_id: str, order_in: OrderCreate) -> Optional[O
             status=OrderStatus.PENDING,
             delivery_address_id=order_in.shipping_address_id,  # Use delivery_address_id (actual column)
             billing_address_id=billing_addr_id,  # Default to shipping address if not provided
-            subtotal=subtotal,
-            tax_amount=tax_amount,
-            delivery_fee=shipping_cost,  # Use delivery_fee (actual column)
-            discount_amount=discount_amount,
-            total_amount=total_amount,
+            subtotal=pricing.subtotal,
+            tax_amount=pricing.tax_amount,
+            delivery_fee=pricing.delivery_fee,  # Use delivery_fee (actual column)
+            discount_amount=pricing.discount_amount,
+            total_amount=pricing.order_total,
+            discount_code=pricing.discount_code,
+            discount_type=pricing.discount_type,
+            discount_value=pricing.discount_value,
             notes=order_in.notes,
         )
         db.add(db_order)
         db.flush()  # Get the order ID
         
         # Create order items from cart items
+        event_items = []
         for cart_item in cart_items:
             order_item_id = str(uuid.uuid4())
             # Get product details for snapshot
@@ -131,6 +177,11 @@ def create_order(db: Session, user_id: str, order_in: OrderCreate) -> Optional[O
                 product_unit=product.unit if product and hasattr(product, 'unit') else None,
             )
             db.add(db_order_item)
+            event_items.append({
+                "product_id": cart_item.product_id,
+                "quantity": cart_item.quantity,
+                "unit_price": cart_item.price_at_time,
+            })
         
         # Create initial status history
         status_history_id = str(uuid.uuid4())
@@ -142,10 +193,33 @@ def create_order(db: Session, user_id: str, order_in: OrderCreate) -> Optional[O
         )
         db.add(db_status_history)
         
-        # Clear user's cart
-        clear_user_cart(db, user_id)
+        # Publish through the outbox in the same transaction
+        add_outbox_event(
+            db, "order", order_id, "order.created",
+            _order_event_payload(db_order, items=event_items)
+        )
+        
+        # Claim the coupon last: the claim locks its row until commit
+        if pricing.coupon_id and not claim_coupon_usage(
+            db, pricing.coupon_id, user_id, order_id
+        ):
+            db.rollback()
+            print(f"❌ Coupon {pricing.discount_code} is no longer available")
+            return None
+        
+        # Clear user's cart and the coupon applied to it in the order's
+        # transaction, so the order and the emptied cart commit together
+        db.query(CartCoupon).filter(CartCoupon.user_id == user_id).delete()
+        db.query(CartItem).filter(CartItem.user_id == user_id).delete()
         
         db.commit()
+        invalidate_cart_pricing(user_id)
+        # Count the sale only once the order is persisted
+        purchases: Dict[str, int] = {}
+        for item in event_items:
+            purchases[item["product_id"]] = purchases.get(item["product_id"], 0) + item["quantity"]
+        product_counters.record_purchases(purchases)
+        trending.record_sales(purchases)
         db.refresh(db_order)
         return db_order
         
@@ -184,6 +258,14 @@ def update_order_status(
         )
         db.add(db_status_history)
         
+        if new_status == OrderStatus.CANCELLED and old_status != OrderStatus.CANCELLED:
+            release_coupon_usage(db, order_id)
+        
+        add_outbox_event(
+            db, "order", order_id, "order.status_changed",
+            _order_event_payload(order, old_status=old_status)
+        )
+        
         db.commit()
         db.refresh(order)
         return order
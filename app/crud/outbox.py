@@ -0,0 +1,92 @@
+from typing import Any, Dict, Optional, List
+import uuid
+from datetime import datetime
+from sqlalchemy.orm import Session
+
+from app.models.outbox import OutboxEvent
+
+
+def add_outbox_event(
+    db: Session,
+    aggregate_type: str,
+    aggregate_id: str,
+    event_type: str,
+    payload: Optional[Dict[str, Any]] = None
+) -> OutboxEvent:
+    """Stage an outbox event in the caller's transaction (caller commits)"""
+    db_event = OutboxEvent(
+        id=str(uuid.uuid4()),
+        aggregate_type=aggregate_type,
+        aggregate_id=aggregate_id,
+        event_type=event_type,
+        payload=payload,
+        attempts=0,
+    )
+    db.add(db_event)
+    return db_event
+
+
+def get_pending_outbox_events(
+    db: Session,
+    limit: int = 500,
+    event_ids: Optional[List[str]] = None
+) -> List[OutboxEvent]:
+    """Get the oldest undelivered events (optionally only event_ids), locking them on PostgreSQL"""
+    query = db.query(OutboxEvent).filter(
+        OutboxEvent.processed_at.is_(None)
+    )
+    if event_ids is not None:
+        query = query.filter(OutboxEvent.id.in_(event_ids))
+    query = query.order_by(OutboxEvent.created_at).limit(limit)
+
+    # Let several relays (one per worker) drain concurrently without
+    # handing the same event to two of them
+    if db.get_bind().dialect.name == "postgresql":
+        query = query.with_for_update(skip_locked=True)
+
+    return query.all()
+
+
+def mark_outbox_events_processed(db: Session, event_ids: List[str]) -> None:
+    """Mark events as delivered (caller commits)"""
+    if not event_ids:
+        return
+    db.query(OutboxEvent).filter(OutboxEvent.id.in_(event_ids)).update(
+        {"processed_at": datetime.utcnow()}, synchronize_session=False
+    )
+
+
+def record_outbox_failure(
+    db: Session,
+    event_ids: List[str],
+    error: str,
+    max_attempts: int
+) -> List[str]:
+    """Record a failed delivery attempt and dead-letter exhausted events, returning their IDs"""
+    if not event_ids:
+        return []
+    try:
+        db.query(OutboxEvent).filter(OutboxEvent.id.in_(event_ids)).update(
+            {
+                "attempts": OutboxEvent.attempts + 1,
+                "last_error": error,
+            },
+            synchronize_session=False
+        )
+        # Give up on events that keep failing so they stop blocking the queue;
+        # they stay in the table with last_error set for inspection
+        dead_lettered = [
+            event_id for event_id, in db.query(OutboxEvent.id).filter(
+                OutboxEvent.id.in_(event_ids),
+                OutboxEvent.attempts >= max_attempts
+            )
+        ]
+        if dead_lettered:
+            db.query(OutboxEvent).filter(OutboxEvent.id.in_(dead_lettered)).update(
+                {"processed_at": datetime.utcnow()}, synchronize_session=False
+            )
+        db.commit()
+        return dead_lettered
+    except Exception:
+        db.rollback()
+        raise
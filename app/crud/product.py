@@ -1,10 +1,19 @@
-from typing import Any, Dict, Optional, Union, List
+from typing import Any, Dict, Optional, Union, List, Tuple
 import uuid
+from collections import defaultdict
+from datetime import datetime
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import or_, and_
+from sqlalchemy import (
+    Boolean, Float, Integer, String, or_, and_, bindparam, case, cast, column, func, select,
+    table, text, values
+)
 
-from app.models.product import Product
+from app.db.dialects import copy_rows, is_postgres, upsert
+from app.models.category import Category
+from app.models.product import Product, ProductRecommendation
 from app.schemas.product import ProductCreate, ProductUpdate
+from app.services.category_tree import get_category_tree, invalidate_category_tree
+from app.services.trending import trending
 
 
 def get_product(db: Session, product_id: str) -> Optional[Product]:
@@ -30,7 +39,11 @@ def get_products(
     
     if filters:
         if filters.get("category"):
-            query = query.filter(Product.category_id == filters["category"])
+            if filters.get("include_subcategories"):
+                category_ids = get_category_tree(db).descendant_ids(filters["category"], active_only=True)
+                query = query.filter(Product.category_id.in_(category_ids))
+            else:
+                query = query.filter(Product.category_id == filters["category"])
         
         if filters.get("search"):
             search_term = f"%{filters['search']}%"
@@ -67,6 +80,12 @@ def get_products(
         query = query.order_by(Product.rating_average.desc())
     elif sort_by == "newest":
         query = query.order_by(Product.created_at.desc())
+    elif sort_by == "popular":
+        query = query.order_by(
+            Product.purchase_count.desc().nulls_last(),
+            Product.view_count.desc().nulls_last(),
+            Product.name.asc(),
+        )
     else:  # name
         if sort_order == "desc":
             query = query.order_by(Product.name.desc())
@@ -83,15 +102,45 @@ def get_featured_products(db: Session, limit: int = 10) -> List[Product]:
     ).limit(limit).all()
 
 
-def get_related_products(db: Session, product: Product, limit: int = 6) -> List[Product]:
-    """Get related products based on category"""
-    return db.query(Product).options(joinedload(Product.category)).filter(
-        and_(
-            Product.category_id == product.category_id,
-            Product.id != product.id,
-            Product.is_active == True
+def get_products_by_ids(db: Session, product_ids: List[str]) -> List[Product]:
+    """Get active products by ID, in the given order"""
+    if not product_ids:
+        return []
+    found = {
+        product.id: product
+        for product in db.query(Product).options(joinedload(Product.category)).filter(
+            Product.id.in_(product_ids), Product.is_active == True
         )
-    ).limit(limit).all()
+    }
+    return [found[product_id] for product_id in product_ids if product_id in found]
+
+
+def get_trending_products(db: Session, window: str = "24h", limit: int = 10) -> List[Product]:
+    """Get the best selling active products over a sliding window"""
+    if not trending.loaded:
+        trending.reload(db)
+    # Over-fetch so inactive products do not leave the list short
+    ranked = trending.top(window, limit * 2)
+    return get_products_by_ids(db, [product_id for product_id, _ in ranked])[:limit]
+
+
+def get_related_products(db: Session, product: Product, limit: int = 6) -> List[Product]:
+    """Get related products, ranked by co-purchases and topped up with category best sellers"""
+    related: List[Product] = []
+    recommendation = db.get(ProductRecommendation, product.id)
+    if recommendation and recommendation.related_product_ids:
+        related = get_products_by_ids(db, recommendation.related_product_ids)[:limit]
+
+    if len(related) < limit:
+        exclude_ids = [product.id] + [related_product.id for related_product in related]
+        related += db.query(Product).options(joinedload(Product.category)).filter(
+            and_(
+                Product.category_id == product.category_id,
+                Product.id.notin_(exclude_ids),
+                Product.is_active == True
+            )
+        ).order_by(Product.purchase_count.desc().nulls_last(), Product.id).limit(limit - len(related)).all()
+    return related
 
 
 def search_products(
@@ -120,6 +169,47 @@ def search_products(
     return db_query.offset(skip).limit(limit).all()
 
 
+def _count_key(product: Product) -> Tuple[Optional[str], bool]:
+    """Get what a product contributes to the category counts"""
+    return product.category_id, bool(product.is_active)
+
+
+def _adjust_category_counts(
+    db: Session,
+    before: Optional[Tuple[Optional[str], bool]],
+    after: Optional[Tuple[Optional[str], bool]],
+) -> bool:
+    """Atomically move a product's contribution between category counts (caller commits)"""
+    if before == after:
+        return False
+    deltas: Dict[str, List[int]] = defaultdict(lambda: [0, 0])
+    for key, sign in ((before, -1), (after, 1)):
+        if key is None or key[0] is None:
+            continue
+        category_id, is_active = key
+        deltas[category_id][0] += sign
+        deltas[category_id][1] += sign if is_active else 0
+
+    # Sorted so concurrent moves lock category rows in one order
+    rows = [
+        {"category_key": category_id, "total": total, "active": active}
+        for category_id, (total, active) in sorted(deltas.items()) if total or active
+    ]
+    if not rows:
+        return False
+    table = Category.__table__
+    db.execute(
+        table.update()
+        .where(table.c.id == bindparam("category_key"))
+        .values(
+            product_count=table.c.product_count + bindparam("total"),
+            active_product_count=table.c.active_product_count + bindparam("active"),
+        ),
+        rows,
+    )
+    return True
+
+
 def create_product(db: Session, product_in: ProductCreate) -> Product:
     """Create new product"""
     product_id = str(uuid.uuid4())
@@ -160,7 +250,9 @@ def create_product(db: Session, product_in: ProductCreate) -> Product:
         rating_count=0,
     )
     db.add(db_product)
+    _adjust_category_counts(db, None, _count_key(db_product))
     db.commit()
+    invalidate_category_tree()
     db.refresh(db_product)
     return db_product
 
@@ -176,13 +268,17 @@ def update_product(
     else:
         update_data = product_in.dict(exclude_unset=True)
     
+    before = _count_key(db_product)
     # Update product attributes
     for field in update_data:
         if hasattr(db_product, field):
             setattr(db_product, field, update_data[field])
             
     db.add(db_product)
+    counts_changed = _adjust_category_counts(db, before, _count_key(db_product))
     db.commit()
+    if counts_changed:
+        invalidate_category_tree()
     db.refresh(db_product)
     return db_product
 
@@ -203,6 +299,168 @@ def update_product_stock(
     return db_product
 
 
+def increment_product_counters(
+    db: Session,
+    increments: Dict[str, Tuple[int, int]],
+    batch_size: int = 1000,
+) -> int:
+    """Add (views, purchases) increments to many products in batched updates (caller commits)"""
+    # Sorted so concurrent flushes lock product rows in one order
+    rows = [
+        {"product_key": product_id, "views": views, "purchases": purchases}
+        for product_id, (views, purchases) in sorted(increments.items()) if views or purchases
+    ]
+    table = Product.__table__
+    # updated_at is left alone: counters are not edits to the product
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start:start + batch_size]
+        if is_postgres(db):
+            # One UPDATE ... FROM (VALUES ...) per batch
+            deltas = values(
+                column("product_key", String), column("views", Integer), column("purchases", Integer),
+                name="deltas",
+            ).data([(row["product_key"], row["views"], row["purchases"]) for row in batch])
+            db.execute(
+                table.update()
+                .where(table.c.id == deltas.c.product_key)
+                .values(
+                    view_count=func.coalesce(table.c.view_count, 0) + deltas.c.views,
+                    purchase_count=func.coalesce(table.c.purchase_count, 0) + deltas.c.purchases,
+                    updated_at=table.c.updated_at,
+                )
+            )
+        else:
+            db.execute(
+                table.update()
+                .where(table.c.id == bindparam("product_key"))
+                .values(
+                    view_count=func.coalesce(table.c.view_count, 0) + bindparam("views"),
+                    purchase_count=func.coalesce(table.c.purchase_count, 0) + bindparam("purchases"),
+                    updated_at=table.c.updated_at,
+                ),
+                batch,
+            )
+    return len(rows)
+
+
+def bulk_update_products_by_sku(
+    db: Session,
+    updates: List[Dict[str, Any]],
+    batch_size: int = 1000,
+) -> Tuple[int, List[str]]:
+    """
+    Set price, stock_quantity and in_stock on many products by SKU (caller commits)
+
+    A None value leaves that column unchanged; when a SKU repeats, its last
+    update wins. Returns the number of products updated and the SKUs that
+    matched no product.
+    """
+    by_sku = {update["sku"]: update for update in updates}
+    # Sorted so concurrent syncs lock product rows in one order
+    rows = [
+        {
+            "sku_key": sku,
+            "price": update.get("price"),
+            "stock_quantity": update.get("stock_quantity"),
+            "in_stock": update.get("in_stock"),
+        }
+        for sku, update in sorted(by_sku.items())
+    ]
+    table = Product.__table__
+    now = datetime.utcnow()
+    matched = set()
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start:start + batch_size]
+        if is_postgres(db):
+            # One UPDATE ... FROM (VALUES ...) per batch
+            changes = values(
+                column("sku_key", String), column("price", Float),
+                column("stock_quantity", Integer), column("in_stock", Boolean),
+                name="changes",
+            ).data([
+                (row["sku_key"], row["price"], row["stock_quantity"], row["in_stock"]) for row in batch
+            ])
+            # Cast, since a VALUES column that is all NULL would otherwise be text
+            result = db.execute(
+                table.update()
+                .where(table.c.sku == changes.c.sku_key)
+                .values(
+                    price=func.coalesce(cast(changes.c.price, Float), table.c.price),
+                    stock_quantity=func.coalesce(cast(changes.c.stock_quantity, Integer), table.c.stock_quantity),
+                    in_stock=func.coalesce(cast(changes.c.in_stock, Boolean), table.c.in_stock),
+                    updated_at=now,
+                )
+                .returning(table.c.sku)
+            )
+            matched.update(sku for (sku,) in result)
+        else:
+            found = {
+                sku for (sku,) in db.query(Product.sku).filter(Product.sku.in_([row["sku_key"] for row in batch]))
+            }
+            batch = [row for row in batch if row["sku_key"] in found]
+            if batch:
+                db.execute(
+                    table.update()
+                    .where(table.c.sku == bindparam("sku_key"))
+                    .values(
+                        price=func.coalesce(bindparam("price", type_=Float), table.c.price),
+                        stock_quantity=func.coalesce(bindparam("stock_quantity", type_=Integer), table.c.stock_quantity),
+                        in_stock=func.coalesce(bindparam("in_stock", type_=Boolean), table.c.in_stock),
+                        updated_at=now,
+                    ),
+                    batch,
+                )
+            matched |= found
+    return len(matched), [row["sku_key"] for row in rows if row["sku_key"] not in matched]
+
+
+def _product_insert_defaults(now: datetime) -> Dict[str, Any]:
+    """Get the column defaults a Core insert would otherwise leave NULL"""
+    defaults = {
+        product_column.name: product_column.default.arg
+        for product_column in Product.__table__.c
+        if product_column.default is not None and product_column.default.is_scalar
+    }
+    defaults.update(created_at=now, updated_at=now)
+    return defaults
+
+
+def upsert_products_by_sku(db: Session, rows: List[Dict[str, Any]], update_columns: List[str]) -> None:
+    """
+    Insert products, or update update_columns of the existing product with the same SKU (caller commits)
+
+    Every row must carry the same keys, including a new id; SKUs must be
+    distinct. PostgreSQL loads the rows with COPY into a temporary staging
+    table and upserts from it; other databases use an executemany upsert.
+    """
+    if not rows:
+        return
+    defaults = _product_insert_defaults(datetime.utcnow())
+    rows = [{**defaults, **row} for row in rows]
+    product_table = Product.__table__
+    columns = [product_column.name for product_column in product_table.c if product_column.name in rows[0]]
+
+    postgres = is_postgres(db)
+    stmt = upsert(db, product_table)
+    if postgres:
+        db.execute(text(
+            "CREATE TEMP TABLE IF NOT EXISTS product_import "
+            "(LIKE product INCLUDING DEFAULTS) ON COMMIT DELETE ROWS"
+        ))
+        copy_rows(db, "product_import", columns, ([row[name] for name in columns] for row in rows))
+        staging = table("product_import", *[column(name) for name in columns])
+        stmt = stmt.from_select(columns, select(*staging.c))
+
+    set_ = {name: stmt.excluded[name] for name in update_columns}
+    set_["updated_at"] = stmt.excluded.updated_at
+    stmt = stmt.on_conflict_do_update(index_elements=[product_table.c.sku], set_=set_)
+    if postgres:
+        db.execute(stmt)
+        db.execute(text("TRUNCATE product_import"))
+    else:
+        db.execute(stmt, rows)
+
+
 def delete_product(db: Session, product_id: str) -> bool:
     """Delete product"""
     try:
@@ -210,9 +468,46 @@ def delete_product(db: Session, product_id: str) -> bool:
         if not product:
             return False
         
+        _adjust_category_counts(db, _count_key(product), None)
         db.delete(product)
         db.commit()
+        invalidate_category_tree()
         return True
     except Exception:
         db.rollback()
         return False
+
+
+def rebuild_category_product_counts(db: Session) -> int:
+    """Recompute category product counts from the product table, returning how many were corrected"""
+    actual = {
+        category_id: (total, active or 0)
+        for category_id, total, active in db.query(
+            Product.category_id,
+            func.count(Product.id),
+            func.sum(case((Product.is_active == True, 1), else_=0)),
+        ).group_by(Product.category_id)
+    }
+    stored = {
+        category_id: (total, active)
+        for category_id, total, active in db.query(
+            Category.id, Category.product_count, Category.active_product_count
+        )
+    }
+
+    rows = []
+    for category_id in sorted(stored):
+        total, active = actual.get(category_id, (0, 0))
+        if (total, active) != stored[category_id]:
+            rows.append({"category_key": category_id, "total": total, "active": active})
+    if rows:
+        table = Category.__table__
+        db.execute(
+            table.update()
+            .where(table.c.id == bindparam("category_key"))
+            .values(product_count=bindparam("total"), active_product_count=bindparam("active")),
+            rows,
+        )
+    db.commit()
+    invalidate_category_tree()
+    return len(rows)
@@ -3,10 +3,12 @@ from app.db.base_class import Base
 from app.models.user import User
 from app.models.address import Address
 from app.models.category import Category
-from app.models.product import Product
-from app.models.cart import CartItem
+from app.models.product import Product, ProductRecommendation, ProductSalesHourly
+from app.models.cart import CartItem, CartCoupon
 from app.models.wishlist import WishlistItem
 from app.models.order import Order, OrderItem, OrderStatusHistory
 from app.models.review import Review
-from app.models.notification import Notification
-from app.models.coupon import Coupon
+from app.models.notification import Notification, NotificationCounter
+from app.models.coupon import Coupon, CouponRedemption
+from app.models.outbox import OutboxEvent
+from app.models.analytics import SalesDaily, SalesHourly, ProductSalesDaily
@@ -0,0 +1,138 @@
+"""
+Dialect helpers for set-based statements
+The app runs on PostgreSQL in production and SQLite in development/tests;
+these helpers pick the right construct for the session's bind.
+"""
+import csv
+import io
+import json
+from datetime import date, datetime
+from typing import Any, Iterable, Sequence
+
+from sqlalchemy import String, literal_column
+from sqlalchemy.orm import Session
+
+
+def dialect_name(db: Session) -> str:
+    """Get the dialect name of the session's bind"""
+    return db.get_bind().dialect.name
+
+
+def is_postgres(db: Session) -> bool:
+    """Check whether the session is bound to PostgreSQL"""
+    return dialect_name(db) == "postgresql"
+
+
+def upsert(db: Session, table: Any):
+    """
+    Get an INSERT construct supporting ON CONFLICT for the session's dialect
+
+    Args:
+        db: Database session
+        table: Model class or Table
+
+    Returns:
+        Dialect-specific Insert with on_conflict_do_update/do_nothing
+    """
+    name = dialect_name(db)
+    if name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise NotImplementedError(f"Upsert is not supported on {name}")
+    return insert(table)
+
+
+def uuid_expression(db: Session):
+    """
+    Get a SQL expression producing a random UUID string per row
+
+    Used by INSERT ... SELECT statements that must generate primary keys
+    server-side.
+    """
+    name = dialect_name(db)
+    if name == "postgresql":
+        return literal_column("gen_random_uuid()::text", String)
+    if name == "sqlite":
+        # Version 4 layout assembled from randomblob()
+        return literal_column(
+            "lower(hex(randomblob(4))) || '-' || lower(hex(randomblob(2))) || '-4' || "
+            "substr(lower(hex(randomblob(2))), 2) || '-' || "
+            "substr('89ab', 1 + (abs(random()) % 4), 1) || "
+            "substr(lower(hex(randomblob(2))), 2) || '-' || lower(hex(randomblob(6)))",
+            String,
+        )
+    raise NotImplementedError(f"UUID generation is not supported on {name}")
+
+
+# Marks NULL in COPY csv rows, so that an unquoted empty field stays an empty string
+_COPY_NULL = "\\N"
+
+
+def _copy_value(value: Any) -> Any:
+    """Encode a value for a COPY csv row"""
+    if value is None:
+        return _COPY_NULL
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (list, dict)):
+        return json.dumps(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def copy_rows(
+    db: Session,
+    table_name: str,
+    columns: Sequence[str],
+    rows: Iterable[Sequence[Any]],
+    chunk_size: int = 50000,
+) -> int:
+    """
+    Load rows into a PostgreSQL table with COPY, returning how many were sent
+
+    Rows are encoded as CSV in chunks of chunk_size, so an iterator of any
+    length is loaded in bounded memory. None becomes NULL and "" stays an
+    empty string.
+    """
+    quote = db.get_bind().dialect.identifier_preparer.quote
+    copy_sql = (
+        f"COPY {quote(table_name)} ({', '.join(quote(name) for name in columns)}) "
+        f"FROM STDIN WITH (FORMAT csv, NULL '{_COPY_NULL}')"
+    )
+    cursor = db.connection().connection.cursor()
+    count = 0
+    try:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow([_copy_value(value) for value in row])
+            count += 1
+            if count % chunk_size == 0:
+                buffer.seek(0)
+                cursor.copy_expert(copy_sql, buffer)
+                buffer.seek(0)
+                buffer.truncate()
+        if buffer.tell():
+            buffer.seek(0)
+            cursor.copy_expert(copy_sql, buffer)
+    finally:
+        cursor.close()
+    return count
+
+
+def bulk_insert(db: Session, table: Any, columns: Sequence[str], rows: Iterable[Sequence[Any]]) -> int:
+    """
+    Insert many rows as fast as the dialect allows, returning how many were inserted
+
+    COPY on PostgreSQL, executemany elsewhere. Column defaults are not
+    applied, so rows must carry every value the table needs.
+    """
+    if is_postgres(db):
+        return copy_rows(db, table.name, columns, rows)
+    rows = [dict(zip(columns, row)) for row in rows]
+    if rows:
+        db.execute(table.insert(), rows)
+    return len(rows)
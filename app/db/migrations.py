@@ -0,0 +1,157 @@
+"""
+Online migration helpers
+For schema changes on large, busy tables (product, order): index builds
+that do not block writes, and backfills that commit one bounded batch at a
+time. Called from alembic revisions; on SQLite they fall back to the plain
+operations.
+
+Both are safe to rerun, so a migration job interrupted halfway (lock
+timeout, job killed) resumes where it stopped on the next run. They can run
+for minutes on big tables, which is why migrations run as their own job
+before the app is replaced rather than at container start. Revisions that use
+them run outside a single transaction; env.py commits per migration.
+"""
+import logging
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Dict, Optional, Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+logger = logging.getLogger("alembic.online")
+
+
+def _is_postgres() -> bool:
+    return op.get_context().dialect.name == "postgresql"
+
+
+@contextmanager
+def _lock_timeout_disabled():
+    """
+    Let a concurrent build wait for older transactions to finish
+
+    It does not block writes while waiting, so the migration lock_timeout
+    (meant for DDL that does) must not abort it.
+    """
+    bind = op.get_bind()
+    previous = bind.execute(sa.text("SHOW lock_timeout")).scalar()
+    bind.execute(sa.text("SET lock_timeout = 0"))
+    try:
+        yield
+    finally:
+        bind.execute(sa.text("SELECT set_config('lock_timeout', :value, false)"), {"value": previous})
+
+
+def create_index_concurrently(
+    index_name: str,
+    table_name: str,
+    columns: Sequence[str],
+    unique: bool = False,
+    postgresql_where: Optional[str] = None,
+    sqlite_where: Optional[str] = None,
+) -> None:
+    """
+    Create an index without blocking writes to the table
+
+    On PostgreSQL this is CREATE INDEX CONCURRENTLY, run outside the
+    migration's transaction. An interrupted build leaves an INVALID index
+    behind; it is dropped and rebuilt, and a valid one is kept.
+    """
+    if not _is_postgres():
+        op.create_index(
+            index_name, table_name, columns, unique=unique,
+            sqlite_where=sa.text(sqlite_where) if sqlite_where else None,
+        )
+        return
+
+    context = op.get_context()
+    with context.autocommit_block():
+        if not context.as_sql:
+            valid = op.get_bind().execute(
+                sa.text("SELECT indisvalid FROM pg_index WHERE indexrelid = to_regclass(:name)"),
+                {"name": index_name},
+            ).scalar()
+            if valid:
+                logger.info("Index %s already exists", index_name)
+                return
+            if valid is False:
+                logger.info("Rebuilding invalid index %s", index_name)
+                op.drop_index(index_name, table_name=table_name, postgresql_concurrently=True)
+
+        started = time.monotonic()
+        with nullcontext() if context.as_sql else _lock_timeout_disabled():
+            op.create_index(
+                index_name, table_name, columns, unique=unique,
+                postgresql_where=sa.text(postgresql_where) if postgresql_where else None,
+                postgresql_concurrently=True,
+            )
+        if not context.as_sql:
+            logger.info("Built index %s in %.1fs", index_name, time.monotonic() - started)
+
+
+def drop_index_concurrently(index_name: str, table_name: str) -> None:
+    """Drop an index without blocking reads or writes to the table"""
+    if not _is_postgres():
+        op.drop_index(index_name, table_name=table_name)
+        return
+    with op.get_context().autocommit_block():
+        op.drop_index(index_name, table_name=table_name, postgresql_concurrently=True, if_exists=True)
+
+
+def backfill(
+    table_name: str,
+    values: Dict[str, str],
+    where: str,
+    key: str = "id",
+    batch_size: int = 5000,
+    pause: float = 0.1,
+) -> int:
+    """
+    Update rows in key-ordered batches, each committed on its own
+
+    Args:
+        table_name: Table to update
+        values: Column -> SQL expression to assign
+        where: SQL condition selecting rows still to update (e.g.
+            "new_column IS NULL"); a rerun then only touches what is left
+        key: Unique, indexed column to walk the table by
+        batch_size: Rows per UPDATE, which bounds how long row locks are held
+        pause: Seconds to sleep between batches, leaving room for regular
+            traffic and for replicas to keep up
+
+    Returns:
+        Number of rows updated
+    """
+    quote = op.get_context().dialect.identifier_preparer.quote
+    table, key_column = quote(table_name), quote(key)
+    assignments = ", ".join(f"{quote(column)} = {expression}" for column, expression in values.items())
+    if op.get_context().as_sql:
+        # Offline SQL scripts cannot page through keys; emit the whole update
+        op.execute(f"UPDATE {table} SET {assignments} WHERE {where}")
+        return 0
+
+    select_keys = f"SELECT {key_column} FROM {table} WHERE ({where})"
+    first_keys = sa.text(f"{select_keys} ORDER BY {key_column} LIMIT :limit")
+    next_keys = sa.text(f"{select_keys} AND {key_column} > :last ORDER BY {key_column} LIMIT :limit")
+    update = sa.text(
+        f"UPDATE {table} SET {assignments} "
+        f"WHERE {key_column} >= :first AND {key_column} <= :last AND ({where})"
+    )
+
+    with op.get_context().autocommit_block() if _is_postgres() else nullcontext():
+        bind = op.get_bind()
+        last, total = None, 0
+        while True:
+            if last is None:
+                keys = bind.execute(first_keys, {"limit": batch_size}).scalars().all()
+            else:
+                keys = bind.execute(next_keys, {"last": last, "limit": batch_size}).scalars().all()
+            if not keys:
+                break
+            total += bind.execute(update, {"first": keys[0], "last": keys[-1]}).rowcount
+            last = keys[-1]
+            logger.info("Backfilled %d rows of %s", total, table_name)
+            if pause:
+                time.sleep(pause)
+    return total
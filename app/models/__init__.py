@@ -3,10 +3,12 @@
 from .user import User
 from .address import Address
 from .category import Category
-from .product import Product
-from .cart import CartItem
+from .product import Product, ProductRecommendation, ProductSalesHourly
+from .cart import CartItem, CartCoupon
 from .wishlist import WishlistItem
 from .order import Order, OrderItem, OrderStatusHistory
 from .review import Review
-from .notification import Notification
-from .coupon import Coupon
+from .notification import Notification, NotificationCounter
+from .coupon import Coupon, CouponRedemption
+from .outbox import OutboxEvent
+from .analytics import SalesDaily, SalesHourly, ProductSalesDaily
@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, String, ForeignKey, DateTime
+from sqlalchemy import Boolean, Column, String, ForeignKey, DateTime, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
@@ -38,6 +38,11 @@ class Address(Base):
     delivery_orders = relationship("Order", foreign_keys="Order.delivery_address_id", back_populates="delivery_address")
     billing_orders = relationship("Order", foreign_keys="Order.billing_address_id", back_populates="billing_address")
     
+    __table_args__ = (
+        # Address book and default address lookups
+        Index("ix_address_user_id", "user_id"),
+    )
+    
     @property
     def full_name(self):
         """Get full name for address"""
@@ -0,0 +1,48 @@
+from sqlalchemy import Column, String, Integer, Float, ForeignKey, Date, DateTime
+from datetime import datetime
+
+from app.db.base_class import Base
+
+
+class SalesDaily(Base):
+    """
+    Sales rollup per day (UTC) of order placement
+    
+    Counts orders that are not cancelled or refunded. Maintained from order
+    events by the sales rollup consumer and rebuilt by rebuild_sales_rollups.
+    """
+    day = Column(Date, primary_key=True)
+    order_count = Column(Integer, nullable=False, default=0)
+    items_sold = Column(Integer, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0.0)  # Sum of order totals (tax and delivery included)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<SalesDaily {self.day} - {self.order_count}>"
+
+
+class SalesHourly(Base):
+    """
+    Sales rollup per hour (UTC) of order placement
+    """
+    hour = Column(DateTime, primary_key=True)  # Start of the hour
+    order_count = Column(Integer, nullable=False, default=0)
+    items_sold = Column(Integer, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0.0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<SalesHourly {self.hour} - {self.order_count}>"
+
+
+class ProductSalesDaily(Base):
+    """
+    Units sold and revenue per product per day (UTC) of order placement
+    """
+    day = Column(Date, primary_key=True)
+    product_id = Column(String, ForeignKey("product.id", ondelete="CASCADE"), primary_key=True)
+    quantity = Column(Integer, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0.0)  # Sum of line totals
+    
+    def __repr__(self):
+        return f"<ProductSalesDaily {self.day} {self.product_id} - {self.quantity}>"
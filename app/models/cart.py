@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Float, ForeignKey, DateTime
+from sqlalchemy import Column, String, Integer, Float, ForeignKey, DateTime, UniqueConstraint
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
@@ -25,6 +25,11 @@ class CartItem(Base):
     user = relationship("User", back_populates="cart_items")
     product = relationship("Product", back_populates="cart_items")
     
+    __table_args__ = (
+        # One line per product; batch adds upsert against it
+        UniqueConstraint("user_id", "product_id", name="uq_cartitem_user_product"),
+    )
+    
     @property
     def total_price(self):
         """Calculate total price for this cart item"""
@@ -32,3 +37,16 @@ class CartItem(Base):
     
     def __repr__(self):
         return f"<CartItem {self.product.name} x{self.quantity}>"
+
+
+class CartCoupon(Base):
+    """
+    Coupon applied to a user's cart
+    """
+    user_id = Column(String, ForeignKey("user.id", ondelete="CASCADE"), primary_key=True)
+    coupon_id = Column(String, ForeignKey("coupon.id", ondelete="CASCADE"), nullable=False)
+    code = Column(String, nullable=False)
+    applied_at = Column(DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<CartCoupon {self.user_id} - {self.code}>"
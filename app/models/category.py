@@ -24,6 +24,10 @@ class Category(Base):
     is_featured = Column(Boolean, default=False)
     sort_order = Column(Integer, default=0)
     
+    # Denormalized product counts, maintained by the product CRUD
+    product_count = Column(Integer, nullable=False, default=0, server_default="0")
+    active_product_count = Column(Integer, nullable=False, default=0, server_default="0")
+    
     # SEO
     meta_title = Column(String, nullable=True)
     meta_description = Column(Text, nullable=True)
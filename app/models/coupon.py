@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, String, Integer, Float, Text, DateTime, JSON
+from sqlalchemy import Boolean, Column, String, Integer, Float, Text, DateTime, JSON, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
@@ -41,6 +41,43 @@ class Coupon(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    # Aliases for schema compatibility
+    @property
+    def discount_type(self):
+        """Alias for type (for schema compatibility)"""
+        return self.type
+    
+    @discount_type.setter
+    def discount_type(self, value):
+        self.type = value
+    
+    @property
+    def discount_value(self):
+        """Alias for value (for schema compatibility)"""
+        return self.value
+    
+    @discount_value.setter
+    def discount_value(self, value):
+        self.value = value
+    
+    @property
+    def usage_limit_per_user(self):
+        """Alias for user_usage_limit (for schema compatibility)"""
+        return self.user_usage_limit
+    
+    @usage_limit_per_user.setter
+    def usage_limit_per_user(self, value):
+        self.user_usage_limit = value
+    
+    @property
+    def usage_count(self):
+        """Alias for current_usage (for schema compatibility)"""
+        return self.current_usage
+    
+    @usage_count.setter
+    def usage_count(self, value):
+        self.current_usage = value
+    
     def is_valid(self, user_id=None, cart_total=0.0):
         """Check if coupon is valid for use"""
         now = datetime.utcnow()
@@ -82,3 +119,22 @@ class Coupon(Base):
     
     def __repr__(self):
         return f"<Coupon {self.code} - {self.type} {self.value}>"
+
+
+class CouponRedemption(Base):
+    """
+    One use of a coupon by a user, recorded when an order claims it
+    """
+    id = Column(String, primary_key=True, index=True)
+    coupon_id = Column(String, ForeignKey("coupon.id", ondelete="CASCADE"), nullable=False)
+    user_id = Column(String, ForeignKey("user.id", ondelete="CASCADE"), nullable=False)
+    order_id = Column(String, ForeignKey("order.id", ondelete="CASCADE"), nullable=False, index=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        # Per-user limit checks count by (coupon_id, user_id)
+        Index("ix_couponredemption_coupon_user", "coupon_id", "user_id"),
+    )
+    
+    def __repr__(self):
+        return f"<CouponRedemption {self.coupon_id} - {self.user_id}>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, String, Text, ForeignKey, DateTime, JSON
+from sqlalchemy import Boolean, Column, String, Integer, Text, ForeignKey, DateTime, JSON, Index, text
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
@@ -37,5 +37,33 @@ class Notification(Base):
     # Relationships
     user = relationship("User", back_populates="notifications")
     
+    __table_args__ = (
+        # The notification list, newest first
+        Index("ix_notification_user_created", "user_id", "created_at"),
+        # Unread lists and mark-all-read only touch the (few) unread rows
+        Index(
+            "ix_notification_user_unread",
+            "user_id",
+            "created_at",
+            postgresql_where=text("is_read = false"),
+            sqlite_where=text("is_read = 0"),
+        ),
+    )
+    
     def __repr__(self):
         return f"<Notification {self.title} - {self.type}>"
+
+
+class NotificationCounter(Base):
+    """
+    Materialized unread notification count per user
+    
+    Maintained by the notification CRUD functions in the same transaction
+    as the notification change, and repaired by reconcile_unread_counters.
+    """
+    user_id = Column(String, ForeignKey("user.id", ondelete="CASCADE"), primary_key=True)
+    unread_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<NotificationCounter {self.user_id} - {self.unread_count}>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, String, Integer, Float, Text, ForeignKey, DateTime, JSON
+from sqlalchemy import Boolean, Column, String, Integer, Float, Text, ForeignKey, DateTime, JSON, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
@@ -69,6 +69,13 @@ class Order(Base):
     items = relationship("OrderItem", back_populates="order", cascade="all, delete-orphan")
     status_history = relationship("OrderStatusHistory", back_populates="order", cascade="all, delete-orphan")
     
+    __table_args__ = (
+        # A user's order history, newest first
+        Index("ix_order_user_created", "user_id", "created_at"),
+        # Admin listing, exports (ordered by date then id) and sales analytics
+        Index("ix_order_created", "created_at", "id"),
+    )
+    
     @property
     def item_count(self):
         """Get total number of items in order"""
@@ -116,6 +123,11 @@ class OrderItem(Base):
     order = relationship("Order", back_populates="items")
     product = relationship("Product", back_populates="order_items")
     
+    __table_args__ = (
+        # Loading an order's lines; reorder groups them by product
+        Index("ix_orderitem_order_product", "order_id", "product_id"),
+    )
+    
     def __repr__(self):
         return f"<OrderItem {self.product_name} x{self.quantity}>"
 
@@ -0,0 +1,41 @@
+from sqlalchemy import Column, String, Integer, Text, DateTime, JSON, Index, text
+from datetime import datetime
+
+from app.db.base_class import Base
+
+
+class OutboxEvent(Base):
+    """
+    Transactional outbox entry for domain events
+
+    Written in the same transaction as the state change it describes and
+    drained asynchronously by the outbox relay.
+    """
+    id = Column(String, primary_key=True, index=True)
+
+    # Event identity
+    aggregate_type = Column(String, nullable=False)  # "order"
+    aggregate_id = Column(String, nullable=False)
+    event_type = Column(String, nullable=False)  # "order.created", "order.status_changed"
+    payload = Column(JSON, nullable=True)
+
+    # Delivery tracking
+    attempts = Column(Integer, default=0)
+    last_error = Column(Text, nullable=True)
+
+    # Timestamps
+    created_at = Column(DateTime, default=datetime.utcnow)
+    processed_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        # The relay only ever scans undelivered events in creation order
+        Index(
+            "ix_outboxevent_pending",
+            "created_at",
+            postgresql_where=text("processed_at IS NULL"),
+            sqlite_where=text("processed_at IS NULL"),
+        ),
+    )
+
+    def __repr__(self):
+        return f"<OutboxEvent {self.event_type} {self.aggregate_id}>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, String, Integer, Float, Text, ForeignKey, DateTime, JSON
+from sqlalchemy import Boolean, Column, String, Integer, Float, Text, ForeignKey, DateTime, JSON, Index, text
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
@@ -70,6 +70,18 @@ class Product(Base):
     order_items = relationship("OrderItem", back_populates="product")
     reviews = relationship("Review", back_populates="product")
     
+    __table_args__ = (
+        # Category listings: active products of a category in name order
+        Index("ix_product_category_active_name", "category_id", "is_active", "name"),
+        # The featured strip reads a handful of rows out of the whole catalog
+        Index(
+            "ix_product_featured",
+            "name",
+            postgresql_where=text("is_featured = true AND is_active = true"),
+            sqlite_where=text("is_featured = 1 AND is_active = 1"),
+        ),
+    )
+    
     @property
     def is_low_stock(self):
         """Check if product is low in stock"""
@@ -84,3 +96,38 @@ class Product(Base):
     
     def __repr__(self):
         return f"<Product {self.name}>"
+
+
+class ProductRecommendation(Base):
+    """
+    Precomputed related products for a product
+    
+    Rebuilt offline from order co-purchases by the recommendations service,
+    so serving related products is a primary-key lookup.
+    """
+    product_id = Column(String, ForeignKey("product.id", ondelete="CASCADE"), primary_key=True)
+    related_product_ids = Column(JSON, nullable=False)  # Neighbor ids, most similar first
+    scores = Column(JSON, nullable=False)  # Similarity of each neighbor
+    computed_at = Column(DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<ProductRecommendation {self.product_id}>"
+
+
+class ProductSalesHourly(Base):
+    """
+    Units sold per product per hour
+    
+    Written and read back periodically by the trending service, which
+    serves trending products from in-memory hourly buckets.
+    """
+    product_id = Column(String, ForeignKey("product.id", ondelete="CASCADE"), primary_key=True)
+    hour = Column(DateTime, primary_key=True)  # Start of the hour (UTC)
+    quantity = Column(Integer, nullable=False, default=0)
+    
+    __table_args__ = (
+        Index("ix_productsaleshourly_hour", "hour"),
+    )
+    
+    def __repr__(self):
+        return f"<ProductSalesHourly {self.product_id} {self.hour} - {self.quantity}>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, String, Integer, Text, ForeignKey, DateTime
+from sqlalchemy import Boolean, Column, String, Integer, Text, ForeignKey, DateTime, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
@@ -35,5 +35,11 @@ class Review(Base):
     user = relationship("User", back_populates="reviews")
     product = relationship("Product", back_populates="reviews")
     
+    __table_args__ = (
+        # Product and user review lists, newest first; also rating recomputes
+        Index("ix_review_product_created", "product_id", "created_at"),
+        Index("ix_review_user_created", "user_id", "created_at"),
+    )
+    
     def __repr__(self):
         return f"<Review {self.product.name} - {self.rating} stars>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, ForeignKey, DateTime
+from sqlalchemy import Column, String, ForeignKey, DateTime, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
@@ -20,5 +20,10 @@ class WishlistItem(Base):
     user = relationship("User", back_populates="wishlist_items")
     product = relationship("Product", back_populates="wishlist_items")
     
+    __table_args__ = (
+        # A user's wishlist, and the per-product membership check
+        Index("ix_wishlistitem_user_product", "user_id", "product_id"),
+    )
+    
     def __repr__(self):
         return f"<WishlistItem {self.product.name}>"
@@ -0,0 +1,33 @@
+from typing import List, Union
+from pydantic import BaseModel
+from datetime import date, datetime
+
+
+class SalesTotals(BaseModel):
+    """Sales totals over a period"""
+    order_count: int
+    items_sold: int
+    revenue: float
+    average_order_value: float
+
+
+class SalesPoint(SalesTotals):
+    """Sales for one day or hour"""
+    period: Union[datetime, date]
+
+
+class SalesReport(BaseModel):
+    """Sales analytics response schema"""
+    start: date
+    end: date
+    granularity: str
+    totals: SalesTotals
+    series: List[SalesPoint]
+
+
+class TopProduct(BaseModel):
+    """Top selling product schema"""
+    product_id: str
+    product_name: str
+    quantity: int
+    revenue: float
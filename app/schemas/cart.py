@@ -1,5 +1,5 @@
 from typing import Optional, List, Dict, Any
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
 
 
@@ -14,6 +14,11 @@ class CartItemCreate(CartItemBase):
     pass
 
 
+class CartItemBatchCreate(BaseModel):
+    """Schema for adding several items to cart at once"""
+    items: List[CartItemCreate] = Field(..., min_length=1, max_length=100)
+
+
 class CartItemUpdate(BaseModel):
     """Schema for updating cart item"""
     quantity: int
@@ -45,6 +50,12 @@ class CartItemInDB(CartItemInDBBase):
     pass
 
 
+class CartItemBatchResult(BaseModel):
+    """Batch add response schema"""
+    items: List[CartItem] = []
+    rejected_product_ids: List[str] = []
+
+
 class Cart(BaseModel):
     """Shopping cart schema"""
     items: List[CartItem] = []
@@ -52,7 +63,10 @@ class Cart(BaseModel):
     subtotal: float = 0.0
     discount_amount: float = 0.0
     discount_code: Optional[str] = None
-    total: float = 0.0
+    total: float = 0.0  # Subtotal less discount
+    tax_amount: float = 0.0
+    delivery_fee: float = 0.0
+    order_total: float = 0.0  # What the order would be charged
 
     class Config:
         from_attributes = True
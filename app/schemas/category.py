@@ -52,6 +52,7 @@ class Category(CategoryInDBBase):
     """Category response schema"""
     children: Optional[List['Category']] = None
     product_count: Optional[int] = None
+    active_product_count: Optional[int] = None
 
 
 class CategoryInDB(CategoryInDBBase):
@@ -70,5 +71,21 @@ class CategorySummary(BaseModel):
         from_attributes = True
 
 
+class CategoryTreeNode(BaseModel):
+    """Category tree node schema"""
+    id: str
+    name: str
+    slug: str
+    icon: Optional[str] = None
+    image: Optional[str] = None
+    parent_id: Optional[str] = None
+    is_featured: bool = False
+    sort_order: int = 0
+    product_count: int = 0
+    active_product_count: int = 0
+    children: List['CategoryTreeNode'] = []
+
+
 # Update forward references
 Category.model_rebuild()
+CategoryTreeNode.model_rebuild()
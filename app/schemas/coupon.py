@@ -1,5 +1,5 @@
-from typing import Optional
-from pydantic import BaseModel, validator
+from typing import List, Optional
+from pydantic import BaseModel, Field, validator
 from datetime import datetime
 from enum import Enum
 
@@ -93,3 +93,35 @@ class CouponValidation(BaseModel):
     """Schema for validating coupon code"""
     code: str
     cart_total: float
+
+
+class CouponBulkGenerate(BaseModel):
+    """Schema for generating a campaign of single-use coupon codes"""
+    count: int = Field(..., ge=1, le=200000)
+    prefix: str = Field("", max_length=20)
+    code_length: int = Field(10, ge=6, le=32)  # Random part, excluding prefix
+    name: str
+    description: Optional[str] = None
+    discount_type: DiscountType
+    discount_value: float
+    minimum_order_amount: Optional[float] = None
+    maximum_discount_amount: Optional[float] = None
+    usage_limit: Optional[int] = 1
+    usage_limit_per_user: Optional[int] = 1
+    applicable_categories: Optional[List[str]] = None
+    applicable_products: Optional[List[str]] = None
+    valid_from: datetime
+    valid_until: datetime
+    is_active: bool = True
+    is_public: bool = False
+
+    @validator('discount_value')
+    def validate_discount_value(cls, v, values):
+        if v <= 0:
+            raise ValueError('Discount value must be positive')
+        
+        discount_type = values.get('discount_type')
+        if discount_type == DiscountType.PERCENTAGE and v > 100:
+            raise ValueError('Percentage discount cannot exceed 100%')
+        
+        return v
@@ -1,5 +1,5 @@
 from typing import Optional, Dict, Any
-from pydantic import BaseModel
+from pydantic import BaseModel, validator
 from datetime import datetime
 from enum import Enum
 
@@ -59,3 +59,40 @@ class NotificationInDB(NotificationInDBBase):
 class NotificationMarkRead(BaseModel):
     """Schema for marking notification as read"""
     is_read: bool = True
+
+
+class BroadcastSegment(str, Enum):
+    """Broadcast audience enum"""
+    ALL = "all"
+    ACTIVE = "active"
+    CATEGORY_PURCHASERS = "category_purchasers"
+
+
+class NotificationBroadcast(BaseModel):
+    """Schema for broadcasting a notification to a user segment"""
+    title: str
+    message: str
+    type: NotificationType = NotificationType.PROMOTION
+    data: Optional[Dict[str, Any]] = None
+    segment: BroadcastSegment = BroadcastSegment.ACTIVE
+    category_id: Optional[str] = None
+
+    @validator('category_id', always=True)
+    def validate_category_id(cls, v, values):
+        if values.get('segment') == BroadcastSegment.CATEGORY_PURCHASERS and not v:
+            raise ValueError('category_id is required for the category_purchasers segment')
+        return v
+
+
+class BroadcastJob(BaseModel):
+    """Broadcast job progress schema"""
+    id: str
+    status: str  # queued, running, completed, failed
+    segment: BroadcastSegment
+    category_id: Optional[str] = None
+    total: int = 0
+    sent: int = 0
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
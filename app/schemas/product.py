@@ -1,6 +1,7 @@
 from typing import Optional, List, Dict, Any, TYPE_CHECKING, ForwardRef
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, validator
 from datetime import datetime
+import json
 
 
 class ProductBase(BaseModel):
@@ -124,6 +125,109 @@ class ProductInDB(ProductInDBBase):
     pass
 
 
+class ProductBulkUpdateItem(BaseModel):
+    """Price and stock changes for one product, matched by SKU; omitted fields are left unchanged"""
+    sku: str
+    price: Optional[float] = None
+    stock_quantity: Optional[int] = None
+    in_stock: Optional[bool] = None
+
+    @validator('price')
+    def validate_price(cls, v):
+        if v is not None and v < 0:
+            raise ValueError('Price must not be negative')
+        return v
+
+    @validator('stock_quantity')
+    def validate_stock_quantity(cls, v):
+        if v is not None and v < 0:
+            raise ValueError('Stock quantity must not be negative')
+        return v
+
+
+class ProductBulkUpdate(BaseModel):
+    """Schema for updating the price and stock of many products at once"""
+    items: List[ProductBulkUpdateItem] = Field(..., min_length=1, max_length=10000)
+
+
+class ProductBulkUpdateResult(BaseModel):
+    """Summary of a bulk product update"""
+    received: int
+    updated: int
+    not_found: List[str] = []  # SKUs with no matching product
+
+
+class ProductImportRow(BaseModel):
+    """Schema for one row of a product import, matched to existing products by SKU"""
+    sku: str
+    name: Optional[str] = None  # name, price and a category are required for new products
+    price: Optional[float] = None
+    slug: Optional[str] = None  # Derived from name and SKU for new products
+    category_id: Optional[str] = None
+    category_slug: Optional[str] = None  # Alternative to category_id
+    description: Optional[str] = None
+    short_description: Optional[str] = None
+    original_price: Optional[float] = None
+    brand: Optional[str] = None
+    unit: Optional[str] = None
+    weight: Optional[str] = None
+    dimensions: Optional[str] = None
+    images: Optional[List[str]] = None
+    thumbnail: Optional[str] = None
+    is_organic: bool = False
+    is_featured: bool = False
+    is_on_sale: bool = False
+    is_active: bool = True
+    in_stock: bool = True
+    stock_quantity: int = 0
+    low_stock_threshold: int = 10
+    nutrition_facts: Optional[Dict[str, Any]] = None
+    ingredients: Optional[str] = None
+    allergens: Optional[List[str]] = None
+    tags: Optional[List[str]] = None
+    meta_title: Optional[str] = None
+    meta_description: Optional[str] = None
+
+    @validator('images', 'allergens', 'tags', pre=True)
+    def split_list(cls, v):
+        # CSV cells hold a JSON array or "a|b|c"
+        if isinstance(v, str):
+            return json.loads(v) if v.startswith('[') else [item.strip() for item in v.split('|') if item.strip()]
+        return v
+
+    @validator('nutrition_facts', pre=True)
+    def parse_object(cls, v):
+        return json.loads(v) if isinstance(v, str) else v
+
+    @validator('price', 'original_price')
+    def validate_price(cls, v):
+        if v is not None and v < 0:
+            raise ValueError('Price must not be negative')
+        return v
+
+    @validator('stock_quantity')
+    def validate_stock_quantity(cls, v):
+        if v < 0:
+            raise ValueError('Stock quantity must not be negative')
+        return v
+
+
+class ProductImportError(BaseModel):
+    """A rejected import row"""
+    row: int
+    sku: Optional[str] = None
+    error: str
+
+
+class ProductImportResult(BaseModel):
+    """Summary of a product import"""
+    received: int = 0
+    created: int = 0
+    updated: int = 0
+    failed: int = 0
+    errors: List[ProductImportError] = []  # Capped; failed has the total
+
+
 # Import and resolve forward references
 from app.schemas.category import CategorySummary
 Product.model_rebuild()
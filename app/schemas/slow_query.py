@@ -0,0 +1,25 @@
+from typing import Dict, List, Optional
+from pydantic import BaseModel
+from datetime import datetime
+
+
+class SlowQuery(BaseModel):
+    """Totals of one normalized statement that ran slower than the threshold"""
+    statement: str
+    calls: int
+    total_ms: float
+    mean_ms: float
+    max_ms: float
+    parameters: str
+    routes: Dict[str, int]
+    last_seen: datetime
+    plan: Optional[str] = None
+
+
+class SlowQueryReport(BaseModel):
+    """Slow query log response schema"""
+    threshold_ms: float
+    statements: int
+    dropped: int
+    explained: int = 0
+    queries: List[SlowQuery]
@@ -0,0 +1,60 @@
+"""
+Periodic background tasks
+Small thread-based runner for in-process maintenance loops (outbox relay,
+counter flushes, ...). Started and stopped from the app's lifecycle hooks.
+"""
+import logging
+import threading
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicTask:
+    """Run a callable every `interval` seconds on a daemon thread"""
+
+    def __init__(self, name: str, interval: float, func: Callable[[], None]):
+        self.name = name
+        self.interval = interval
+        self.func = func
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Start the loop (no-op if already running)"""
+        if self.is_running:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self, run_final: bool = True, timeout: float = 10.0) -> None:
+        """
+        Stop the loop
+
+        Args:
+            run_final: Run the callable one last time after stopping, so
+                buffered work is not lost on shutdown
+            timeout: Seconds to wait for the thread to exit
+        """
+        if not self.is_running:
+            return
+        self._stop_event.set()
+        self._thread.join(timeout=timeout)
+        self._thread = None
+        if run_final:
+            self._run_once()
+
+    def _run_once(self) -> None:
+        try:
+            self.func()
+        except Exception:
+            logger.exception("Background task %s failed", self.name)
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(self.interval):
+            self._run_once()
@@ -0,0 +1,142 @@
+"""
+Cart Pricing Service
+Computes cart totals, including the coupon applied to the cart, and caches
+the result per user.
+
+A cached price is reused only while the cart lines and applied coupon
+still match the fingerprint it was computed for, so a stale entry can
+never be served after a cart change, even one made by another worker. Cart
+mutations also drop the entry via invalidate_cart_pricing(). The TTL
+bounds how long coupon changes (deactivation, expiry) take to show.
+"""
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.crud.coupon import get_coupon_by_code_cached
+from app.models.cart import CartCoupon, CartItem
+from app.models.coupon import Coupon
+from app.models.product import Product
+
+Fingerprint = Tuple
+
+
+class CartPricing:
+    """Computed totals for one state of a cart"""
+
+    def __init__(
+        self,
+        fingerprint: Fingerprint,
+        subtotal: float,
+        discount_amount: float = 0.0,
+        coupon: Optional[Coupon] = None,
+    ):
+        self.fingerprint = fingerprint
+        self.subtotal = subtotal
+        self.discount_amount = discount_amount
+        self.coupon_id = coupon.id if coupon else None
+        self.discount_code = coupon.code if coupon else None
+        self.discount_type = coupon.type if coupon else None
+        self.discount_value = coupon.value if coupon else None
+
+        free_delivery = (
+            subtotal >= settings.CART_FREE_DELIVERY_THRESHOLD
+            or self.discount_type == "free_shipping"
+        )
+        self.tax_amount = subtotal * settings.CART_TAX_RATE
+        self.delivery_fee = 0.0 if free_delivery or not subtotal else settings.CART_DELIVERY_FEE
+        self.total = subtotal - discount_amount
+        self.order_total = subtotal + self.tax_amount + self.delivery_fee - discount_amount
+
+
+# Bound on cached carts; expired entries are pruned when it is reached
+_MAX_ENTRIES = 10000
+
+_cache: Dict[str, Tuple[float, CartPricing]] = {}
+_cache_lock = threading.Lock()
+
+
+def invalidate_cart_pricing(user_id: str) -> None:
+    """Drop a user's cached cart price"""
+    with _cache_lock:
+        _cache.pop(user_id, None)
+
+
+def cart_fingerprint(cart_items: List[CartItem], cart_coupon: Optional[CartCoupon]) -> Fingerprint:
+    """Identify the state of a cart that its price depends on"""
+    lines = tuple(sorted(
+        (item.id, item.product_id, item.quantity, item.price_at_time) for item in cart_items
+    ))
+    return lines, cart_coupon.coupon_id if cart_coupon else None
+
+
+def eligible_subtotal(db: Session, coupon: Coupon, cart_items: List[CartItem]) -> float:
+    """Get the subtotal of the cart lines a coupon applies to"""
+    categories = set(coupon.applicable_categories or [])
+    products = set(coupon.applicable_products or [])
+    if not categories and not products:
+        return sum(item.total_price for item in cart_items)
+
+    product_categories = {}
+    if categories:
+        product_categories = dict(
+            db.query(Product.id, Product.category_id).filter(
+                Product.id.in_({item.product_id for item in cart_items})
+            ).all()
+        )
+    return sum(
+        item.total_price for item in cart_items
+        if item.product_id in products
+        or product_categories.get(item.product_id) in categories
+    )
+
+
+def compute_cart_pricing(
+    db: Session,
+    user_id: str,
+    cart_items: List[CartItem],
+    cart_coupon: Optional[CartCoupon],
+) -> CartPricing:
+    """Price a cart without using the cache"""
+    fingerprint = cart_fingerprint(cart_items, cart_coupon)
+    subtotal = sum(item.total_price for item in cart_items)
+
+    coupon = get_coupon_by_code_cached(db, cart_coupon.code) if cart_coupon else None
+    if coupon is None or coupon.id != cart_coupon.coupon_id:
+        return CartPricing(fingerprint, subtotal)
+
+    is_valid, _ = coupon.is_valid(user_id=user_id, cart_total=subtotal)
+    if not is_valid:
+        return CartPricing(fingerprint, subtotal)
+
+    eligible = eligible_subtotal(db, coupon, cart_items)
+    if not eligible:
+        return CartPricing(fingerprint, subtotal)
+    return CartPricing(fingerprint, subtotal, coupon.calculate_discount(eligible), coupon)
+
+
+def get_cart_pricing(db: Session, user_id: str, cart_items: List[CartItem]) -> CartPricing:
+    """Get a cart's price, from the cache when the cart has not changed"""
+    cart_coupon = db.get(CartCoupon, user_id)
+    fingerprint = cart_fingerprint(cart_items, cart_coupon)
+    now = time.monotonic()
+
+    with _cache_lock:
+        cached = _cache.get(user_id)
+    if cached is not None:
+        expires_at, pricing = cached
+        if expires_at > now and pricing.fingerprint == fingerprint:
+            return pricing
+
+    pricing = compute_cart_pricing(db, user_id, cart_items, cart_coupon)
+    with _cache_lock:
+        if len(_cache) >= _MAX_ENTRIES:
+            for key in [key for key, (expires_at, _) in _cache.items() if expires_at <= now]:
+                del _cache[key]
+            if len(_cache) >= _MAX_ENTRIES:
+                _cache.clear()
+        _cache[user_id] = (now + settings.CART_PRICING_CACHE_TTL_SECONDS, pricing)
+    return pricing
@@ -0,0 +1,140 @@
+"""
+Category Tree Service
+In-memory category hierarchy built from one read of the category table.
+
+Each node carries its denormalized product counts for the category menu and
+the set of its descendant ids (itself included), so a "category and all
+subcategories" product filter is a single IN. A second set leaves out
+inactive subcategories and everything below them, for storefront listings. The tree is cached per
+process. Category and product CRUD on this worker invalidate it at once;
+other workers pick up changes when CATEGORY_TREE_CACHE_TTL_SECONDS expires.
+"""
+import threading
+import time
+from typing import Any, Dict, FrozenSet, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.category import Category
+
+_NODE_COLUMNS = (
+    "id", "name", "slug", "icon", "image", "parent_id",
+    "is_active", "is_featured", "sort_order",
+    "product_count", "active_product_count",
+)
+
+
+class CategoryNode:
+    """A category with its place in the hierarchy"""
+
+    __slots__ = _NODE_COLUMNS + ("children", "descendant_ids", "active_descendant_ids")
+
+    def __init__(self, **values: Any):
+        for column in _NODE_COLUMNS:
+            setattr(self, column, values.get(column))
+        # Columns are nullable in older rows
+        self.is_active = self.is_active is not False
+        self.is_featured = bool(self.is_featured)
+        self.sort_order = self.sort_order or 0
+        self.product_count = self.product_count or 0
+        self.active_product_count = self.active_product_count or 0
+        self.children: List["CategoryNode"] = []
+        self.descendant_ids: FrozenSet[str] = frozenset()
+        self.active_descendant_ids: FrozenSet[str] = frozenset()
+
+    def to_dict(self, active_only: bool = True) -> Dict[str, Any]:
+        data = {column: getattr(self, column) for column in _NODE_COLUMNS}
+        data["children"] = [
+            child.to_dict(active_only) for child in self.children
+            if child.is_active or not active_only
+        ]
+        return data
+
+
+class CategoryTree:
+    """The whole category hierarchy"""
+
+    def __init__(self, rows: List[Dict[str, Any]]):
+        self.nodes: Dict[str, CategoryNode] = {row["id"]: CategoryNode(**row) for row in rows}
+        self.roots: List[CategoryNode] = []
+        for node in self.nodes.values():
+            parent = self.nodes.get(node.parent_id) if node.parent_id else None
+            if parent is None or parent is node:
+                self.roots.append(node)
+            else:
+                parent.children.append(node)
+
+        sort_key = lambda node: (node.sort_order, node.name or "")
+        self.roots.sort(key=sort_key)
+        for node in self.nodes.values():
+            node.children.sort(key=sort_key)
+        self._compute_descendants()
+
+    def _compute_descendants(self) -> None:
+        # Post-order walk from each root; nodes caught in a parent cycle are
+        # unreachable from any root and keep only themselves
+        for root in self.roots:
+            stack = [(root, False)]
+            while stack:
+                node, expanded = stack.pop()
+                if expanded:
+                    ids, active_ids = {node.id}, {node.id}
+                    for child in node.children:
+                        ids.update(child.descendant_ids)
+                        if child.is_active:
+                            active_ids.update(child.active_descendant_ids)
+                    node.descendant_ids = frozenset(ids)
+                    node.active_descendant_ids = frozenset(active_ids)
+                else:
+                    stack.append((node, True))
+                    stack.extend((child, False) for child in node.children)
+        for node in self.nodes.values():
+            if not node.descendant_ids:
+                node.descendant_ids = node.active_descendant_ids = frozenset((node.id,))
+
+    def descendant_ids(self, category_id: str, active_only: bool = False) -> FrozenSet[str]:
+        """Get a category's id and all its subcategory ids, or only those reached through active ones"""
+        node = self.nodes.get(category_id)
+        if node is None:
+            return frozenset((category_id,))
+        return node.active_descendant_ids if active_only else node.descendant_ids
+
+    def to_dicts(self, active_only: bool = True) -> List[Dict[str, Any]]:
+        """Get the nested tree for serialization"""
+        return [
+            root.to_dict(active_only) for root in self.roots
+            if root.is_active or not active_only
+        ]
+
+
+def build_category_tree(db: Session) -> CategoryTree:
+    """Build the tree from one query over the category table"""
+    columns = [getattr(Category, column) for column in _NODE_COLUMNS]
+    rows = [dict(row._mapping) for row in db.query(*columns)]
+    return CategoryTree(rows)
+
+
+_tree: Optional[CategoryTree] = None
+_expires_at = 0.0
+_lock = threading.Lock()
+
+
+def get_category_tree(db: Session) -> CategoryTree:
+    """Get the cached tree, rebuilding it when stale"""
+    global _tree, _expires_at
+    tree = _tree
+    if tree is not None and _expires_at > time.monotonic():
+        return tree
+    with _lock:
+        if _tree is None or _expires_at <= time.monotonic():
+            _tree = build_category_tree(db)
+            _expires_at = time.monotonic() + settings.CATEGORY_TREE_CACHE_TTL_SECONDS
+        return _tree
+
+
+def invalidate_category_tree() -> None:
+    """Force the next get_category_tree() to rebuild"""
+    global _expires_at
+    with _lock:
+        _expires_at = 0.0
@@ -0,0 +1,85 @@
+"""
+Coupon Cache
+In-process cache of coupons by code, including misses, so a campaign code
+entered by thousands of users is read from the database once per TTL.
+
+Cached coupons are detached snapshots; get() merges them into the caller's
+session without a query, unless the session already holds that coupon: its
+state may be newer than the snapshot, so it is returned as is. The CRUD functions invalidate entries on create,
+update and delete. Other workers only see those changes once their entry
+expires, so usage limits are never enforced from the cache: orders claim
+usage with an atomic UPDATE (see claim_coupon_usage).
+"""
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from app.core.config import settings
+from app.models.coupon import Coupon
+
+# Sentinel for a code that is cached as not existing
+_MISSING = object()
+
+
+class CouponCache:
+    """TTL cache of detached Coupon snapshots keyed by code"""
+
+    def __init__(self, ttl: float, max_entries: int = 10000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: Dict[str, Tuple[float, object]] = {}
+        self._lock = threading.Lock()
+
+    def lookup(self, code: str) -> Tuple[bool, Optional[Coupon]]:
+        """Get (hit, snapshot) for a code; a hit with None means no such coupon"""
+        with self._lock:
+            entry = self._entries.get(code)
+        if entry is None or entry[0] <= time.monotonic():
+            return False, None
+        value = entry[1]
+        return True, None if value is _MISSING else value
+
+    def store(self, code: str, coupon: Optional[Coupon]) -> None:
+        """Cache a loaded coupon (or its absence) under its code"""
+        value = _snapshot(coupon) if coupon is not None else _MISSING
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                self._entries.clear()
+            self._entries[code] = (time.monotonic() + self.ttl, value)
+
+    def invalidate(self, code: Optional[str] = None) -> None:
+        """Drop one code, or everything"""
+        with self._lock:
+            if code is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(code, None)
+
+    def get(self, db: Session, code: str) -> Optional[Coupon]:
+        """Get a coupon by code, attached to db, querying only on a miss"""
+        hit, snapshot = self.lookup(code)
+        if not hit:
+            coupon = db.query(Coupon).filter(Coupon.code == code).first()
+            self.store(code, coupon)
+            return coupon
+        if snapshot is None:
+            return None
+        # Merging would overwrite the session's copy with the older snapshot
+        existing = db.identity_map.get(db.identity_key(Coupon, snapshot.id))
+        if existing is not None:
+            return existing
+        return db.merge(snapshot, load=False)
+
+
+def _snapshot(coupon: Coupon) -> Coupon:
+    """Copy a coupon's column values into a detached instance"""
+    values = {attr.key: getattr(coupon, attr.key) for attr in inspect(Coupon).column_attrs}
+    snapshot = Coupon(**values)
+    make_transient_to_detached(snapshot)
+    return snapshot
+
+
+coupon_cache = CouponCache(ttl=settings.COUPON_CACHE_TTL_SECONDS)
@@ -0,0 +1,52 @@
+"""
+Coupon Code Generation
+Random, human-friendly codes for single-use campaign coupons.
+
+Uniqueness within a run is checked against an in-memory set: 200k codes
+take a few tens of MB, and unlike a Bloom filter a set has no false
+positives to discard. Codes already in the database are filtered out by
+bulk_create_coupons.
+"""
+import csv
+import io
+import secrets
+from typing import Iterable, Iterator, List, Optional, Set
+
+# No 0/O or 1/I, so codes survive being read aloud or typed from print
+CODE_ALPHABET = "ABCDEFGHJKLMNPQRSTUVWXYZ23456789"
+
+
+def random_code(length: int, prefix: str = "") -> str:
+    """Get one random code"""
+    return prefix + "".join(secrets.choice(CODE_ALPHABET) for _ in range(length))
+
+
+def generate_codes(
+    count: int,
+    length: int,
+    prefix: str = "",
+    exclude: Optional[Set[str]] = None,
+) -> List[str]:
+    """Generate count distinct codes, none of which are in exclude"""
+    seen = set(exclude or ())
+    codes = []
+    while len(codes) < count:
+        code = random_code(length, prefix)
+        if code not in seen:
+            seen.add(code)
+            codes.append(code)
+    return codes
+
+
+def iter_codes_csv(codes: Iterable[str], chunk_size: int = 1000) -> Iterator[str]:
+    """Stream codes as CSV text in chunks"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(["code"])
+    for i, code in enumerate(codes, 1):
+        writer.writerow([code])
+        if i % chunk_size == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
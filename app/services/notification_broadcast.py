@@ -0,0 +1,168 @@
+"""
+Notification Broadcast Service
+Sends one notification to every user in a segment as a background job.
+
+Recipients are read in keyset-paginated batches of user ids and each batch
+is written with a single multi-row INSERT (COPY on PostgreSQL) plus one
+counter upsert, then committed. Jobs sleep between batches so a blast to a
+large audience does not starve regular traffic. Job progress is kept in
+process memory; it is lost on restart and only visible on the worker that
+ran the job.
+"""
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import exists, func, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.crud.notification import broadcast_notification_batch
+from app.db.session import SessionLocal
+from app.models.order import Order, OrderItem
+from app.models.product import Product
+from app.models.user import User
+from app.schemas.notification import BroadcastJob, BroadcastSegment, NotificationBroadcast
+
+logger = logging.getLogger(__name__)
+
+# Finished jobs kept for progress lookups
+_MAX_JOBS = 100
+
+_jobs: "OrderedDict[str, BroadcastJob]" = OrderedDict()
+_jobs_lock = threading.Lock()
+
+
+def _segment_filters(segment: BroadcastSegment, category_id: Optional[str]) -> List:
+    """Get the User filters selecting a broadcast segment"""
+    if segment == BroadcastSegment.ALL:
+        return []
+    if segment == BroadcastSegment.ACTIVE:
+        return [User.is_active == True]
+    if segment == BroadcastSegment.CATEGORY_PURCHASERS:
+        purchased = (
+            select(Order.id)
+            .join(OrderItem, OrderItem.order_id == Order.id)
+            .join(Product, Product.id == OrderItem.product_id)
+            .where(
+                Order.user_id == User.id,
+                Order.status != "cancelled",
+                Product.category_id == category_id,
+            )
+        )
+        return [User.is_active == True, exists(purchased)]
+    raise ValueError(f"Unknown segment: {segment}")
+
+
+def count_segment(db: Session, segment: BroadcastSegment, category_id: Optional[str] = None) -> int:
+    """Count the users in a segment"""
+    query = select(func.count(User.id)).where(*_segment_filters(segment, category_id))
+    return db.execute(query).scalar_one()
+
+
+def iter_segment_batches(
+    db: Session,
+    segment: BroadcastSegment,
+    category_id: Optional[str] = None,
+    batch_size: int = 1000,
+):
+    """Yield lists of user ids in a segment, paginated by id"""
+    filters = _segment_filters(segment, category_id)
+    last_id = None
+    while True:
+        query = select(User.id).where(*filters)
+        if last_id is not None:
+            query = query.where(User.id > last_id)
+        user_ids = list(db.execute(query.order_by(User.id).limit(batch_size)).scalars())
+        if not user_ids:
+            return
+        yield user_ids
+        last_id = user_ids[-1]
+
+
+def create_broadcast_job(broadcast: NotificationBroadcast) -> BroadcastJob:
+    """Register a queued broadcast job"""
+    job = BroadcastJob(
+        id=str(uuid.uuid4()),
+        status="queued",
+        segment=broadcast.segment,
+        category_id=broadcast.category_id,
+        created_at=datetime.utcnow(),
+    )
+    with _jobs_lock:
+        _jobs[job.id] = job
+        while len(_jobs) > _MAX_JOBS:
+            _jobs.popitem(last=False)
+    return job
+
+
+def get_broadcast_job(job_id: str) -> Optional[BroadcastJob]:
+    """Get a broadcast job by ID"""
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+        return job.model_copy() if job else None
+
+
+def _update_job(job_id: str, **changes) -> None:
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+        if job is not None:
+            for field, value in changes.items():
+                setattr(job, field, value)
+
+
+def run_broadcast(
+    job_id: str,
+    broadcast: NotificationBroadcast,
+    session_factory: Callable[[], Session] = SessionLocal,
+    batch_size: Optional[int] = None,
+    throttle_seconds: Optional[float] = None,
+) -> int:
+    """
+    Send a broadcast, committing once per batch
+
+    Batches already committed stay sent if a later batch fails; the job is
+    then marked failed with the number sent so far.
+
+    Returns:
+        Number of notifications sent
+    """
+    batch_size = batch_size or settings.NOTIFICATION_BROADCAST_BATCH_SIZE
+    if throttle_seconds is None:
+        throttle_seconds = settings.NOTIFICATION_BROADCAST_THROTTLE_SECONDS
+
+    db = session_factory()
+    sent = 0
+    try:
+        total = count_segment(db, broadcast.segment, broadcast.category_id)
+        _update_job(job_id, status="running", total=total, started_at=datetime.utcnow())
+
+        for user_ids in iter_segment_batches(
+            db, broadcast.segment, broadcast.category_id, batch_size=batch_size
+        ):
+            sent += broadcast_notification_batch(
+                db,
+                user_ids,
+                title=broadcast.title,
+                message=broadcast.message,
+                notification_type=broadcast.type.value,
+                data=broadcast.data,
+            )
+            db.commit()
+            _update_job(job_id, sent=sent)
+            if throttle_seconds:
+                time.sleep(throttle_seconds)
+
+        _update_job(job_id, status="completed", finished_at=datetime.utcnow())
+        logger.info("Broadcast %s sent %d notifications", job_id, sent)
+    except Exception as e:
+        db.rollback()
+        logger.exception("Broadcast %s failed after %d notifications", job_id, sent)
+        _update_job(job_id, status="failed", error=str(e), finished_at=datetime.utcnow())
+    finally:
+        db.close()
+    return sent
@@ -0,0 +1,234 @@
+"""
+Notification Broker
+In-process pub/sub that feeds the notification Server-Sent Events stream.
+
+Publishers call publish_after_commit() with the session that wrote the
+notification; events go out only once that transaction commits. With a
+single worker, events are delivered straight to the local subscribers. With
+several workers, enable NOTIFICATION_STREAM_PG_BRIDGE: events are then sent
+through PostgreSQL NOTIFY, and every worker (including the publisher)
+delivers them to its own subscribers from a LISTEN thread.
+"""
+import asyncio
+import json
+import logging
+import select
+import threading
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Set
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import URL
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.session import engine
+
+logger = logging.getLogger(__name__)
+
+# PostgreSQL rejects NOTIFY payloads of 8000 bytes or more
+_MAX_NOTIFY_PAYLOAD = 7900
+
+
+class Subscription:
+    """A single stream client's queue, bound to the event loop it reads on"""
+
+    def __init__(self, user_id: str, loop: asyncio.AbstractEventLoop, maxsize: int = 100):
+        self.user_id = user_id
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+
+    def _put(self, item: Dict[str, Any]) -> None:
+        # Slow clients lose their oldest events rather than growing unbounded
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(item)
+
+    def deliver(self, item: Dict[str, Any]) -> None:
+        """Thread-safe hand-off onto the subscriber's event loop"""
+        try:
+            self.loop.call_soon_threadsafe(self._put, item)
+        except RuntimeError:
+            # Event loop already closed
+            pass
+
+
+class NotificationBroker:
+    """Per-user fan-out of notification events to stream subscribers"""
+
+    def __init__(self):
+        self._subscribers: Dict[str, Set[Subscription]] = defaultdict(set)
+        self._lock = threading.Lock()
+        self._bridge: Optional["PostgresNotifyBridge"] = None
+
+    def subscribe(self, user_id: str) -> Subscription:
+        """Subscribe from inside a running event loop"""
+        subscription = Subscription(user_id, asyncio.get_running_loop())
+        with self._lock:
+            self._subscribers[user_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.user_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.user_id]
+
+    def has_subscribers(self, user_id: str) -> bool:
+        with self._lock:
+            return user_id in self._subscribers
+
+    def deliver_local(self, user_id: str, item: Dict[str, Any]) -> None:
+        """Deliver to subscribers connected to this worker only"""
+        with self._lock:
+            subscribers = list(self._subscribers.get(user_id, ()))
+        for subscription in subscribers:
+            subscription.deliver(item)
+
+    def publish(self, user_id: str, item: Dict[str, Any]) -> None:
+        """Publish to every worker's subscribers"""
+        if self._bridge is not None:
+            self._bridge.notify(user_id, item)
+        else:
+            self.deliver_local(user_id, item)
+
+    def start_bridge(self) -> None:
+        """Route publishes through PostgreSQL LISTEN/NOTIFY"""
+        if self._bridge is None:
+            self._bridge = PostgresNotifyBridge(self)
+            self._bridge.start()
+
+    def stop_bridge(self) -> None:
+        if self._bridge is not None:
+            self._bridge.stop()
+            self._bridge = None
+
+
+def libpq_dsn(url: URL) -> str:
+    """Render a SQLAlchemy URL for libpq, which rejects a "+driver" suffix"""
+    return url.set(drivername="postgresql").render_as_string(hide_password=False)
+
+
+class PostgresNotifyBridge:
+    """Carries broker events between workers over a NOTIFY channel"""
+
+    def __init__(self, broker: NotificationBroker, channel: Optional[str] = None):
+        self.broker = broker
+        self.channel = channel or settings.NOTIFICATION_STREAM_CHANNEL
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def notify(self, user_id: str, item: Dict[str, Any]) -> None:
+        payload = json.dumps({"user_id": user_id, "event": item}, default=str)
+        if len(payload.encode("utf-8")) > _MAX_NOTIFY_PAYLOAD:
+            # Large payloads only carry the reference; clients fetch the rest
+            payload = json.dumps({
+                "user_id": user_id,
+                "event": {"id": item.get("id"), "type": item.get("type"), "truncated": True},
+            })
+        try:
+            with engine.begin() as conn:
+                conn.execute(
+                    text("SELECT pg_notify(:channel, :payload)"),
+                    {"channel": self.channel, "payload": payload},
+                )
+        except Exception:
+            logger.exception("Failed to publish notification over NOTIFY")
+
+    def start(self) -> None:
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._listen_forever, name="notification-listen", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+            self._thread = None
+
+    def _listen_forever(self) -> None:
+        while not self._stop_event.is_set():
+            try:
+                self._listen()
+            except Exception:
+                logger.exception("Notification LISTEN connection failed; reconnecting")
+                self._stop_event.wait(5)
+
+    def _listen(self) -> None:
+        import psycopg2
+
+        # Dedicated connection outside the pool: it is held for the life
+        # of the worker
+        conn = psycopg2.connect(libpq_dsn(engine.url))
+        try:
+            conn.autocommit = True
+            with conn.cursor() as cur:
+                cur.execute(f'LISTEN "{self.channel}";')
+            while not self._stop_event.is_set():
+                if select.select([conn], [], [], 5) == ([], [], []):
+                    continue
+                conn.poll()
+                while conn.notifies:
+                    notify = conn.notifies.pop(0)
+                    try:
+                        message = json.loads(notify.payload)
+                        self.broker.deliver_local(message["user_id"], message["event"])
+                    except (ValueError, KeyError):
+                        logger.warning("Ignoring malformed notification payload")
+        finally:
+            conn.close()
+
+
+notification_broker = NotificationBroker()
+
+
+def notification_event(notification: Any) -> Dict[str, Any]:
+    """Serialize a Notification (model or insert row) for the stream"""
+    get = notification.get if isinstance(notification, dict) else (
+        lambda key: getattr(notification, key, None)
+    )
+    created_at = get("created_at")
+    return {
+        "id": get("id"),
+        "title": get("title"),
+        "message": get("message"),
+        "type": get("type"),
+        "data": get("data"),
+        "created_at": created_at.isoformat() if created_at else None,
+    }
+
+
+def publish_after_commit(
+    db: Session, user_id: str, item: Dict[str, Any], local_only: bool = False
+) -> None:
+    """
+    Queue an event to be published once the session's transaction commits
+    
+    local_only skips the NOTIFY bridge; broadcasts use it so a blast does not
+    turn into one NOTIFY per recipient.
+    """
+    db.info.setdefault("pending_notification_events", []).append((user_id, item, local_only))
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_pending(session: Session) -> None:
+    pending: List = session.info.pop("pending_notification_events", None)
+    if not pending:
+        return
+    for user_id, item, local_only in pending:
+        try:
+            if local_only:
+                notification_broker.deliver_local(user_id, item)
+            else:
+                notification_broker.publish(user_id, item)
+        except Exception:
+            logger.exception("Failed to publish notification event")
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session: Session) -> None:
+    session.info.pop("pending_notification_events", None)
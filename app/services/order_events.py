@@ -0,0 +1,86 @@
+"""
+Order Event Consumers
+In-process consumers for order events published through the outbox.
+Importing this module registers them with the relay.
+"""
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.crud.analytics import VOID_ORDER_STATUSES, SalesRollup, apply_sales_rollup
+from app.crud.notification import bulk_create_notifications
+from app.models.order import OrderItem
+from app.models.outbox import OutboxEvent
+from app.schemas.notification import NotificationCreate, NotificationType
+from app.services.outbox import outbox_consumer
+
+ORDER_CREATED = "order.created"
+ORDER_STATUS_CHANGED = "order.status_changed"
+
+
+@outbox_consumer(ORDER_CREATED, ORDER_STATUS_CHANGED)
+def notify_order_updates(db: Session, events: List[OutboxEvent]) -> None:
+    """Create in-app notifications for order events in one insert"""
+    notifications = []
+    for event in events:
+        payload = event.payload or {}
+        order_number = payload.get("order_number", "")
+
+        if event.event_type == ORDER_CREATED:
+            title = "Order placed"
+            message = f"Your order {order_number} has been placed."
+        else:
+            title = "Order updated"
+            message = f"Your order {order_number} is now {payload.get('status')}."
+
+        notifications.append(NotificationCreate(
+            user_id=payload["user_id"],
+            title=title,
+            message=message,
+            type=NotificationType.ORDER_UPDATE,
+            data={"order_id": event.aggregate_id, "status": payload.get("status")},
+        ))
+
+    bulk_create_notifications(db, notifications)
+
+
+@outbox_consumer(ORDER_CREATED, ORDER_STATUS_CHANGED)
+def update_sales_rollups(db: Session, events: List[OutboxEvent]) -> None:
+    """Add placed orders to the sales rollups and take cancelled or refunded ones out"""
+    rollup = SalesRollup()
+    # Orders whose lines must be added (1) or removed (-1), bucketed by placement time
+    flipped: Dict[str, List[Tuple[int, datetime]]] = {}
+    for event in events:
+        payload = event.payload or {}
+        if not payload.get("created_at"):
+            continue
+        created_at = datetime.fromisoformat(payload["created_at"])
+
+        if event.event_type == ORDER_CREATED:
+            if payload.get("status") in VOID_ORDER_STATUSES:
+                continue
+            rollup.add_order(created_at, payload.get("total_amount"))
+            for item in payload.get("items") or []:
+                rollup.add_item(
+                    created_at, item["product_id"], item["quantity"],
+                    item["quantity"] * item["unit_price"],
+                )
+            continue
+
+        was_void = payload.get("old_status") in VOID_ORDER_STATUSES
+        is_void = payload.get("status") in VOID_ORDER_STATUSES
+        if was_void != is_void:
+            sign = -1 if is_void else 1
+            rollup.add_order(created_at, payload.get("total_amount"), sign)
+            flipped.setdefault(event.aggregate_id, []).append((sign, created_at))
+
+    if flipped:
+        items = db.query(
+            OrderItem.order_id, OrderItem.product_id, OrderItem.quantity, OrderItem.total_price
+        ).filter(OrderItem.order_id.in_(list(flipped)))
+        for order_id, product_id, quantity, total_price in items:
+            for sign, created_at in flipped[order_id]:
+                rollup.add_item(created_at, product_id, quantity, total_price, sign)
+
+    apply_sales_rollup(db, rollup)
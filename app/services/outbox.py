@@ -0,0 +1,166 @@
+"""
+Transactional Outbox Relay
+Drains OutboxEvent rows in batches and hands them to in-process consumers.
+
+Producers (e.g. create_order) only stage an OutboxEvent in their own
+transaction. The relay later delivers each batch to every consumer
+registered for the event type. Consumers may write to the database through
+the session they are given: their writes are committed together with the
+"processed" marker, so a delivered batch applies them once; a failed batch
+rolls them back and is retried. In-memory side effects are at-least-once.
+
+Delivery is not guaranteed: after OUTBOX_MAX_ATTEMPTS failures events are
+dead-lettered (marked processed with last_error set) and their effects,
+e.g. the sales rollups, are missing until they are replayed. Dead letters
+are logged at error level so they can be alerted on.
+"""
+import logging
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.crud.outbox import (
+    get_pending_outbox_events, mark_outbox_events_processed, record_outbox_failure
+)
+from app.db.session import SessionLocal
+from app.models.outbox import OutboxEvent
+from app.services.background import PeriodicTask
+
+logger = logging.getLogger(__name__)
+
+OutboxConsumer = Callable[[Session, List[OutboxEvent]], None]
+
+_consumers: Dict[str, List[OutboxConsumer]] = defaultdict(list)
+
+
+def register_consumer(event_type: str, consumer: OutboxConsumer) -> None:
+    """Register a consumer for an event type (idempotent)"""
+    if consumer not in _consumers[event_type]:
+        _consumers[event_type].append(consumer)
+
+
+def outbox_consumer(*event_types: str) -> Callable[[OutboxConsumer], OutboxConsumer]:
+    """Decorator form of register_consumer"""
+    def decorator(consumer: OutboxConsumer) -> OutboxConsumer:
+        for event_type in event_types:
+            register_consumer(event_type, consumer)
+        return consumer
+    return decorator
+
+
+def get_consumers(event_type: str) -> List[OutboxConsumer]:
+    """Get consumers registered for an event type"""
+    return list(_consumers.get(event_type, []))
+
+
+class OutboxRelay:
+    """Batch drainer for the outbox table"""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        batch_size: Optional[int] = None,
+        max_attempts: Optional[int] = None,
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size or settings.OUTBOX_BATCH_SIZE
+        self.max_attempts = max_attempts or settings.OUTBOX_MAX_ATTEMPTS
+
+    def dispatch(self, db: Session, events: List[OutboxEvent]) -> None:
+        """Deliver a batch to consumers, grouped by event type in order"""
+        by_type: Dict[str, List[OutboxEvent]] = defaultdict(list)
+        for event in events:
+            by_type[event.event_type].append(event)
+
+        # Consumers may handle several event types; call each one once per
+        # batch with all of its events so it can batch its own writes
+        calls: Dict[OutboxConsumer, List[OutboxEvent]] = {}
+        for event_type, typed_events in by_type.items():
+            for consumer in get_consumers(event_type):
+                calls.setdefault(consumer, []).extend(typed_events)
+
+        for consumer, consumer_events in calls.items():
+            consumer_events.sort(key=lambda e: e.created_at)
+            consumer(db, consumer_events)
+
+    def _deliver(self, db: Session, events: List[OutboxEvent]) -> None:
+        """Dispatch events and mark them processed in one transaction"""
+        self.dispatch(db, events)
+        mark_outbox_events_processed(db, [event.id for event in events])
+        db.commit()
+
+    def _record_failure(self, db: Session, event_id: str, error: Exception) -> None:
+        dead_lettered = record_outbox_failure(
+            db, [event_id], f"{type(error).__name__}: {error}", self.max_attempts
+        )
+        if dead_lettered:
+            logger.error(
+                "Dead-lettered outbox event %s after %d attempts", event_id, self.max_attempts
+            )
+
+    def drain_once(self) -> int:
+        """
+        Process one batch; returns the number of events delivered
+
+        When the batch fails it is retried one event at a time, each in its
+        own transaction, so only the events whose consumers actually fail
+        are counted against OUTBOX_MAX_ATTEMPTS and the rest go through.
+        """
+        db = self.session_factory()
+        try:
+            events = get_pending_outbox_events(db, limit=self.batch_size)
+            if not events:
+                return 0
+
+            event_ids = [event.id for event in events]
+            try:
+                self._deliver(db, events)
+                return len(event_ids)
+            except Exception as e:
+                db.rollback()
+                logger.exception("Outbox batch of %d events failed", len(event_ids))
+                if len(event_ids) == 1:
+                    self._record_failure(db, event_ids[0], e)
+                    return 0
+
+            delivered = 0
+            for event_id in event_ids:
+                # Relocked one by one: the rollback released the batch's locks
+                pending = get_pending_outbox_events(db, limit=1, event_ids=[event_id])
+                if not pending:
+                    continue
+                try:
+                    self._deliver(db, pending)
+                    delivered += 1
+                except Exception as e:
+                    db.rollback()
+                    logger.exception("Outbox event %s failed", event_id)
+                    self._record_failure(db, event_id, e)
+            # A failed event makes this a short batch, so drain() backs off
+            # until the next tick
+            return delivered
+        finally:
+            db.close()
+
+    def drain(self, max_batches: Optional[int] = None) -> int:
+        """Process batches until the outbox is empty"""
+        total = 0
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            handled = self.drain_once()
+            total += handled
+            batches += 1
+            if handled < self.batch_size:
+                break
+        return total
+
+
+relay = OutboxRelay()
+
+relay_task = PeriodicTask(
+    "outbox-relay",
+    settings.OUTBOX_RELAY_INTERVAL_SECONDS,
+    lambda: relay.drain(),
+)
@@ -0,0 +1,88 @@
+"""
+Product Counter Buffer
+Aggregates product view and purchase increments in memory and writes them
+to Product.view_count / purchase_count in batched updates.
+
+Writing every product page view straight to its row would turn catalog
+reads into writes on the hottest rows. Instead each worker sums increments
+per product, and a background task flushes them every
+PRODUCT_COUNTER_FLUSH_INTERVAL_SECONDS (and once more on shutdown). A failed
+flush puts its counts back; counts buffered by a worker that dies are lost,
+which is acceptable for popularity ranking.
+"""
+import logging
+import threading
+from collections import Counter
+from typing import Callable, Dict, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.crud.product import increment_product_counters
+from app.db.session import SessionLocal
+from app.services.background import PeriodicTask
+
+logger = logging.getLogger(__name__)
+
+
+class ProductCounterBuffer:
+    """Per-process buffer of product view and purchase increments"""
+
+    def __init__(self, session_factory: Callable[[], Session] = SessionLocal):
+        self.session_factory = session_factory
+        self._views: Counter = Counter()
+        self._purchases: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def record_view(self, product_id: str, count: int = 1) -> None:
+        """Count views of a product"""
+        with self._lock:
+            self._views[product_id] += count
+
+    def record_purchases(self, quantities: Dict[str, int]) -> None:
+        """Count purchased quantities per product"""
+        with self._lock:
+            self._purchases.update(quantities)
+
+    def drain(self) -> Dict[str, Tuple[int, int]]:
+        """Take all buffered increments as {product_id: (views, purchases)}"""
+        with self._lock:
+            views, self._views = self._views, Counter()
+            purchases, self._purchases = self._purchases, Counter()
+        return {
+            product_id: (views[product_id], purchases[product_id])
+            for product_id in set(views) | set(purchases)
+        }
+
+    def restore(self, increments: Dict[str, Tuple[int, int]]) -> None:
+        """Put drained increments back after a failed flush"""
+        with self._lock:
+            for product_id, (views, purchases) in increments.items():
+                self._views[product_id] += views
+                self._purchases[product_id] += purchases
+
+    def flush(self) -> int:
+        """Write buffered increments to the database, returning how many products were updated"""
+        increments = self.drain()
+        if not increments:
+            return 0
+        try:
+            db = self.session_factory()
+            try:
+                updated = increment_product_counters(db, increments)
+                db.commit()
+            finally:
+                db.close()
+        except Exception:
+            self.restore(increments)
+            raise
+        return updated
+
+
+product_counters = ProductCounterBuffer()
+
+product_counter_task = PeriodicTask(
+    "product-counter-flush",
+    settings.PRODUCT_COUNTER_FLUSH_INTERVAL_SECONDS,
+    lambda: product_counters.flush(),
+)
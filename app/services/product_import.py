@@ -0,0 +1,187 @@
+"""
+Product Import
+Bulk upsert of products by SKU from a CSV or NDJSON upload.
+
+Rows are parsed and validated one at a time and written in batches, so a
+large feed is never held in memory. Each batch costs two small lookups
+(existing SKUs/slugs) plus one upsert per set of supplied columns; on
+PostgreSQL that upsert reads from a COPY-loaded staging table. A batch
+commits on its own, so rows before a failing batch stay imported. Empty
+cells and missing keys leave the existing value unchanged on update.
+"""
+import csv
+import io
+import json
+import logging
+import re
+import uuid
+from typing import IO, Any, Dict, Iterator, List, Optional, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from app.crud.product import rebuild_category_product_counts, upsert_products_by_sku
+from app.models.category import Category
+from app.models.product import Product
+from app.schemas.product import ProductImportRow
+
+logger = logging.getLogger(__name__)
+
+MAX_REPORTED_ERRORS = 1000
+
+# category_id may also be given as category_slug
+_REQUIRED_FOR_NEW = ("name", "price", "category_id")
+# The insert half of an upsert must satisfy NOT NULL even when the SKU exists,
+# so updates carry the current values of these
+_NOT_NULL = ("name", "slug", "price", "category_id")
+
+
+def _slugify(value: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", value.lower()).strip("-")
+
+
+def iter_import_records(stream: IO[bytes], import_format: str) -> Iterator[Tuple[int, Any]]:
+    """Yield (row number, raw record) from an upload; undecodable rows yield the error instead"""
+    text_stream = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    if import_format == "csv":
+        for row_number, record in enumerate(csv.DictReader(text_stream), 1):
+            # An empty cell means "not supplied"
+            yield row_number, {key: value for key, value in record.items() if key and value not in ("", None)}
+        return
+    for row_number, line in enumerate(text_stream, 1):
+        if not line.strip():
+            continue
+        try:
+            yield row_number, json.loads(line)
+        except json.JSONDecodeError as e:
+            yield row_number, ValueError(f"Invalid JSON: {e.msg}")
+
+
+class ProductImporter:
+    """Validates import records and upserts them in batches"""
+
+    def __init__(self, db: Session, batch_size: int = 1000):
+        self.db = db
+        self.batch_size = batch_size
+        self.result: Dict[str, Any] = {"received": 0, "created": 0, "updated": 0, "failed": 0, "errors": []}
+        self._category_ids = {category_id for (category_id,) in db.query(Category.id)}
+        self._category_slugs = dict(db.query(Category.slug, Category.id))
+        self._batch: Dict[str, Tuple[int, Dict[str, Any]]] = {}
+        self._seen_slugs: Dict[str, str] = {}
+
+    def reject(self, row_number: int, sku: Optional[str], error: str) -> None:
+        self.result["failed"] += 1
+        if len(self.result["errors"]) < MAX_REPORTED_ERRORS:
+            self.result["errors"].append({"row": row_number, "sku": sku, "error": error})
+
+    def add(self, row_number: int, record: Any) -> None:
+        """Validate one record and queue it for the next batch"""
+        self.result["received"] += 1
+        if isinstance(record, Exception):
+            self.reject(row_number, None, str(record))
+            return
+        if not isinstance(record, dict):
+            self.reject(row_number, None, "Row must be an object")
+            return
+        try:
+            row = ProductImportRow(**record)
+        except (ValidationError, ValueError) as e:
+            sku = record.get("sku")
+            self.reject(row_number, None if sku is None else str(sku), _describe(e))
+            return
+
+        values = row.dict(exclude_unset=True)
+        category_slug = values.pop("category_slug", None)
+        if category_slug is not None:
+            values["category_id"] = self._category_slugs.get(category_slug)
+            if values["category_id"] is None:
+                self.reject(row_number, row.sku, f"Unknown category slug {category_slug!r}")
+                return
+        elif "category_id" in values and values["category_id"] not in self._category_ids:
+            self.reject(row_number, row.sku, f"Unknown category {values['category_id']!r}")
+            return
+
+        # A later row for the same SKU replaces an earlier one
+        self._batch[row.sku] = (row_number, values)
+        if len(self._batch) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Upsert the queued rows and commit"""
+        if not self._batch:
+            return
+        batch, self._batch = self._batch, {}
+        slugs = [values["slug"] for _, values in batch.values() if values.get("slug")]
+        existing_slugs: Dict[str, str] = {}
+        existing: Dict[str, Dict[str, Any]] = {}
+        lookup = self.db.query(Product.sku, *[getattr(Product, name) for name in _NOT_NULL]).filter(
+            or_(Product.sku.in_(list(batch)), Product.slug.in_(slugs))
+        )
+        for sku, *current in lookup:
+            current = dict(zip(_NOT_NULL, current))
+            existing_slugs[current["slug"]] = sku
+            if sku in batch:
+                existing[sku] = current
+
+        # Rows in one upsert must share keys, so group them by supplied columns
+        groups: Dict[Tuple[str, ...], List[Tuple[Dict[str, Any], bool]]] = {}
+        for sku, (row_number, values) in batch.items():
+            is_new = sku not in existing
+            if is_new:
+                missing = [name for name in _REQUIRED_FOR_NEW if values.get(name) is None]
+                if missing:
+                    self.reject(row_number, sku, f"{', '.join(missing)} required for new products")
+                    continue
+                values.setdefault("slug", f"{_slugify(values['name'])}-{_slugify(sku)}")
+            slug = values.get("slug")
+            if slug is not None:
+                owner = existing_slugs.get(slug, self._seen_slugs.get(slug, sku))
+                if owner != sku:
+                    self.reject(row_number, sku, f"Slug {slug!r} is used by SKU {owner!r}")
+                    continue
+                self._seen_slugs[slug] = sku
+
+            update_columns = tuple(sorted(name for name in values if name != "sku"))
+            row = {"id": str(uuid.uuid4()), **existing.get(sku, {}), **values}
+            groups.setdefault(update_columns, []).append((row, is_new))
+
+        try:
+            for update_columns, entries in groups.items():
+                upsert_products_by_sku(self.db, [row for row, _ in entries], list(update_columns))
+            self.db.commit()
+        except Exception as e:
+            self.db.rollback()
+            logger.exception("Product import batch failed")
+            for entries in groups.values():
+                for row, _ in entries:
+                    self.reject(batch[row["sku"]][0], row["sku"], f"Batch failed: {type(e).__name__}")
+            return
+
+        for entries in groups.values():
+            for _, is_new in entries:
+                self.result["created" if is_new else "updated"] += 1
+
+    def finish(self) -> Dict[str, Any]:
+        """Flush the last batch and refresh derived data"""
+        self.flush()
+        if self.result["created"] or self.result["updated"]:
+            rebuild_category_product_counts(self.db)
+        return self.result
+
+
+def _describe(error: Exception) -> str:
+    if isinstance(error, ValidationError):
+        return "; ".join(
+            f"{'.'.join(str(part) for part in detail['loc']) or 'row'}: {detail['msg']}"
+            for detail in error.errors()
+        )
+    return str(error)
+
+
+def import_products(db: Session, stream: IO[bytes], import_format: str, batch_size: int = 1000) -> Dict[str, Any]:
+    """Import products from a CSV or NDJSON byte stream, returning a ProductImportResult dict"""
+    importer = ProductImporter(db, batch_size=batch_size)
+    for row_number, record in iter_import_records(stream, import_format):
+        importer.add(row_number, record)
+    return importer.finish()
@@ -0,0 +1,133 @@
+"""
+Sampling profiler
+Shows where a running worker spends its time without restarting it. A
+daemon thread snapshots the stack of every other thread with
+sys._current_frames() every few milliseconds; the profiled code runs
+unmodified, so the overhead is one stack walk per busy thread per sample.
+Threads parked in a wait (idle pool workers, the event loop's select) are
+skipped.
+
+Results come as collapsed stacks ("thread;outer;inner count" lines, read by
+flamegraph.pl and speedscope) or as a call tree. One profile runs at a time
+per process; enabled with PROFILING_ENABLED.
+"""
+import os
+import sys
+import threading
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+# Innermost (file, function) of a thread that is waiting rather than working
+_IDLE_FRAMES = {
+    ("threading.py", "wait"),
+    ("selectors.py", "select"),
+    ("queue.py", "get"),
+    ("runners.py", "run"),  # Event loop thread under uvloop, whose loop is not Python code
+}
+
+# Held for the lifetime of a profile, so only one runs at a time
+_profile_lock = threading.Lock()
+
+
+def _path_prefixes() -> List[str]:
+    """Directories stripped from file names in frame labels, longest first"""
+    paths = {os.path.join(path, "") for path in sys.path if path}
+    paths.add(os.path.join(os.getcwd(), ""))
+    return sorted(paths, key=len, reverse=True)
+
+
+class SamplingProfiler:
+    """Sample the stacks of all threads of this process at a fixed interval"""
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.samples = 0
+        self.stacks: Counter = Counter()
+        self._labels: Dict[Any, str] = {}
+        self._prefixes = _path_prefixes()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> bool:
+        """Start sampling, returning False if another profile is already running"""
+        if not _profile_lock.acquire(blocking=False):
+            return False
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self) -> None:
+        """Stop sampling and let the next profile start"""
+        if self._thread is None:
+            return
+        self._stop_event.set()
+        self._thread.join()
+        self._thread = None
+        _profile_lock.release()
+
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            filename = code.co_filename
+            for prefix in self._prefixes:
+                if filename.startswith(prefix):
+                    filename = filename[len(prefix):]
+                    break
+            # ";" separates frames in the collapsed format
+            label = f"{code.co_name} ({filename}:{code.co_firstlineno})".replace(";", ":")
+            self._labels[code] = label
+        return label
+
+    def _sample(self, own_ident: int) -> None:
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == own_ident:
+                continue
+            code = frame.f_code
+            if (os.path.basename(code.co_filename), code.co_name) in _IDLE_FRAMES:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(self._label(frame.f_code))
+                frame = frame.f_back
+            stack.append(names.get(ident, f"thread-{ident}"))
+            stack.reverse()
+            self.stacks[tuple(stack)] += 1
+        self.samples += 1
+
+    def _run(self) -> None:
+        own_ident = threading.get_ident()
+        while not self._stop_event.wait(self.interval):
+            self._sample(own_ident)
+
+    def collapsed(self) -> str:
+        """Stacks in collapsed format, one "thread;outer;...;inner count" line each"""
+        return "".join(
+            f"{';'.join(stack)} {count}\n"
+            for stack, count in sorted(self.stacks.items(), key=lambda item: -item[1])
+        )
+
+    def call_tree(self, min_fraction: float = 0.005) -> Dict[str, Any]:
+        """
+        Stacks merged into a tree of {"name", "samples", "children"} nodes
+
+        Children are sorted by samples; those with less than min_fraction of
+        all busy samples are dropped to keep the tree readable.
+        """
+        root: Dict[str, Any] = {"name": "all", "samples": 0, "children": {}}
+        for stack, count in self.stacks.items():
+            node = root
+            node["samples"] += count
+            for label in stack:
+                node = node["children"].setdefault(label, {"name": label, "samples": 0, "children": {}})
+                node["samples"] += count
+
+        threshold = root["samples"] * min_fraction
+
+        def finish(node: Dict[str, Any]) -> Dict[str, Any]:
+            children = [child for child in node["children"].values() if child["samples"] >= threshold]
+            children.sort(key=lambda child: -child["samples"])
+            return {"name": node["name"], "samples": node["samples"], "children": [finish(child) for child in children]}
+
+        return finish(root)
@@ -0,0 +1,123 @@
+"""
+Product Recommendations
+Offline item-to-item "bought together" similarity from order history.
+
+Orders and products form a sparse binary basket matrix B; B.T @ B counts
+how often each pair of products was bought together, which is normalized
+to cosine similarity. The top-K neighbors of every product are stored in
+ProductRecommendation so the related-products endpoint is a primary-key
+lookup. NumPy and SciPy are only needed to build the table
+(scripts/build_recommendations.py), not by the web process.
+"""
+import logging
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.order import Order, OrderItem
+from app.models.product import ProductRecommendation
+
+logger = logging.getLogger(__name__)
+
+Neighbors = Dict[str, List[Tuple[str, float]]]
+
+
+def iter_order_products(db: Session, batch_size: int = 10000) -> Iterator[Tuple[str, str]]:
+    """Stream (order_id, product_id) pairs from orders that were not cancelled"""
+    query = db.query(OrderItem.order_id, OrderItem.product_id).join(
+        Order, Order.id == OrderItem.order_id
+    ).filter(Order.status != "cancelled").execution_options(yield_per=batch_size)
+    for order_id, product_id in query:
+        yield order_id, product_id
+
+
+def compute_neighbors(
+    pairs: Iterable[Tuple[str, str]],
+    top_k: int,
+    min_co_purchases: int = 1,
+) -> Neighbors:
+    """Get each product's top_k most similar products by co-purchase cosine similarity"""
+    import numpy as np
+    from scipy import sparse
+
+    order_index: Dict[str, int] = {}
+    product_index: Dict[str, int] = {}
+    product_ids: List[str] = []
+    rows: List[int] = []
+    cols: List[int] = []
+    for order_id, product_id in pairs:
+        rows.append(order_index.setdefault(order_id, len(order_index)))
+        col = product_index.get(product_id)
+        if col is None:
+            col = product_index[product_id] = len(product_ids)
+            product_ids.append(product_id)
+        cols.append(col)
+    if not cols:
+        return {}
+
+    baskets = sparse.csr_matrix(
+        (np.ones(len(rows), dtype=np.float32), (rows, cols)),
+        shape=(len(order_index), len(product_ids)),
+    )
+    # A product listed twice in one order still counts as one purchase
+    baskets.data[:] = 1.0
+
+    co_purchases = (baskets.T @ baskets).tocoo()
+    purchases = co_purchases.diagonal()
+    keep = (co_purchases.row != co_purchases.col) & (co_purchases.data >= min_co_purchases)
+    row, col = co_purchases.row[keep], co_purchases.col[keep]
+    scores = co_purchases.data[keep] / np.sqrt(purchases[row] * purchases[col])
+    similarity = sparse.csr_matrix((scores, (row, col)), shape=co_purchases.shape)
+
+    neighbors: Neighbors = {}
+    for i, product_id in enumerate(product_ids):
+        start, end = similarity.indptr[i], similarity.indptr[i + 1]
+        if start == end:
+            continue
+        row_scores = similarity.data[start:end]
+        row_cols = similarity.indices[start:end]
+        if end - start > top_k:
+            top = np.argpartition(-row_scores, top_k - 1)[:top_k]
+            row_scores, row_cols = row_scores[top], row_cols[top]
+        # Highest score first; ties broken by product id for stable output
+        ranked = sorted(
+            zip(row_scores.tolist(), (product_ids[c] for c in row_cols)),
+            key=lambda item: (-item[0], item[1]),
+        )
+        neighbors[product_id] = [(related_id, round(score, 6)) for score, related_id in ranked]
+    return neighbors
+
+
+def rebuild_recommendations(
+    db: Session,
+    top_k: Optional[int] = None,
+    min_co_purchases: Optional[int] = None,
+    batch_size: int = 1000,
+) -> int:
+    """Recompute the recommendation table from order history, returning how many products have neighbors"""
+    neighbors = compute_neighbors(
+        iter_order_products(db),
+        top_k=top_k or settings.RECOMMENDATIONS_TOP_K,
+        min_co_purchases=min_co_purchases or settings.RECOMMENDATIONS_MIN_CO_PURCHASES,
+    )
+
+    now = datetime.utcnow()
+    rows = [
+        {
+            "product_id": product_id,
+            "related_product_ids": [related_id for related_id, _ in ranked],
+            "scores": [score for _, score in ranked],
+            "computed_at": now,
+        }
+        for product_id, ranked in neighbors.items()
+    ]
+    # Replaced in one transaction, so readers see either the old or the new table
+    db.query(ProductRecommendation).delete(synchronize_session=False)
+    for start in range(0, len(rows), batch_size):
+        db.execute(insert(ProductRecommendation.__table__), rows[start:start + batch_size])
+    db.commit()
+    logger.info("Rebuilt recommendations for %d products", len(rows))
+    return len(rows)
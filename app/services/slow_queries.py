@@ -0,0 +1,229 @@
+"""
+Slow query log
+Engine event listeners time every statement; those slower than
+SLOW_QUERY_THRESHOLD_MS are aggregated in memory by normalized SQL, with
+their call count, total/max duration, parameter shape (types only, never
+values) and the routes that issued them. The admin endpoint ranks them by
+total time to point at missing indexes.
+
+On request, the slowest SELECTs are explained out of band: EXPLAIN (ANALYZE,
+BUFFERS) on PostgreSQL, inside a read-only transaction with a statement
+timeout; EXPLAIN QUERY PLAN on SQLite. The log is per process, so with
+several workers each keeps its own.
+"""
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# ASGI scope of the request being served; the router fills in scope["route"]
+request_scope: ContextVar[Optional[Dict[str, Any]]] = ContextVar("request_scope", default=None)
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"(?<![\w$])-?\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"%\(\w+\)s|%s|\$\d+|\?")
+_PLACEHOLDER_LIST = re.compile(r"\(\?(?:, \?)+\)")
+_REPEATED_GROUP = re.compile(r"(\(\?(?:, \?)*\))(?:, \1)+")
+_WHITESPACE = re.compile(r"\s+")
+_EXPLAINABLE = re.compile(r"^\s*(SELECT|WITH)\b", re.IGNORECASE)
+
+ROUTES_PER_STATEMENT = 5
+
+
+def normalize_sql(statement: str) -> str:
+    """Collapse literals, placeholders and IN/VALUES lists so equivalent statements match"""
+    sql = _WHITESPACE.sub(" ", statement).strip()
+    sql = _STRING_LITERAL.sub("?", sql)
+    sql = _NUMBER_LITERAL.sub("?", sql)
+    sql = _PLACEHOLDER.sub("?", sql)
+    sql = _REPEATED_GROUP.sub(r"\1, ...", sql)
+    return _PLACEHOLDER_LIST.sub("(?, ...)", sql)
+
+
+def _value_shape(parameters: Any) -> str:
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{key}: {type(value).__name__}" for key, value in parameters.items()) + "}"
+    if isinstance(parameters, (list, tuple)):
+        return "(" + ", ".join(type(value).__name__ for value in parameters) + ")"
+    return type(parameters).__name__
+
+
+def parameter_shape(parameters: Any, executemany: bool) -> str:
+    """Describe bound parameters by type, leaving their values out of the log"""
+    if executemany:
+        rows = list(parameters)
+        return f"{len(rows)} x {_value_shape(rows[0])}" if rows else "0 rows"
+    return _value_shape(parameters)
+
+
+def current_route() -> str:
+    """Label the code issuing a statement: the route template, or the thread outside requests"""
+    scope = request_scope.get()
+    if scope is None:
+        return f"thread:{threading.current_thread().name}"
+    route = scope.get("route")
+    return f"{scope.get('method', '')} {getattr(route, 'path', scope.get('path', ''))}".strip()
+
+
+class SlowQueryLog:
+    """Per-process aggregate of slow statements, keyed by normalized SQL"""
+
+    def __init__(self, threshold_ms: float, max_statements: int):
+        self.threshold_ms = threshold_ms
+        self.max_statements = max_statements
+        self.dropped = 0
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._engine: Optional[Engine] = None
+
+    def install(self, engine: Engine) -> None:
+        """Time every statement run on the engine"""
+        self._engine = engine
+        event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        context._query_started = time.perf_counter()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, "_query_started", None)
+        if started is None:
+            return
+        duration_ms = (time.perf_counter() - started) * 1000
+        if duration_ms >= self.threshold_ms and statement.lstrip()[:7].upper() != "EXPLAIN":
+            self.record(statement, parameters, executemany, duration_ms, current_route())
+
+    def record(
+        self,
+        statement: str,
+        parameters: Any,
+        executemany: bool,
+        duration_ms: float,
+        route: str,
+    ) -> None:
+        """Add one slow execution to its statement's totals"""
+        key = normalize_sql(statement)
+        shape = parameter_shape(parameters, executemany)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                if len(self._entries) >= self.max_statements:
+                    self.dropped += 1
+                    return
+                entry = self._entries[key] = {
+                    "statement": key, "calls": 0, "total_ms": 0.0, "max_ms": 0.0,
+                    "routes": Counter(), "plan": None,
+                }
+            entry["calls"] += 1
+            entry["total_ms"] += duration_ms
+            entry["routes"][route] += 1
+            entry["parameters"] = shape
+            entry["last_seen"] = datetime.utcnow()
+            if duration_ms >= entry["max_ms"]:
+                # The slowest execution is the one worth explaining
+                entry["max_ms"] = duration_ms
+                entry["sample"] = (statement, None if executemany else parameters)
+
+    def report(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """Get the statements with the most total time, slowest first"""
+        with self._lock:
+            entries = sorted(self._entries.values(), key=lambda entry: -entry["total_ms"])[:limit]
+            return [{
+                "statement": entry["statement"],
+                "calls": entry["calls"],
+                "total_ms": round(entry["total_ms"], 2),
+                "mean_ms": round(entry["total_ms"] / entry["calls"], 2),
+                "max_ms": round(entry["max_ms"], 2),
+                "parameters": entry["parameters"],
+                "routes": dict(entry["routes"].most_common(ROUTES_PER_STATEMENT)),
+                "last_seen": entry["last_seen"],
+                "plan": entry["plan"],
+            } for entry in entries]
+
+    def explain(self, limit: int = 10) -> int:
+        """
+        Explain the slowest execution of the top statements that have no plan yet
+
+        Only SELECTs are explained, since ANALYZE runs the statement again.
+        Returns how many plans were captured.
+        """
+        if self._engine is None:
+            return 0
+        with self._lock:
+            entries = sorted(self._entries.values(), key=lambda entry: -entry["total_ms"])[:limit]
+            pending = [
+                (entry["statement"], entry["sample"]) for entry in entries
+                if entry["plan"] is None and entry["sample"][1] is not None
+                and _EXPLAINABLE.match(entry["sample"][0])
+            ]
+
+        captured = 0
+        for key, (statement, parameters) in pending:
+            try:
+                plan = self._explain_statement(statement, parameters)
+            except Exception as e:
+                logger.warning("Could not explain slow query: %s", e)
+                continue
+            with self._lock:
+                if key in self._entries:
+                    self._entries[key]["plan"] = plan
+                    captured += 1
+        return captured
+
+    def _explain_statement(self, statement: str, parameters: Any) -> str:
+        with self._engine.connect() as conn:
+            if conn.dialect.name == "postgresql":
+                conn.exec_driver_sql("SET TRANSACTION READ ONLY")
+                conn.exec_driver_sql(
+                    f"SET LOCAL statement_timeout = {int(settings.SLOW_QUERY_EXPLAIN_TIMEOUT_MS)}"
+                )
+                rows = conn.exec_driver_sql(f"EXPLAIN (ANALYZE, BUFFERS) {statement}", parameters).all()
+                plan = "\n".join(row[0] for row in rows)
+            else:
+                rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+                plan = "\n".join(str(row[-1]) for row in rows)
+            conn.rollback()
+        return plan
+
+    def reset(self) -> None:
+        """Forget all recorded statements"""
+        with self._lock:
+            self._entries.clear()
+            self.dropped = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class RequestScopeMiddleware:
+    """Expose the ASGI scope to statement listeners, to label queries by route"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = request_scope.set(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            request_scope.reset(token)
+
+
+slow_query_log = SlowQueryLog(
+    threshold_ms=settings.SLOW_QUERY_THRESHOLD_MS,
+    max_statements=settings.SLOW_QUERY_MAX_STATEMENTS,
+)
@@ -0,0 +1,177 @@
+"""
+Trending Products
+Units sold per product over sliding windows (24h, 7d), served from memory.
+
+Each product has a ring of hourly buckets covering the longest window, plus
+a running total per window that is adjusted as sales are recorded and as
+hours roll out of the window, so a read is a top-N over the totals with no
+aggregate query. Orders feed sales through record_sales(). A background
+sync every TRENDING_SYNC_INTERVAL_SECONDS adds this worker's new sales to
+ProductSalesHourly and reloads the buckets from it, so every worker sees
+the sales of all workers and a restart only loses the unsynced interval.
+"""
+import heapq
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.dialects import upsert
+from app.db.session import SessionLocal
+from app.models.product import ProductSalesHourly
+from app.services.background import PeriodicTask
+
+logger = logging.getLogger(__name__)
+
+WINDOWS = {"24h": 24, "7d": 24 * 7}
+RING_HOURS = max(WINDOWS.values())
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def hour_number(moment: datetime) -> int:
+    """Get the number of whole hours between the epoch and a UTC time"""
+    return int((moment - _EPOCH).total_seconds() // 3600)
+
+
+def hour_start(number: int) -> datetime:
+    """Get the UTC start of an hour number"""
+    return _EPOCH + timedelta(hours=number)
+
+
+class TrendingEngine:
+    """Hourly sales buckets and sliding-window totals per product"""
+
+    def __init__(self, clock: Callable[[], datetime] = datetime.utcnow):
+        self.clock = clock
+        self.loaded = False
+        self._lock = threading.Lock()
+        self._current_hour = hour_number(clock())
+        self._rings: Dict[str, List[int]] = {}
+        self._totals: Dict[int, Dict[str, int]] = {hours: {} for hours in WINDOWS.values()}
+        # Sales recorded since the last sync, by (product_id, hour number)
+        self._pending: Dict[Tuple[str, int], int] = {}
+
+    def _advance(self, now_hour: int) -> None:
+        """Roll the buckets forward to now_hour (caller holds the lock)"""
+        if now_hour <= self._current_hour:
+            return
+        if now_hour - self._current_hour >= RING_HOURS:
+            self._rings.clear()
+            for totals in self._totals.values():
+                totals.clear()
+        else:
+            for hour in range(self._current_hour + 1, now_hour + 1):
+                for product_id, ring in self._rings.items():
+                    for hours, totals in self._totals.items():
+                        leaving = ring[(hour - hours) % RING_HOURS]
+                        if leaving:
+                            totals[product_id] -= leaving
+                    ring[hour % RING_HOURS] = 0
+            longest = self._totals[RING_HOURS]
+            for product_id in [p for p in self._rings if not longest.get(p)]:
+                del self._rings[product_id]
+                for totals in self._totals.values():
+                    totals.pop(product_id, None)
+        self._current_hour = now_hour
+
+    def _add(self, product_id: str, hour: int, quantity: int) -> None:
+        """Add sales to one bucket (caller holds the lock)"""
+        if not quantity or hour > self._current_hour or hour <= self._current_hour - RING_HOURS:
+            return
+        ring = self._rings.setdefault(product_id, [0] * RING_HOURS)
+        ring[hour % RING_HOURS] += quantity
+        for hours, totals in self._totals.items():
+            if hour > self._current_hour - hours:
+                totals[product_id] = totals.get(product_id, 0) + quantity
+
+    def record_sales(self, quantities: Dict[str, int]) -> None:
+        """Count units sold per product in the current hour"""
+        hour = hour_number(self.clock())
+        with self._lock:
+            self._advance(hour)
+            for product_id, quantity in quantities.items():
+                self._add(product_id, hour, quantity)
+                key = (product_id, hour)
+                self._pending[key] = self._pending.get(key, 0) + quantity
+
+    def top(self, window: str, limit: int) -> List[Tuple[str, int]]:
+        """Get the best selling (product_id, units) pairs over a window"""
+        hours = WINDOWS[window]
+        with self._lock:
+            self._advance(hour_number(self.clock()))
+            totals = [(product_id, units) for product_id, units in self._totals[hours].items() if units > 0]
+        return heapq.nlargest(limit, totals, key=lambda item: item[1])
+
+    def persist(self, db: Session) -> int:
+        """Add pending sales to ProductSalesHourly and prune expired rows, returning rows written"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        try:
+            if pending:
+                rows = [
+                    {"product_id": product_id, "hour": hour_start(hour), "quantity": quantity}
+                    for (product_id, hour), quantity in sorted(pending.items())
+                ]
+                table = ProductSalesHourly.__table__
+                stmt = upsert(db, table)
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[table.c.product_id, table.c.hour],
+                    set_={"quantity": table.c.quantity + stmt.excluded.quantity},
+                )
+                db.execute(stmt, rows)
+            cutoff = hour_start(hour_number(self.clock()) - settings.TRENDING_RETENTION_DAYS * 24)
+            db.query(ProductSalesHourly).filter(
+                ProductSalesHourly.hour < cutoff
+            ).delete(synchronize_session=False)
+            db.commit()
+        except Exception:
+            db.rollback()
+            with self._lock:
+                for key, quantity in pending.items():
+                    self._pending[key] = self._pending.get(key, 0) + quantity
+            raise
+        return len(pending)
+
+    def reload(self, db: Session) -> None:
+        """Rebuild the buckets from ProductSalesHourly plus unsynced local sales"""
+        now_hour = hour_number(self.clock())
+        rows = db.query(
+            ProductSalesHourly.product_id, ProductSalesHourly.hour, ProductSalesHourly.quantity
+        ).filter(ProductSalesHourly.hour >= hour_start(now_hour - RING_HOURS + 1)).all()
+        with self._lock:
+            self._current_hour = max(now_hour, self._current_hour)
+            self._rings.clear()
+            for totals in self._totals.values():
+                totals.clear()
+            for product_id, hour, quantity in rows:
+                self._add(product_id, hour_number(hour), quantity)
+            for (product_id, hour), quantity in self._pending.items():
+                self._add(product_id, hour, quantity)
+            self.loaded = True
+
+    def sync(self, db: Session) -> None:
+        """Persist this worker's sales, then reload everyone's"""
+        self.persist(db)
+        self.reload(db)
+
+
+trending = TrendingEngine()
+
+
+def _sync_trending() -> None:
+    db = SessionLocal()
+    try:
+        trending.sync(db)
+    finally:
+        db.close()
+
+
+trending_task = PeriodicTask(
+    "trending-sync",
+    settings.TRENDING_SYNC_INTERVAL_SECONDS,
+    _sync_trending,
+)
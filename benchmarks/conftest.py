@@ -0,0 +1,156 @@
+"""
+Fixtures for the micro-benchmarks
+A catalog is generated once per run into a throwaway SQLite file. Set
+BENCHMARK_DATABASE_URL to benchmark on PostgreSQL instead; point it at a
+dedicated database, since its tables are created and dropped by the run.
+"""
+import os
+import random
+import uuid
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.security import create_access_token, get_password_hash
+from app.db.base import Base
+from app.models.cart import CartItem
+from app.models.category import Category
+from app.models.product import Product
+from app.models.review import Review
+from app.models.user import User
+
+PRODUCT_COUNT = 5000
+USER_COUNT = 200
+CART_SIZE = 12
+REVIEWS_PER_PRODUCT = 50
+SEED = 20261019
+
+WORDS = [
+    "apple", "milk", "organic", "cheese", "coffee", "chicken", "bread", "juice", "chocolate", "rice",
+    "banana", "yogurt", "pasta", "tomato", "honey", "almond", "salmon", "spinach", "butter", "tea",
+]
+PARENT_CATEGORIES = {
+    "produce": ["fruit", "vegetables", "herbs"],
+    "dairy": ["milk-cream", "cheese", "yogurt"],
+    "pantry": ["pasta-rice", "snacks", "beverages", "breakfast"],
+}
+
+
+def _category_rows():
+    rows = []
+    for parent_slug, children in PARENT_CATEGORIES.items():
+        parent_id = f"bench-{parent_slug}"
+        rows.append({"id": parent_id, "name": parent_slug.title(), "slug": parent_slug, "parent_id": None})
+        for child_slug in children:
+            rows.append({
+                "id": f"bench-{child_slug}", "name": child_slug.replace("-", " ").title(),
+                "slug": child_slug, "parent_id": parent_id,
+            })
+    return rows
+
+
+def _product_rows(rng: random.Random, leaf_ids):
+    now = datetime.utcnow()
+    for n in range(PRODUCT_COUNT):
+        words = rng.sample(WORDS, 3)
+        price = round(rng.uniform(0.5, 60.0), 2)
+        on_sale = rng.random() < 0.15
+        stock = rng.choice([0, 5, 40, 200, 1000])
+        yield {
+            "id": str(uuid.UUID(int=rng.getrandbits(128))),
+            "name": f"{words[0].title()} {words[1]} {n}",
+            "slug": f"bench-product-{n}",
+            "sku": f"BENCH-{n:06d}",
+            "description": f"Fresh {words[0]} with {words[1]} and a hint of {words[2]}.",
+            "category_id": rng.choice(leaf_ids),
+            "price": price,
+            "original_price": round(price * 1.25, 2) if on_sale else None,
+            "tags": words[:2],
+            "thumbnail": f"https://example.com/images/{n}.jpg",
+            "is_organic": rng.random() < 0.3,
+            "is_on_sale": on_sale,
+            "in_stock": stock > 0,
+            "stock_quantity": stock,
+            "purchase_count": int(rng.paretovariate(1.2)),
+            "view_count": int(rng.paretovariate(1.1) * 10),
+            "created_at": now - timedelta(minutes=n),
+            "updated_at": now,
+        }
+
+
+@pytest.fixture(scope="session")
+def bench_engine(tmp_path_factory):
+    """Create the benchmark database and tables"""
+    url = os.getenv("BENCHMARK_DATABASE_URL")
+    if url:
+        engine = create_engine(url)
+    else:
+        path = tmp_path_factory.mktemp("bench") / "bench.db"
+        engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    Base.metadata.drop_all(bind=engine)
+    engine.dispose()
+
+
+@pytest.fixture(scope="session")
+def bench_data(bench_engine):
+    """Generate the benchmark catalog, users, carts and reviews"""
+    rng = random.Random(SEED)
+    session = sessionmaker(bind=bench_engine)()
+    try:
+        categories = _category_rows()
+        leaf_ids = [row["id"] for row in categories if row["parent_id"]]
+        session.execute(Category.__table__.insert(), categories)
+
+        products = list(_product_rows(rng, leaf_ids))
+        session.execute(Product.__table__.insert(), products)
+
+        # Hashing is deliberately slow; every user shares one hash
+        hashed_password = get_password_hash("benchmark-password")
+        users = [{
+            "id": str(uuid.UUID(int=rng.getrandbits(128))),
+            "email": f"bench{n}@example.com",
+            "username": f"bench{n}",
+            "hashed_password": hashed_password,
+            "is_active": True,
+        } for n in range(USER_COUNT)]
+        session.execute(User.__table__.insert(), users)
+
+        cart_user_id = users[0]["id"]
+        cart_products = rng.sample(products, CART_SIZE)
+        session.execute(CartItem.__table__.insert(), [{
+            "id": str(uuid.uuid4()), "user_id": cart_user_id, "product_id": product["id"],
+            "quantity": rng.randint(1, 4), "price_at_time": product["price"],
+        } for product in cart_products])
+
+        reviewed_id = products[0]["id"]
+        session.execute(Review.__table__.insert(), [{
+            "id": str(uuid.uuid4()), "user_id": users[n % USER_COUNT]["id"], "product_id": reviewed_id,
+            "rating": rng.randint(1, 5), "title": "Review", "comment": "Benchmark review",
+        } for n in range(REVIEWS_PER_PRODUCT)])
+        session.commit()
+
+        return SimpleNamespace(
+            parent_category_id="bench-produce",
+            leaf_category_id=leaf_ids[0],
+            cart_user_id=cart_user_id,
+            cart_products=cart_products,
+            order_user_id=users[1]["id"],
+            reviewed_product_id=reviewed_id,
+            token=create_access_token(users[2]["id"]),
+        )
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def bench_db(bench_engine, bench_data):
+    """Session on the benchmark database"""
+    session = sessionmaker(bind=bench_engine, autoflush=False)()
+    yield session
+    session.close()
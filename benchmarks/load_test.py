@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+"""
+HTTP load test: replay a mix of shopper scenarios and report latency per route
+Usage: python benchmarks/load_test.py [--duration 60] [--concurrency 32] [--workers 2] \
+           [--output results.json] [--baseline baseline.json] [--base-url http://host:port]
+
+Seed the database first with scripts/seed_load_test_data.py: each virtual
+user logs in as one of its generated users, and products are picked with
+the same skewed popularity. Unless --base-url is given, the app is started
+with uvicorn against the configured DATABASE_URL (local PostgreSQL or
+SQLite), with Stripe replaced by an in-process fake so checkout never
+leaves the machine. An external --base-url server must fake Stripe itself
+(load create_app from this module) for checkouts to succeed.
+
+Requests made during --warmup are not recorded. The report gives count,
+RPS, error counts and p50/p95/p99 latency per route as JSON; with
+--baseline, routes whose p95 grew or RPS fell by more than --tolerance are
+listed and the exit status is 1.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+import uuid
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import httpx
+
+API = "/api/v1"
+LOAD_TEST_PASSWORD = "loadtest-password"  # As set by scripts/seed_load_test_data.py
+
+# Relative frequency of each scenario
+SCENARIO_WEIGHTS = {"browse": 55, "search": 20, "cart": 15, "checkout": 10}
+SEARCH_TERMS = ["apple", "milk", "organic", "cheese", "coffee", "chicken", "bread", "juice", "chocolate", "rice"]
+
+
+class FakeStripeService:
+    """Stands in for StripeService: payment intents are created and succeed locally"""
+
+    @staticmethod
+    def create_payment_intent(amount: float, currency: str = "usd", metadata=None, customer_email=None):
+        intent_id = f"pi_fake_{uuid.uuid4().hex[:24]}"
+        return {
+            "id": intent_id,
+            "client_secret": f"{intent_id}_secret_fake",
+            "amount": int(amount * 100),
+            "currency": currency,
+            "status": "requires_payment_method",
+        }
+
+    @staticmethod
+    def retrieve_payment_intent(payment_intent_id: str):
+        return {"id": payment_intent_id, "status": "succeeded", "amount": 0, "currency": "usd", "metadata": {}}
+
+
+def create_app():
+    """App factory for uvicorn --factory: the API with Stripe faked"""
+    from app.services.stripe_service import StripeService
+
+    StripeService.create_payment_intent = FakeStripeService.create_payment_intent
+    StripeService.retrieve_payment_intent = FakeStripeService.retrieve_payment_intent
+    from main import app
+    return app
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--duration", type=float, default=60.0, help="Seconds to record after warmup")
+    parser.add_argument("--warmup", type=float, default=5.0, help="Seconds of unrecorded traffic first")
+    parser.add_argument("--concurrency", type=int, default=32, help="Virtual users")
+    parser.add_argument("--workers", type=int, default=2, help="uvicorn worker processes")
+    parser.add_argument("--base-url", default=None, help="Test a running server instead of starting one")
+    parser.add_argument("--products", type=int, default=2000, help="Most popular products to pick from")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default="-", help="JSON report file, or - for stdout")
+    parser.add_argument("--baseline", default=None, help="Earlier JSON report to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed p95/RPS regression (0.2 = 20%%)")
+    return parser.parse_args()
+
+
+def percentile(ordered: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not ordered:
+        return 0.0
+    index = max(0, min(len(ordered) - 1, math.ceil(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+class Recorder:
+    """Collects request latencies per route once recording has started"""
+
+    def __init__(self):
+        self.recording = False
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.client_errors: Dict[str, int] = defaultdict(int)
+        self.server_errors: Dict[str, int] = defaultdict(int)
+
+    def record(self, route: str, status_code: Optional[int], seconds: float) -> None:
+        if not self.recording:
+            return
+        self.latencies[route].append(seconds)
+        if status_code is None or status_code >= 500:
+            self.server_errors[route] += 1
+        elif status_code >= 400:
+            self.client_errors[route] += 1
+
+    def report(self, elapsed: float) -> Dict[str, Any]:
+        routes = {}
+        for route, samples in sorted(self.latencies.items()):
+            ordered = sorted(samples)
+            routes[route] = {
+                "count": len(ordered),
+                "rps": round(len(ordered) / elapsed, 2),
+                "client_errors": self.client_errors[route],
+                "server_errors": self.server_errors[route],
+                "mean_ms": round(1000 * sum(ordered) / len(ordered), 2),
+                "p50_ms": round(1000 * percentile(ordered, 0.50), 2),
+                "p95_ms": round(1000 * percentile(ordered, 0.95), 2),
+                "p99_ms": round(1000 * percentile(ordered, 0.99), 2),
+            }
+        everything = sorted(sample for samples in self.latencies.values() for sample in samples)
+        return {
+            "routes": routes,
+            "total": {
+                "count": len(everything),
+                "rps": round(len(everything) / elapsed, 2),
+                "client_errors": sum(self.client_errors.values()),
+                "server_errors": sum(self.server_errors.values()),
+                "p50_ms": round(1000 * percentile(everything, 0.50), 2),
+                "p95_ms": round(1000 * percentile(everything, 0.95), 2),
+                "p99_ms": round(1000 * percentile(everything, 0.99), 2),
+            },
+        }
+
+
+class VirtualUser:
+    """One logged-in shopper running scenarios back to back"""
+
+    def __init__(self, number: int, client: httpx.AsyncClient, recorder: Recorder,
+                 product_ids: List[str], cum_weights: List[float], seed: int):
+        self.number = number
+        self.client = client
+        self.recorder = recorder
+        self.product_ids = product_ids
+        self.cum_weights = cum_weights
+        self.rng = random.Random(seed * 100003 + number)
+        self.headers: Dict[str, str] = {}
+
+    async def request(self, method: str, route: str, url: str, **kwargs: Any) -> Optional[httpx.Response]:
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, API + url, headers=self.headers, **kwargs)
+        except httpx.HTTPError:
+            self.recorder.record(route, None, time.perf_counter() - started)
+            return None
+        self.recorder.record(route, response.status_code, time.perf_counter() - started)
+        return response
+
+    def pick_product(self) -> str:
+        return self.rng.choices(self.product_ids, cum_weights=self.cum_weights)[0]
+
+    async def login(self) -> bool:
+        response = await self.request("POST", "POST /auth/login", "/auth/login", json={
+            "email": f"loadtest{self.number}@example.com", "password": LOAD_TEST_PASSWORD,
+        })
+        if response is None or response.status_code != 200:
+            return False
+        self.headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        return True
+
+    async def browse(self) -> None:
+        await self.request("GET", "GET /categories/tree", "/categories/tree")
+        await self.request("GET", "GET /products/", "/products/", params={
+            "page": self.rng.randint(1, 5), "limit": 20, "sort_by": self.rng.choice(["name", "price", "popular"]),
+        })
+        for _ in range(self.rng.randint(1, 3)):
+            product_id = self.pick_product()
+            await self.request("GET", "GET /products/{id}", f"/products/{product_id}")
+            await self.request("GET", "GET /products/{id}/related", f"/products/{product_id}/related")
+        if self.rng.random() < 0.3:
+            await self.request("GET", "GET /products/trending", "/products/trending")
+
+    async def search(self) -> None:
+        await self.request("GET", "GET /products/search", "/products/search", params={
+            "q": self.rng.choice(SEARCH_TERMS), "limit": 20,
+        })
+        await self.request("GET", "GET /products/{id}", f"/products/{self.pick_product()}")
+
+    async def cart(self) -> None:
+        await self.request("GET", "GET /cart/", "/cart/")
+        await self.request("POST", "POST /cart/items", "/cart/items", json={
+            "product_id": self.pick_product(), "quantity": self.rng.randint(1, 3),
+        })
+        await self.request("GET", "GET /cart/", "/cart/")
+
+    async def checkout(self) -> None:
+        await self.request("DELETE", "DELETE /cart/", "/cart/")
+        await self.request("POST", "POST /cart/items:batch", "/cart/items:batch", json={"items": [
+            {"product_id": self.pick_product(), "quantity": self.rng.randint(1, 2)}
+            for _ in range(self.rng.randint(1, 4))
+        ]})
+        response = await self.request("POST", "POST /orders/", "/orders/", json={})
+        if response is None or response.status_code != 200:
+            return
+        order_id = response.json()["id"]
+        response = await self.request(
+            "POST", "POST /orders/{id}/create-payment-intent", f"/orders/{order_id}/create-payment-intent"
+        )
+        if response is None or response.status_code != 200:
+            return
+        await self.request("POST", "POST /orders/{id}/confirm-payment", f"/orders/{order_id}/confirm-payment", json={
+            "payment_intent_id": response.json()["payment_intent_id"],
+        })
+
+    async def run(self, stop_at: float) -> None:
+        scenarios = list(SCENARIO_WEIGHTS)
+        weights = [SCENARIO_WEIGHTS[name] for name in scenarios]
+        while time.monotonic() < stop_at:
+            scenario = self.rng.choices(scenarios, weights=weights)[0]
+            await getattr(self, scenario)()
+
+
+def popular_products(limit: int) -> List[str]:
+    """Get the ids of the best selling active, in-stock products, most popular first"""
+    from app.db.session import SessionLocal
+    from app.models.product import Product
+
+    db = SessionLocal()
+    try:
+        rows = db.query(Product.id).filter(
+            Product.is_active == True, Product.in_stock == True
+        ).order_by(Product.purchase_count.desc(), Product.id).limit(limit).all()
+        return [product_id for (product_id,) in rows]
+    finally:
+        db.close()
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(workers: int) -> Tuple[subprocess.Popen, str]:
+    """Start uvicorn with the Stripe-faked app and wait until it answers"""
+    port = free_port()
+    root = Path(__file__).parent.parent
+    env = dict(os.environ, PYTHONPATH=str(root))
+    server = subprocess.Popen([
+        sys.executable, "-m", "uvicorn", "load_test:create_app", "--factory",
+        "--app-dir", str(Path(__file__).parent), "--host", "127.0.0.1", "--port", str(port),
+        "--workers", str(workers), "--log-level", "warning",
+    ], cwd=root, env=env)
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"Server exited with status {server.returncode}")
+        try:
+            if httpx.get(f"{base_url}/health", timeout=2).status_code == 200:
+                return server, base_url
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    server.terminate()
+    raise RuntimeError("Server did not become healthy within 60s")
+
+
+async def run_load(args: argparse.Namespace, base_url: str, product_ids: List[str]) -> Dict[str, Any]:
+    recorder = Recorder()
+    # Zipf-like weights over the popularity order, as in the seeded orders
+    cum_weights = list(itertools.accumulate(1.0 / rank for rank in range(1, len(product_ids) + 1)))
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        users = [VirtualUser(n, client, recorder, product_ids, cum_weights, args.seed) for n in range(args.concurrency)]
+        logged_in = await asyncio.gather(*(user.login() for user in users))
+        if not all(logged_in):
+            raise RuntimeError(
+                f"{logged_in.count(False)} of {len(users)} virtual users could not log in; "
+                "seed them with scripts/seed_load_test_data.py"
+            )
+
+        started = time.monotonic()
+        stop_at = started + args.warmup + args.duration
+
+        async def start_recording():
+            await asyncio.sleep(args.warmup)
+            recorder.recording = True
+
+        await asyncio.gather(start_recording(), *(user.run(stop_at) for user in users))
+    report = recorder.report(args.duration)
+    report["meta"] = {
+        "base_url": base_url,
+        "duration_s": args.duration,
+        "warmup_s": args.warmup,
+        "concurrency": args.concurrency,
+        "workers": None if args.base_url else args.workers,
+        "seed": args.seed,
+        "scenario_weights": SCENARIO_WEIGHTS,
+        "finished_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+    }
+    return report
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """List routes that regressed against the baseline by more than tolerance"""
+    regressions = []
+    for route, before in baseline.get("routes", {}).items():
+        after = report["routes"].get(route)
+        if after is None:
+            continue
+        if before["p95_ms"] and after["p95_ms"] > before["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{route}: p95 {before['p95_ms']}ms -> {after['p95_ms']}ms")
+        if before["rps"] and after["rps"] < before["rps"] * (1 - tolerance):
+            regressions.append(f"{route}: rps {before['rps']} -> {after['rps']}")
+    return regressions
+
+
+def main():
+    args = parse_args()
+    product_ids = popular_products(args.products)
+    if not product_ids:
+        print("❌ No products found; seed them with scripts/seed_load_test_data.py", file=sys.stderr)
+        sys.exit(2)
+
+    server = None
+    base_url = args.base_url
+    if base_url is None:
+        server, base_url = start_server(args.workers)
+    try:
+        report = asyncio.run(run_load(args, base_url, product_ids))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+
+    text = json.dumps(report, indent=2)
+    if args.output == "-":
+        print(text)
+    else:
+        Path(args.output).write_text(text + "\n")
+    total = report["total"]
+    print(f"✅ {total['count']} requests, {total['rps']} req/s, p95 {total['p95_ms']}ms, "
+          f"{total['server_errors']} server errors", file=sys.stderr)
+
+    if args.baseline:
+        regressions = compare(report, json.loads(Path(args.baseline).read_text()), args.tolerance)
+        for regression in regressions:
+            print(f"❌ {regression}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+        print(f"✅ No regressions beyond {args.tolerance:.0%} against {args.baseline}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Micro-benchmarks for the hot crud paths, dependencies and schemas
+Usage: pytest benchmarks/ [--benchmark-autosave] [--benchmark-compare] \
+           [--benchmark-compare-fail=mean:15%]
+
+Each test times one function against the catalog built in conftest.py, on
+SQLite unless BENCHMARK_DATABASE_URL is set. --benchmark-autosave stores the
+run under .benchmarks/ (per machine, Python version and run); a later run
+with --benchmark-compare prints every function beside the last saved run,
+and --benchmark-compare-fail fails the run when one regressed past the
+threshold. `pytest-benchmark list` and `pytest-benchmark compare` browse
+the saved history. CI (.github/workflows/benchmarks.yml) compares every
+run with the last one saved from main, and saves main runs to extend it.
+"""
+from typing import List
+
+import pytest
+from pydantic import TypeAdapter
+
+pytest.importorskip("pytest_benchmark")
+
+from app.api.deps import get_current_user
+from app.crud.cart import add_items_to_cart, get_user_cart
+from app.crud.order import create_order
+from app.crud.product import get_products, search_products
+from app.crud.review import update_product_rating
+from app.schemas.cart import CartItemCreate
+from app.schemas.order import OrderCreate
+from app.schemas.product import ProductSummary
+
+
+@pytest.mark.benchmark(group="get_products")
+@pytest.mark.parametrize("filters,sort_by,sort_order", [
+    pytest.param(None, "name", "asc", id="unfiltered"),
+    pytest.param({"category": "leaf"}, "name", "asc", id="category"),
+    pytest.param({"category": "parent", "include_subcategories": True}, "name", "asc", id="category-tree"),
+    pytest.param({"search": "apple"}, "name", "asc", id="search"),
+    pytest.param({"min_price": 5.0, "max_price": 20.0}, "price", "desc", id="price-range"),
+    pytest.param({"in_stock": True, "is_organic": True, "is_on_sale": True}, "newest", "desc", id="flags"),
+    pytest.param(None, "popular", "desc", id="popular"),
+])
+def test_get_products(benchmark, bench_db, bench_data, filters, sort_by, sort_order):
+    if filters and filters.get("category") == "leaf":
+        filters = {**filters, "category": bench_data.leaf_category_id}
+    elif filters and filters.get("category") == "parent":
+        filters = {**filters, "category": bench_data.parent_category_id}
+
+    products = benchmark(get_products, bench_db, 0, 24, filters, sort_by, sort_order)
+    assert products
+
+
+@pytest.mark.benchmark(group="search_products")
+@pytest.mark.parametrize("query", ["apple", "no-such-product"])
+def test_search_products(benchmark, bench_db, query):
+    benchmark(search_products, bench_db, query, None, 0, 24)
+
+
+@pytest.mark.benchmark(group="get_user_cart")
+def test_get_user_cart(benchmark, bench_db, bench_data):
+    cart = benchmark(get_user_cart, bench_db, bench_data.cart_user_id)
+    assert len(cart.items) == len(bench_data.cart_products)
+
+
+@pytest.mark.benchmark(group="create_order")
+def test_create_order(benchmark, bench_db, bench_data):
+    order_in = OrderCreate()
+    items = [CartItemCreate(product_id=product["id"], quantity=2) for product in bench_data.cart_products]
+
+    def fill_cart():
+        add_items_to_cart(bench_db, bench_data.order_user_id, items)
+        return (bench_db, bench_data.order_user_id, order_in), {}
+
+    # Each order empties the cart, so every round gets a fresh one (not timed)
+    order = benchmark.pedantic(create_order, setup=fill_cart, rounds=50, warmup_rounds=2)
+    assert order is not None
+
+
+@pytest.mark.benchmark(group="update_product_rating")
+def test_update_product_rating(benchmark, bench_db, bench_data):
+    benchmark(update_product_rating, bench_db, bench_data.reviewed_product_id)
+
+
+@pytest.mark.benchmark(group="get_current_user")
+def test_get_current_user(benchmark, bench_db, bench_data):
+    user = benchmark(get_current_user, db=bench_db, token=bench_data.token)
+    assert user.is_active
+
+
+@pytest.mark.benchmark(group="serialization")
+def test_product_summary_serialization(benchmark, bench_db):
+    products = get_products(bench_db, limit=100)
+    adapter = TypeAdapter(List[ProductSummary])
+
+    def serialize():
+        # Validate from ORM rows then dump to JSON types, as the response_model does
+        return adapter.dump_python(adapter.validate_python(products, from_attributes=True), mode="json")
+
+    assert len(benchmark(serialize)) == 100
@@ -7,8 +7,15 @@ import time
 from sqlalchemy import text
 
 from app.api.api import api_router
+from app.api.profiling import profile_request
 from app.core.config import settings
 from app.db.session import engine, SessionLocal
+from app.services import order_events  # noqa: F401 - registers outbox consumers
+from app.services.outbox import relay_task
+from app.services.notification_broker import notification_broker
+from app.services.product_counters import product_counter_task
+from app.services.slow_queries import RequestScopeMiddleware, slow_query_log
+from app.services.trending import trending_task
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -20,6 +27,10 @@ app = FastAPI(
     swagger_ui_oauth2_redirect_url="/docs/oauth2-redirect",
 )
 
+# Admin-only ?profile=1 call trees; not installed unless enabled
+if settings.PROFILING_ENABLED:
+    app.middleware("http")(profile_request)
+
 # Set CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -29,6 +40,33 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Time every statement and label slow ones with the route that ran them
+if settings.SLOW_QUERY_LOG_ENABLED:
+    slow_query_log.install(engine)
+    app.add_middleware(RequestScopeMiddleware)
+
+@app.on_event("startup")
+def start_background_tasks():
+    if not settings.BACKGROUND_TASKS_ENABLED:
+        return
+    if settings.OUTBOX_RELAY_ENABLED:
+        relay_task.start()
+    if settings.PRODUCT_COUNTERS_ENABLED:
+        product_counter_task.start()
+    if settings.TRENDING_SYNC_ENABLED:
+        trending_task.start()
+    if settings.NOTIFICATION_STREAM_PG_BRIDGE and engine.dialect.name == "postgresql":
+        notification_broker.start_bridge()
+
+
+@app.on_event("shutdown")
+def stop_background_tasks():
+    relay_task.stop()
+    product_counter_task.stop()
+    trending_task.stop()
+    notification_broker.stop_bridge()
+
+
 # Root endpoint
 @app.get("/", tags=["Root"])
 async def root():
@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+"""
+Rebuild the sales analytics rollup tables from all orders
+Usage: python scripts/backfill_sales_rollups.py
+
+Order events keep the rollups current; run this once after deploying them,
+or to repair drift. Run it while the outbox relay is drained (no pending
+order events), otherwise orders still in the outbox are counted twice.
+"""
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.crud.analytics import rebuild_sales_rollups
+from app.db.session import SessionLocal
+
+
+def main():
+    db = SessionLocal()
+    try:
+        count = rebuild_sales_rollups(db)
+        print(f"✅ Rebuilt sales rollups from {count} orders")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
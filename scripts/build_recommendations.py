@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Rebuild the precomputed related-product recommendations from order history
+Usage: python scripts/build_recommendations.py [--top-k N] [--min-co-purchases N]
+
+Requires numpy and scipy. Schedule it (e.g. nightly cron); until a product
+has recommendations, related products fall back to category best sellers.
+"""
+import argparse
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.services.recommendations import rebuild_recommendations
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild related-product recommendations")
+    parser.add_argument("--top-k", type=int, default=settings.RECOMMENDATIONS_TOP_K)
+    parser.add_argument("--min-co-purchases", type=int, default=settings.RECOMMENDATIONS_MIN_CO_PURCHASES)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        count = rebuild_recommendations(db, top_k=args.top_k, min_co_purchases=args.min_co_purchases)
+        print(f"✅ Rebuilt recommendations for {count} products")
+    except ImportError as e:
+        print(f"❌ {e} (install numpy and scipy to build recommendations)")
+        sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
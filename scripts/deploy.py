@@ -3,6 +3,7 @@ import os
 import sys
 import logging
 import subprocess
+import time
 from urllib.parse import urlparse, unquote
 
 import psycopg2
@@ -91,30 +92,59 @@ def ensure_database_exists(db_user: str, db_password: str, db_host: str, db_port
         conn.close()
 
 
-def run_alembic_upgrade():
+# Raised by PostgreSQL when a migration gives up waiting for a lock (lock_timeout)
+LOCK_TIMEOUT_MARKERS = ("LockNotAvailable", "lock timeout")
+
+
+def run_alembic_upgrade(retries: int = 5, retry_delay: float = 10.0, retry_budget: float = 120.0):
     """
     Runs: alembic upgrade head
     Assumes alembic.ini is in project root (current working directory).
-    """
-    log.info("Running Alembic migrations: alembic upgrade head")
-    result = subprocess.run(
-        ["alembic", "upgrade", "head"],
-        check=False,
-        text=True,
-        capture_output=True,
-        env=os.environ.copy(),
-    )
-
-    if result.stdout:
-        log.info("alembic stdout:\n%s", result.stdout.strip())
-    if result.stderr:
-        # alembic writes some info to stderr sometimes; keep as warning
-        log.warning("alembic stderr:\n%s", result.stderr.strip())
 
-    if result.returncode != 0:
-        raise RuntimeError(f"Alembic failed with exit code {result.returncode}")
+    Meant to run as a one-off job before the app container is replaced, not
+    in the container's start command (see Dockerfile): index builds and
+    backfills can take longer than any startup window.
 
-    log.info("Alembic migrations completed.")
+    Output is logged as it arrives, so long index builds and backfills show
+    progress. Migrations give up on locks after MIGRATION_LOCK_TIMEOUT_MS
+    rather than stalling writes; such failures are retried with a growing
+    delay, sleeping at most retry_budget seconds in total. Each revision
+    commits on its own, so a retry (or the next deploy, if this one fails)
+    resumes at the revision that failed.
+    """
+    waited = 0.0
+    for attempt in range(1, retries + 2):
+        log.info("Running Alembic migrations: alembic upgrade head (attempt %d)", attempt)
+        process = subprocess.Popen(
+            ["alembic", "upgrade", "head"],
+            text=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            env=os.environ.copy(),
+        )
+        output = []
+        for line in process.stdout:
+            line = line.rstrip()
+            output.append(line)
+            log.info("alembic: %s", line)
+        returncode = process.wait()
+
+        if returncode == 0:
+            log.info("Alembic migrations completed.")
+            return
+
+        lock_timeout = any(marker in line for line in output for marker in LOCK_TIMEOUT_MARKERS)
+        if not lock_timeout or attempt > retries:
+            raise RuntimeError(f"Alembic failed with exit code {returncode}")
+
+        delay = retry_delay * attempt
+        if waited + delay > retry_budget:
+            raise RuntimeError(
+                f"Alembic timed out waiting for a lock; gave up after {waited:.0f}s of retries"
+            )
+        log.warning("Migration timed out waiting for a lock; retrying in %.0fs", delay)
+        time.sleep(delay)
+        waited += delay
 
 
 def main():
@@ -128,7 +158,11 @@ def main():
         ensure_database_exists(db_user, db_password, db_host, db_port, db_name)
 
         # Run migrations
-        run_alembic_upgrade()
+        run_alembic_upgrade(
+            retries=int(os.getenv("MIGRATION_LOCK_RETRIES", "5")),
+            retry_delay=float(os.getenv("MIGRATION_LOCK_RETRY_DELAY", "10")),
+            retry_budget=float(os.getenv("MIGRATION_LOCK_RETRY_BUDGET", "120")),
+        )
 
         log.info("✅ Deployment steps completed successfully.")
         return 0
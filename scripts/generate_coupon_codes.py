@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Generate a campaign of single-use coupon codes
+Usage: python scripts/generate_coupon_codes.py --count 100000 --name "Spring" \
+           --type percentage --value 10 --days 30 [--prefix SPRING-] [--output codes.csv]
+"""
+import argparse
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.crud.coupon import bulk_create_coupons
+from app.db.session import SessionLocal
+from app.schemas.coupon import CouponBulkGenerate
+from app.services.coupon_codes import iter_codes_csv
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, required=True)
+    parser.add_argument("--name", required=True)
+    parser.add_argument("--type", dest="discount_type", default="percentage",
+                        choices=["percentage", "fixed_amount"])
+    parser.add_argument("--value", type=float, required=True)
+    parser.add_argument("--days", type=int, default=30, help="Days the codes stay valid")
+    parser.add_argument("--prefix", default="")
+    parser.add_argument("--length", type=int, default=10)
+    parser.add_argument("--minimum-order", type=float, default=None)
+    parser.add_argument("--output", default="-", help="CSV file, or - for stdout")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    now = datetime.utcnow()
+    bulk_in = CouponBulkGenerate(
+        count=args.count,
+        prefix=args.prefix,
+        code_length=args.length,
+        name=args.name,
+        discount_type=args.discount_type,
+        discount_value=args.value,
+        minimum_order_amount=args.minimum_order,
+        valid_from=now,
+        valid_until=now + timedelta(days=args.days),
+    )
+    
+    db = SessionLocal()
+    try:
+        codes = bulk_create_coupons(db, bulk_in)
+    finally:
+        db.close()
+    
+    output = sys.stdout if args.output == "-" else open(args.output, "w", newline="")
+    try:
+        for chunk in iter_codes_csv(codes):
+            output.write(chunk)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    print(f"✅ Generated {len(codes)} coupon codes", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+"""
+Recompute the denormalized product counts on categories
+Usage: python scripts/rebuild_category_counts.py
+
+The product CRUD keeps the counts current; run this after loading products
+outside it (raw SQL, imports) or to repair any drift.
+"""
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.crud.product import rebuild_category_product_counts
+from app.db.session import SessionLocal
+
+
+def main():
+    db = SessionLocal()
+    try:
+        corrected = rebuild_category_product_counts(db)
+        print(f"✅ Rebuilt category product counts ({corrected} corrected)")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
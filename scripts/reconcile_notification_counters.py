@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""
+Recompute the materialized unread notification counters
+Usage: python scripts/reconcile_notification_counters.py [user_id ...]
+
+Safe to run while the app is serving traffic: each batch of users is fixed
+with their counter rows locked, so concurrent updates wait instead of being
+overwritten. Schedule it (e.g. nightly cron) to repair any drift.
+"""
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.crud.notification import reconcile_unread_counters
+from app.db.session import SessionLocal
+
+
+def main():
+    user_ids = sys.argv[1:] or None
+    db = SessionLocal()
+    try:
+        corrected = reconcile_unread_counters(db, user_ids=user_ids)
+        print(f"✅ Reconciled unread counters ({corrected} corrected)")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
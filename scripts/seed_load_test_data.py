@@ -0,0 +1,416 @@
+#!/usr/bin/env python3
+"""
+Generate a synthetic store (users, products, orders, reviews) for load testing
+Usage: python scripts/seed_load_test_data.py [--users 100000] [--products 20000] \
+           [--orders 500000] [--reviews 200000] [--days 180] [--seed 42] [--reset]
+
+Columns are drawn as NumPy arrays and bulk-loaded with COPY on PostgreSQL
+(executemany elsewhere), so millions of rows load in minutes. Product
+popularity and customer activity follow Zipf distributions, order volume
+grows over the period with a daily rhythm, and ratings lean positive. The
+same sizes and --seed always produce the same data. Generated ids start
+with "lt-"; --reset removes them (and anything attached to them) first.
+Every generated user can log in as loadtest<N>@example.com with
+LOAD_TEST_PASSWORD.
+"""
+import argparse
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Sequence
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from sqlalchemy import or_, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.security import get_password_hash
+from app.crud.analytics import VOID_ORDER_STATUSES, rebuild_sales_rollups
+from app.crud.product import rebuild_category_product_counts
+from app.db.dialects import bulk_insert
+from app.db.session import SessionLocal
+from app.models import (
+    Address, CartCoupon, CartItem, Category, CouponRedemption, Notification, NotificationCounter,
+    Order, OrderItem, OrderStatusHistory, Product, ProductRecommendation, ProductSalesDaily,
+    ProductSalesHourly, Review, User, WishlistItem,
+)
+
+LOAD_TEST_PASSWORD = "loadtest-password"
+ID_PREFIX = "lt-"
+
+ORDER_STATUSES = ["delivered", "confirmed", "preparing", "out_for_delivery", "pending", "cancelled", "refunded"]
+ORDER_STATUS_WEIGHTS = [0.78, 0.04, 0.03, 0.03, 0.04, 0.06, 0.02]
+RATING_WEIGHTS = [0.04, 0.06, 0.12, 0.30, 0.48]  # 1 to 5 stars
+# Share of orders placed in each hour of the day (UTC)
+HOUR_WEIGHTS = np.array([
+    1, 1, 1, 1, 1, 2, 3, 5, 6, 6, 6, 7, 8, 7, 6, 6, 7, 9, 10, 10, 8, 6, 4, 2,
+], dtype=float)
+PRODUCT_ZIPF_EXPONENT = 1.07
+CUSTOMER_ZIPF_EXPONENT = 0.8
+
+ADJECTIVES = ["Fresh", "Organic", "Classic", "Premium", "Farm", "Wild", "Golden", "Crispy", "Creamy", "Smoked",
+              "Roasted", "Sweet", "Spicy", "Local", "Artisan", "Family Size", "Mini", "Light"]
+NOUNS = ["Apples", "Bananas", "Spinach", "Tomatoes", "Milk", "Yogurt", "Cheddar", "Eggs", "Chicken Breast",
+         "Salmon", "Sourdough", "Bagels", "Coffee", "Green Tea", "Orange Juice", "Pasta", "Rice", "Granola",
+         "Almonds", "Olive Oil", "Dark Chocolate", "Potato Chips", "Ice Cream", "Frozen Pizza", "Hummus"]
+UNITS = ["per piece", "per kg", "per lb", "per pack", "per bottle"]
+BRANDS = ["Green Valley", "Sunrise Farms", "Harvest Co", "Blue Ridge", "Urban Pantry", "Nature's Best", None]
+
+# Generated rows and everything attached to them, children first
+RESET_ORDER = [
+    (CouponRedemption, [CouponRedemption.user_id]),
+    (OrderStatusHistory, [OrderStatusHistory.order_id]),
+    (OrderItem, [OrderItem.order_id, OrderItem.product_id]),
+    (Order, [Order.user_id]),
+    (Review, [Review.user_id, Review.product_id]),
+    (CartItem, [CartItem.user_id, CartItem.product_id]),
+    (CartCoupon, [CartCoupon.user_id]),
+    (WishlistItem, [WishlistItem.user_id, WishlistItem.product_id]),
+    (Notification, [Notification.user_id]),
+    (NotificationCounter, [NotificationCounter.user_id]),
+    (Address, [Address.user_id]),
+    (ProductRecommendation, [ProductRecommendation.product_id]),
+    (ProductSalesHourly, [ProductSalesHourly.product_id]),
+    (ProductSalesDaily, [ProductSalesDaily.product_id]),
+    (Product, [Product.id]),
+    (User, [User.id]),
+    (Category, [Category.id]),
+]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=100000)
+    parser.add_argument("--products", type=int, default=20000)
+    parser.add_argument("--categories", type=int, default=30)
+    parser.add_argument("--orders", type=int, default=500000)
+    parser.add_argument("--reviews", type=int, default=200000)
+    parser.add_argument("--days", type=int, default=180, help="Days of order history")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--chunk-size", type=int, default=50000, help="Orders generated and loaded at a time")
+    parser.add_argument("--reset", action="store_true", help="Delete previously generated data first")
+    parser.add_argument("--skip-rollups", action="store_true", help="Do not rebuild the sales rollup tables")
+    return parser.parse_args()
+
+
+def zipf_cdf(count: int, exponent: float) -> np.ndarray:
+    """Get the cumulative Zipf distribution over ranks 1..count"""
+    weights = 1.0 / np.arange(1, count + 1) ** exponent
+    cdf = np.cumsum(weights)
+    return cdf / cdf[-1]
+
+
+def zipf_sample(rng: np.random.Generator, cdf: np.ndarray, ranking: np.ndarray, size: int) -> np.ndarray:
+    """Draw indices whose frequencies follow cdf, with ranking[r] the index at popularity rank r"""
+    ranks = np.searchsorted(cdf, rng.random(size), side="right")
+    return ranking[np.minimum(ranks, len(cdf) - 1)]
+
+
+def to_datetimes(moments: np.ndarray) -> List[datetime]:
+    return moments.astype("datetime64[us]").tolist()
+
+
+def ids(kind: str, indexes: np.ndarray) -> List[str]:
+    return [f"{ID_PREFIX}{kind}-{i:09d}" for i in indexes.tolist()]
+
+
+def load(db: Session, model: Any, columns: Dict[str, Sequence[Any]]) -> int:
+    """Bulk insert column lists into a model's table and commit"""
+    names = list(columns)
+    count = bulk_insert(db, model.__table__, names, zip(*(columns[name] for name in names)))
+    db.commit()
+    return count
+
+
+class StoreGenerator:
+    """Draws the synthetic store; order chunks are reproducible, so they can be drawn twice"""
+
+    def __init__(self, args: argparse.Namespace, now: datetime):
+        self.args = args
+        self.now = np.datetime64(now.replace(microsecond=0), "s")
+        self.start = self.now - np.timedelta64(args.days * 86400, "s")
+        # Each stream has its own seed, so it draws the same whatever else runs
+        self.rng = np.random.default_rng([args.seed, 0])
+        self.review_rng = np.random.default_rng([args.seed, 1])
+
+        rng = self.rng
+        self.product_cdf = zipf_cdf(args.products, PRODUCT_ZIPF_EXPONENT)
+        self.product_ranking = rng.permutation(args.products)
+        self.customer_cdf = zipf_cdf(args.users, CUSTOMER_ZIPF_EXPONENT)
+        self.customer_ranking = rng.permutation(args.users)
+        self.prices = np.round(np.clip(rng.lognormal(1.3, 0.7, args.products), 0.49, 250.0), 2)
+
+        # Order volume grows over the period and is higher at weekends
+        day_weights = np.linspace(1.0, 2.0, args.days)
+        weekdays = (self.start.astype("datetime64[D]").astype(int) + 3 + np.arange(args.days)) % 7
+        day_weights[weekdays >= 5] *= 1.25
+        self.day_weights = day_weights / day_weights.sum()
+
+    def categories(self) -> Dict[str, Sequence[Any]]:
+        count = self.args.categories
+        indexes = np.arange(count)
+        top_level = max(1, count // 5)
+        parents = self.rng.integers(0, top_level, count)
+        now = self.now.astype(datetime)
+        return {
+            "id": ids("c", indexes),
+            "name": [f"Load Test Category {i}" for i in indexes.tolist()],
+            "slug": [f"load-test-category-{i}" for i in indexes.tolist()],
+            "parent_id": [None if i < top_level else f"{ID_PREFIX}c-{p:09d}" for i, p in zip(indexes.tolist(), parents.tolist())],
+            "is_active": [True] * count,
+            "is_featured": (indexes < 4).tolist(),
+            "sort_order": indexes.tolist(),
+            "product_count": [0] * count,
+            "active_product_count": [0] * count,
+            "created_at": [now] * count,
+            "updated_at": [now] * count,
+        }
+
+    def users(self, start: int, stop: int, password_hash: str) -> Dict[str, Sequence[Any]]:
+        rng = np.random.default_rng([self.args.seed, 2, start])
+        indexes = np.arange(start, stop)
+        count = len(indexes)
+        created = to_datetimes(self.now - rng.integers(0, 2 * 365 * 86400, count).astype("timedelta64[s]"))
+        return {
+            "id": ids("u", indexes),
+            "email": [f"loadtest{i}@example.com" for i in indexes.tolist()],
+            "username": [f"loadtest{i}" for i in indexes.tolist()],
+            "hashed_password": [password_hash] * count,
+            "first_name": ["Load"] * count,
+            "last_name": [f"Tester {i}" for i in indexes.tolist()],
+            "is_active": [True] * count,
+            "is_admin": [False] * count,
+            "is_verified": (rng.random(count) < 0.7).tolist(),
+            "created_at": created,
+            "updated_at": created,
+        }
+
+    def order_chunk(self, number: int, start: int, stop: int) -> Dict[str, np.ndarray]:
+        """Draw orders start..stop and their items"""
+        rng = np.random.default_rng([self.args.seed, 3, number])
+        count = stop - start
+        user = zipf_sample(rng, self.customer_cdf, self.customer_ranking, count)
+        day = rng.choice(self.args.days, size=count, p=self.day_weights)
+        hour = rng.choice(24, size=count, p=HOUR_WEIGHTS / HOUR_WEIGHTS.sum())
+        offset = day * 86400 + hour * 3600 + rng.integers(0, 3600, count)
+        created = self.start + offset.astype("timedelta64[s]")
+        status = rng.choice(len(ORDER_STATUSES), size=count, p=ORDER_STATUS_WEIGHTS)
+
+        sizes = np.minimum(1 + rng.poisson(2.5, count), 25)
+        item_order = np.repeat(np.arange(count), sizes)
+        item_product = zipf_sample(rng, self.product_cdf, self.product_ranking, len(item_order))
+        quantity = np.minimum(rng.geometric(0.55, len(item_order)), 12)
+        unit_price = self.prices[item_product]
+        total_price = np.round(unit_price * quantity, 2)
+
+        subtotal = np.round(np.bincount(item_order, weights=total_price, minlength=count), 2)
+        tax = np.round(subtotal * settings.CART_TAX_RATE, 2)
+        delivery_fee = np.where(subtotal >= settings.CART_FREE_DELIVERY_THRESHOLD, 0.0, settings.CART_DELIVERY_FEE)
+        return {
+            "index": np.arange(start, stop), "user": user, "created": created, "status": status,
+            "subtotal": subtotal, "tax": tax, "delivery_fee": delivery_fee,
+            "total": np.round(subtotal + tax + delivery_fee, 2),
+            "item_order": item_order, "item_product": item_product,
+            "quantity": quantity, "unit_price": unit_price, "total_price": total_price,
+        }
+
+    def order_chunks(self) -> Iterator[Dict[str, np.ndarray]]:
+        size = self.args.chunk_size
+        for number, start in enumerate(range(0, self.args.orders, size)):
+            yield self.order_chunk(number, start, min(start + size, self.args.orders))
+
+    def reviews(self) -> Dict[str, np.ndarray]:
+        rng = self.review_rng
+        count = self.args.reviews
+        offset = rng.integers(0, self.args.days * 86400, count).astype("timedelta64[s]")
+        return {
+            "user": zipf_sample(rng, self.customer_cdf, self.customer_ranking, count),
+            "product": zipf_sample(rng, self.product_cdf, self.product_ranking, count),
+            "rating": rng.choice(5, size=count, p=RATING_WEIGHTS) + 1,
+            "verified": rng.random(count) < 0.6,
+            "helpful": rng.geometric(0.5, count) - 1,
+            "created": self.start + offset,
+        }
+
+
+def reset(db: Session) -> None:
+    """Delete generated rows and the rows that reference them"""
+    generated_orders = select(Order.id).where(Order.user_id.like(f"{ID_PREFIX}%"))
+    for model, key_columns in RESET_ORDER:
+        conditions = [key.like(f"{ID_PREFIX}%") for key in key_columns]
+        if "order_id" in model.__table__.c:
+            conditions.append(model.__table__.c.order_id.in_(generated_orders))
+        deleted = db.query(model).filter(or_(*conditions)).delete(synchronize_session=False)
+        if deleted:
+            print(f"🗑️  Deleted {deleted} {model.__tablename__} rows")
+    db.commit()
+
+
+def main():
+    args = parse_args()
+    now = datetime.utcnow()
+    generator = StoreGenerator(args, now)
+    started = time.time()
+
+    def done(message: str) -> None:
+        print(f"✅ {message} ({time.time() - started:.1f}s)")
+
+    # First pass over the orders: per-product aggregates, needed before products load
+    counted_statuses = [i for i, name in enumerate(ORDER_STATUSES) if name not in VOID_ORDER_STATUSES]
+    purchases = np.zeros(args.products, dtype=np.int64)
+    recent_cutoff = generator.now - np.timedelta64(settings.TRENDING_RETENTION_DAYS * 86400, "s")
+    first_hour = recent_cutoff.astype("datetime64[h]")
+    recent_hours = int((generator.now.astype("datetime64[h]") - first_hour).astype(int)) + 1
+    # Recent sales keyed by product * recent_hours + hour
+    recent_keys, recent_quantities = [], []
+    for chunk in generator.order_chunks():
+        counted = np.isin(chunk["status"], counted_statuses)[chunk["item_order"]]
+        purchases += np.bincount(chunk["item_product"][counted], weights=chunk["quantity"][counted],
+                                 minlength=args.products).astype(np.int64)
+        item_created = chunk["created"][chunk["item_order"]]
+        recent = counted & (item_created >= recent_cutoff)
+        hour = (item_created[recent].astype("datetime64[h]") - first_hour).astype(np.int64)
+        recent_keys.append(chunk["item_product"][recent] * recent_hours + hour)
+        recent_quantities.append(chunk["quantity"][recent])
+    reviews = generator.reviews()
+    rating_count = np.bincount(reviews["product"], minlength=args.products)
+    rating_sum = np.bincount(reviews["product"], weights=reviews["rating"], minlength=args.products)
+    rating_average = np.round(np.divide(rating_sum, rating_count, out=np.zeros(args.products), where=rating_count > 0), 2)
+    views = (purchases * generator.rng.uniform(4, 20, args.products)).astype(np.int64) + generator.rng.poisson(30, args.products)
+    done("Generated order aggregates")
+
+    db = SessionLocal()
+    try:
+        if args.reset:
+            reset(db)
+
+        categories = generator.categories()
+        load(db, Category, categories)
+        done(f"Loaded {args.categories} categories")
+
+        password_hash = get_password_hash(LOAD_TEST_PASSWORD)
+        for start in range(0, args.users, args.chunk_size):
+            load(db, User, generator.users(start, min(start + args.chunk_size, args.users), password_hash))
+        done(f"Loaded {args.users} users")
+
+        rng = generator.rng
+        indexes = np.arange(args.products)
+        adjective = rng.integers(0, len(ADJECTIVES), args.products)
+        noun = rng.integers(0, len(NOUNS), args.products)
+        names = [f"{ADJECTIVES[a]} {NOUNS[n]} {i}" for a, n, i in zip(adjective.tolist(), noun.tolist(), indexes.tolist())]
+        on_sale = rng.random(args.products) < 0.15
+        stock = np.where(rng.random(args.products) < 0.05, 0, rng.integers(1, 500, args.products))
+        product_created = to_datetimes(generator.start - rng.integers(0, 365 * 86400, args.products).astype("timedelta64[s]"))
+        category_ids = categories["id"]
+        product_ids = ids("p", indexes)
+        load(db, Product, {
+            "id": product_ids,
+            "name": names,
+            "slug": [f"load-test-product-{i}" for i in indexes.tolist()],
+            "sku": [f"LT-{i:08d}" for i in indexes.tolist()],
+            "category_id": [category_ids[c] for c in rng.integers(0, len(category_ids), args.products).tolist()],
+            "price": generator.prices.tolist(),
+            "original_price": [
+                round(price * 1.25, 2) if sale else None
+                for price, sale in zip(generator.prices.tolist(), on_sale.tolist())
+            ],
+            "brand": [BRANDS[b] for b in rng.integers(0, len(BRANDS), args.products).tolist()],
+            "unit": [UNITS[u] for u in rng.integers(0, len(UNITS), args.products).tolist()],
+            "is_organic": (rng.random(args.products) < 0.3).tolist(),
+            "is_featured": (rng.random(args.products) < 0.02).tolist(),
+            "is_on_sale": on_sale.tolist(),
+            "is_active": (rng.random(args.products) < 0.97).tolist(),
+            "in_stock": (stock > 0).tolist(),
+            "stock_quantity": stock.tolist(),
+            "low_stock_threshold": [10] * args.products,
+            "view_count": views.tolist(),
+            "purchase_count": purchases.tolist(),
+            "rating_average": rating_average.tolist(),
+            "rating_count": rating_count.tolist(),
+            "created_at": product_created,
+            "updated_at": product_created,
+        })
+        done(f"Loaded {args.products} products")
+
+        # Second pass: the same order chunks, written out
+        order_count = item_count = 0
+        for chunk in generator.order_chunks():
+            created = to_datetimes(chunk["created"])
+            order_ids = ids("o", chunk["index"])
+            load(db, Order, {
+                "id": order_ids,
+                "order_number": [f"LT{i:010d}" for i in chunk["index"].tolist()],
+                "user_id": ids("u", chunk["user"]),
+                "status": [ORDER_STATUSES[s] for s in chunk["status"].tolist()],
+                "subtotal": chunk["subtotal"].tolist(),
+                "tax_amount": chunk["tax"].tolist(),
+                "delivery_fee": chunk["delivery_fee"].tolist(),
+                "discount_amount": [0.0] * len(order_ids),
+                "total_amount": chunk["total"].tolist(),
+                "created_at": created,
+                "updated_at": created,
+            })
+            first_item = item_count
+            item_count += len(chunk["item_order"])
+            item_product = chunk["item_product"].tolist()
+            load(db, OrderItem, {
+                "id": ids("i", np.arange(first_item, item_count)),
+                "order_id": [order_ids[o] for o in chunk["item_order"].tolist()],
+                "product_id": [product_ids[p] for p in item_product],
+                "product_name": [names[p] for p in item_product],
+                "product_sku": [f"LT-{p:08d}" for p in item_product],
+                "quantity": chunk["quantity"].tolist(),
+                "unit_price": chunk["unit_price"].tolist(),
+                "total_price": chunk["total_price"].tolist(),
+                "created_at": [created[o] for o in chunk["item_order"].tolist()],
+            })
+            order_count += len(order_ids)
+        done(f"Loaded {order_count} orders with {item_count} items")
+
+        review_created = to_datetimes(reviews["created"])
+        for start in range(0, args.reviews, args.chunk_size):
+            part = slice(start, min(start + args.chunk_size, args.reviews))
+            ratings = reviews["rating"][part].tolist()
+            load(db, Review, {
+                "id": ids("r", np.arange(part.start, part.stop)),
+                "user_id": ids("u", reviews["user"][part]),
+                "product_id": [product_ids[p] for p in reviews["product"][part].tolist()],
+                "rating": ratings,
+                "title": [f"{rating} stars" for rating in ratings],
+                "would_recommend": [rating >= 4 for rating in ratings],
+                "is_verified_purchase": reviews["verified"][part].tolist(),
+                "helpful_count": reviews["helpful"][part].tolist(),
+                "is_approved": [True] * len(ratings),
+                "is_featured": [False] * len(ratings),
+                "created_at": review_created[part],
+                "updated_at": review_created[part],
+            })
+        done(f"Loaded {args.reviews} reviews")
+
+        keys, positions = np.unique(np.concatenate(recent_keys), return_inverse=True)
+        quantities = np.bincount(positions, weights=np.concatenate(recent_quantities)).astype(np.int64)
+        product_index, hour_index = np.divmod(keys, recent_hours)
+        hours = to_datetimes(first_hour + hour_index.astype("timedelta64[h]"))
+        load(db, ProductSalesHourly, {
+            "product_id": [product_ids[p] for p in product_index.tolist()],
+            "hour": hours,
+            "quantity": quantities.tolist(),
+        })
+        done(f"Loaded {len(hours)} trending sales buckets")
+
+        rebuild_category_product_counts(db)
+        if not args.skip_rollups:
+            rebuild_sales_rollups(db)
+            done("Rebuilt sales rollups")
+    finally:
+        db.close()
+    done(f"Load test data ready; users log in with password {LOAD_TEST_PASSWORD!r}")
+
+
+if __name__ == "__main__":
+    main()
@@ -16,6 +16,7 @@ from sqlalchemy.orm import Session
 from app.db.session import SessionLocal
 from app.models.category import Category
 from app.models.product import Product
+from app.crud.product import rebuild_category_product_counts
 import uuid
 from datetime import datetime
 
@@ -642,6 +643,7 @@ def seed_products(db: Session, category_map: dict):
         print(f"✅ Created product: {prod_data['name']} - ${prod_data['price']}")
     
     db.commit()
+    rebuild_category_product_counts(db)
     return created_count, skipped_count
 
 
@@ -14,6 +14,7 @@ from sqlalchemy.orm import Session
 from app.db.session import SessionLocal
 from app.models.category import Category
 from app.models.product import Product
+from app.crud.product import rebuild_category_product_counts
 import uuid
 from datetime import datetime
 
@@ -526,6 +527,7 @@ def seed_bulk_products(db: Session, num_products: int = 1000):
     if products_batch:
         db.bulk_save_objects(products_batch)
         db.commit()
+    rebuild_category_product_counts(db)
     
     print(f"\n✅ Successfully created {products_created} products!")
 
@@ -1,15 +1,26 @@
+import csv
+import io
 import os
+import uuid
+from types import SimpleNamespace
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.orm import sessionmaker
 
 from app.core.config import settings
 from app.db.base import Base
 from app.db.session import get_db
+from app.models.category import Category
+from app.models.product import Product
 from app.models.user import User
-from app.core.security import get_password_hash
-from app import main
+from app.core.security import create_access_token, get_password_hash
+from app.services.category_tree import invalidate_category_tree
+import main
+
+# The app's background loops use the real SessionLocal, not the test engine
+settings.BACKGROUND_TASKS_ENABLED = False
 
 # Use an in-memory SQLite database for testing
 TEST_DATABASE_URL = "sqlite:///./test.db"
@@ -53,6 +64,16 @@ def db_session(db_engine):
     connection.close()
 
 
+@pytest.fixture(autouse=True)
+def reset_category_tree():
+    """
+    Drop the process-wide category tree cache around each test
+    """
+    invalidate_category_tree()
+    yield
+    invalidate_category_tree()
+
+
 @pytest.fixture(scope="function")
 def client(db_session):
     """
@@ -81,7 +102,8 @@ def admin_user(db_session):
         email="admin@example.com",
         username="admin",
         hashed_password=get_password_hash("adminpassword"),
-        full_name="Admin User",
+        first_name="Admin",
+        last_name="User",
         is_active=True,
         is_admin=True,
     )
@@ -102,7 +124,8 @@ def normal_user(db_session):
         email="user@example.com",
         username="normaluser",
         hashed_password=get_password_hash("userpassword"),
-        full_name="Normal User",
+        first_name="Normal",
+        last_name="User",
         is_active=True,
         is_admin=False,
     )
@@ -111,3 +134,99 @@ def normal_user(db_session):
     db_session.refresh(user)
     
     return user
+
+
+@pytest.fixture(scope="function")
+def admin_token(admin_user):
+    """
+    Bearer token for the admin user
+    """
+    return create_access_token(admin_user.id)
+
+
+@pytest.fixture(scope="function")
+def user_token(normal_user):
+    """
+    Bearer token for the normal user
+    """
+    return create_access_token(normal_user.id)
+
+
+@pytest.fixture(scope="function")
+def category(db_session):
+    """
+    Create a product category for testing
+    """
+    category = Category(id="category-test-id", name="Test Category", slug="test-category")
+    db_session.add(category)
+    db_session.commit()
+    db_session.refresh(category)
+    
+    return category
+
+
+@pytest.fixture(scope="function")
+def product_factory(db_session, category):
+    """
+    Create products for testing
+    """
+    def make_product(**kwargs):
+        suffix = uuid.uuid4().hex[:8]
+        values = dict(
+            id=str(uuid.uuid4()),
+            name=f"Product {suffix}",
+            slug=f"product-{suffix}",
+            sku=f"SKU-{suffix}",
+            price=10.0,
+            category_id=category.id,
+            stock_quantity=100,
+            in_stock=True,
+            is_active=True,
+        )
+        values.update(kwargs)
+        product = Product(**values)
+        db_session.add(product)
+        db_session.commit()
+        db_session.refresh(product)
+        return product
+    
+    return make_product
+
+
+class RecordingCopySession:
+    """
+    Stand-in for a PostgreSQL session that records statements and COPY payloads
+    """
+    def __init__(self):
+        self.statements = []
+        self.copies = []
+        cursor = SimpleNamespace(copy_expert=self._copy_expert, close=lambda: None)
+        self._connection = SimpleNamespace(connection=SimpleNamespace(cursor=lambda: cursor))
+
+    def _copy_expert(self, sql, buffer):
+        self.copies.append((sql, buffer.read()))
+
+    def get_bind(self):
+        return SimpleNamespace(dialect=postgresql.dialect())
+
+    def connection(self):
+        return self._connection
+
+    def execute(self, statement, *args, **kwargs):
+        self.statements.append(statement)
+
+    def copied_rows(self):
+        """Parse the recorded COPY payloads into one dict per row"""
+        rows = []
+        for sql, payload in self.copies:
+            columns = [name.strip('"') for name in sql[sql.index("(") + 1:sql.index(")")].split(", ")]
+            rows.extend(dict(zip(columns, values)) for values in csv.reader(io.StringIO(payload)))
+        return rows
+
+
+@pytest.fixture(scope="function")
+def pg_copy_session():
+    """
+    Record what would be sent to PostgreSQL, where no server is available
+    """
+    return RecordingCopySession()
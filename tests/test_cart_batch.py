@@ -0,0 +1,38 @@
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from app.crud.cart import add_item_to_cart, add_items_to_cart
+from app.schemas.cart import CartItemCreate
+
+
+def test_batch_add_upserts_lines_and_rejects_unavailable(db_session, normal_user, product_factory):
+    """Test batch add merges into existing lines and skips unavailable products"""
+    existing = product_factory(price=2.5)
+    new = product_factory(price=4.0)
+    inactive = product_factory(is_active=False)
+    add_item_to_cart(db_session, normal_user.id, CartItemCreate(product_id=existing.id, quantity=1))
+
+    items, rejected = add_items_to_cart(db_session, normal_user.id, [
+        CartItemCreate(product_id=existing.id, quantity=2),
+        CartItemCreate(product_id=new.id, quantity=1),
+        CartItemCreate(product_id=new.id, quantity=2),
+        CartItemCreate(product_id=inactive.id, quantity=1),
+        CartItemCreate(product_id="missing", quantity=1),
+    ])
+
+    quantities = {item.product_id: item.quantity for item in items}
+    assert quantities == {existing.id: 3, new.id: 3}
+    assert sorted(rejected) == sorted([inactive.id, "missing"])
+    assert {item.product_id: item.price_at_time for item in items}[new.id] == 4.0
+
+
+def test_batch_add_raises_database_errors(db_session, normal_user, product_factory, monkeypatch):
+    """Test a failed upsert is rolled back and raised, not reported as rejected products"""
+    product = product_factory()
+
+    def fail(*args, **kwargs):
+        raise OperationalError("INSERT", {}, Exception("deadlock detected"))
+
+    monkeypatch.setattr(db_session, "execute", fail)
+    with pytest.raises(OperationalError):
+        add_items_to_cart(db_session, normal_user.id, [CartItemCreate(product_id=product.id, quantity=1)])
@@ -0,0 +1,72 @@
+import uuid
+from datetime import datetime, timedelta
+
+from app.crud.cart import (
+    add_item_to_cart, apply_discount_to_cart, get_user_cart, get_user_cart_items,
+    update_cart_item,
+)
+from app.crud.order import create_order
+from app.models.category import Category
+from app.models.coupon import Coupon
+from app.schemas.cart import CartItemCreate, CartItemUpdate
+from app.schemas.order import OrderCreate
+from app.services.cart_pricing import get_cart_pricing
+
+
+def _coupon(db_session, **kwargs):
+    values = dict(
+        id=str(uuid.uuid4()), code=f"SAVE-{uuid.uuid4().hex[:6]}", name="Save",
+        type="percentage", value=10.0, current_usage=0,
+        valid_from=datetime.utcnow() - timedelta(days=1),
+        valid_until=datetime.utcnow() + timedelta(days=1),
+        is_active=True,
+    )
+    values.update(kwargs)
+    coupon = Coupon(**values)
+    db_session.add(coupon)
+    db_session.commit()
+    return coupon
+
+
+def test_coupon_applies_to_eligible_lines_only(db_session, normal_user, category, product_factory):
+    """Test a category-restricted coupon discounts only that category's lines"""
+    other = Category(id="other-category-id", name="Other", slug="other")
+    db_session.add(other)
+    db_session.commit()
+    eligible = product_factory(price=20.0)
+    excluded = product_factory(price=30.0, category_id=other.id)
+    add_item_to_cart(db_session, normal_user.id, CartItemCreate(product_id=eligible.id, quantity=2))
+    add_item_to_cart(db_session, normal_user.id, CartItemCreate(product_id=excluded.id, quantity=1))
+    coupon = _coupon(db_session, applicable_categories=[category.id])
+
+    result = apply_discount_to_cart(db_session, normal_user.id, coupon.code)
+
+    assert result["success"]
+    assert result["discount_amount"] == 4.0
+    cart = get_user_cart(db_session, normal_user.id)
+    assert cart.discount_code == coupon.code
+    assert cart.total == 66.0
+    assert cart.delivery_fee == 0.0
+
+
+def test_pricing_cache_reused_until_cart_changes(db_session, normal_user, product_factory):
+    """Test cached pricing is reused by checkout and dropped on cart mutations"""
+    product = product_factory(price=10.0)
+    item = add_item_to_cart(db_session, normal_user.id, CartItemCreate(product_id=product.id, quantity=1))
+    coupon = _coupon(db_session, type="fixed_amount", value=3.0)
+    apply_discount_to_cart(db_session, normal_user.id, coupon.code)
+
+    items = get_user_cart_items(db_session, normal_user.id)
+    first = get_cart_pricing(db_session, normal_user.id, items)
+    assert get_cart_pricing(db_session, normal_user.id, items) is first
+
+    update_cart_item(db_session, item.id, normal_user.id, CartItemUpdate(quantity=2))
+    items = get_user_cart_items(db_session, normal_user.id)
+    second = get_cart_pricing(db_session, normal_user.id, items)
+    assert second is not first
+    assert second.subtotal == 20.0
+
+    order = create_order(db_session, normal_user.id, OrderCreate())
+    assert order.discount_code == coupon.code
+    assert order.discount_amount == 3.0
+    assert order.total_amount == second.order_total
@@ -0,0 +1,55 @@
+from app.crud.product import (
+    create_product, delete_product, rebuild_category_product_counts, update_product
+)
+from app.models.category import Category
+from app.schemas.product import ProductCreate
+from app.services.category_tree import get_category_tree
+
+
+def _product(db_session, category, name, **kwargs):
+    return create_product(db_session, ProductCreate(
+        name=name, slug=name.lower(), sku=name.upper(), price=5.0, category_id=category.id, **kwargs
+    ))
+
+
+def _counts(db_session, category):
+    db_session.refresh(category)
+    return category.product_count, category.active_product_count
+
+
+def test_counts_follow_product_crud(db_session, category):
+    """Test product create, update and delete keep the category counts current"""
+    other = Category(id="other-category-id", name="Other", slug="other")
+    db_session.add(other)
+    db_session.commit()
+
+    apple = _product(db_session, category, "Apple")
+    pear = _product(db_session, category, "Pear", is_active=False)
+    assert _counts(db_session, category) == (2, 1)
+    node = get_category_tree(db_session).nodes[category.id]
+    assert (node.product_count, node.active_product_count) == (2, 1)
+
+    update_product(db_session, pear, {"is_active": True})
+    assert _counts(db_session, category) == (2, 2)
+
+    update_product(db_session, apple, {"category_id": other.id, "is_active": False})
+    assert _counts(db_session, category) == (1, 1)
+    assert _counts(db_session, other) == (1, 0)
+
+    # Unrelated changes leave the counts alone
+    update_product(db_session, pear, {"price": 7.5})
+    assert _counts(db_session, category) == (1, 1)
+
+    assert delete_product(db_session, apple.id)
+    assert _counts(db_session, other) == (0, 0)
+
+
+def test_rebuild_repairs_drift(db_session, category, product_factory):
+    """Test the rebuild recomputes counts for products written outside the CRUD"""
+    product_factory()
+    product_factory(is_active=False)
+    assert _counts(db_session, category) == (0, 0)
+
+    assert rebuild_category_product_counts(db_session) == 1
+    assert _counts(db_session, category) == (2, 1)
+    assert rebuild_category_product_counts(db_session) == 0
@@ -0,0 +1,42 @@
+from app.crud.category import create_category, update_category
+from app.crud.product import get_products
+from app.schemas.category import CategoryCreate
+from app.services.category_tree import get_category_tree
+
+
+def _category(db_session, name, parent=None, **kwargs):
+    return create_category(db_session, CategoryCreate(
+        name=name, slug=name.lower(), parent_id=parent.id if parent else None, **kwargs
+    ))
+
+
+def test_tree_and_subcategory_product_filter(db_session, product_factory):
+    """Test the cached tree nests categories and drives the subcategory filter"""
+    food = _category(db_session, "Food")
+    fruit = _category(db_session, "Fruit", food)
+    berries = _category(db_session, "Berries", fruit)
+    drinks = _category(db_session, "Drinks")
+    hidden = _category(db_session, "Hidden", food, is_active=False)
+    under_hidden = _category(db_session, "Under Hidden", hidden)
+
+    tree = get_category_tree(db_session)
+    assert tree.descendant_ids(food.id) == {food.id, fruit.id, berries.id, hidden.id, under_hidden.id}
+    assert tree.descendant_ids(food.id, active_only=True) == {food.id, fruit.id, berries.id}
+    assert get_category_tree(db_session) is tree
+
+    nodes = {node["id"]: node for node in tree.to_dicts()}
+    assert drinks.id in nodes
+    assert [child["id"] for child in nodes[food.id]["children"]] == [fruit.id]
+    assert nodes[food.id]["children"][0]["children"][0]["id"] == berries.id
+
+    in_berries = product_factory(category_id=berries.id)
+    product_factory(category_id=drinks.id)
+    product_factory(category_id=hidden.id)
+    product_factory(category_id=under_hidden.id)
+    products = get_products(db_session, filters={"category": food.id, "include_subcategories": True})
+    assert [product.id for product in products] == [in_berries.id]
+    assert get_products(db_session, filters={"category": food.id}) == []
+
+    # Moving a category invalidates the cached tree
+    update_category(db_session, berries, {"parent_id": drinks.id})
+    assert get_category_tree(db_session).descendant_ids(drinks.id) == {drinks.id, berries.id}
@@ -0,0 +1,117 @@
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+
+from app.crud import coupon as coupon_crud
+from app.crud.coupon import (
+    bulk_create_coupons, claim_coupon_usage, create_coupon, get_coupon_by_code_cached,
+    update_coupon,
+)
+from app.crud.order import update_order_status
+from app.models.coupon import Coupon
+from app.models.order import Order
+from app.schemas.coupon import CouponBulkGenerate, CouponCreate
+from app.services.coupon_codes import generate_codes, iter_codes_csv
+from app.schemas.order import OrderStatus
+
+
+def _coupon_in(**kwargs):
+    values = dict(
+        code=f"CAMPAIGN-{uuid.uuid4().hex[:6]}", name="Campaign",
+        discount_type="percentage", discount_value=15.0,
+        valid_from=datetime.utcnow() - timedelta(days=1),
+        valid_until=datetime.utcnow() + timedelta(days=1),
+    )
+    values.update(kwargs)
+    return CouponCreate(**values)
+
+
+def _order(db_session, user_id):
+    order = Order(
+        id=str(uuid.uuid4()), order_number=uuid.uuid4().hex, user_id=user_id,
+        status=OrderStatus.PENDING, subtotal=10.0, total_amount=10.0,
+    )
+    db_session.add(order)
+    db_session.commit()
+    return order
+
+
+def test_coupon_lookup_is_cached_until_updated(db_session):
+    """Test repeated lookups skip the database and updates invalidate"""
+    coupon = create_coupon(db_session, _coupon_in())
+    assert coupon.discount_type == "percentage"
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(db_session.get_bind(), "before_cursor_execute", listener)
+    try:
+        assert get_coupon_by_code_cached(db_session, coupon.code).id == coupon.id
+        assert get_coupon_by_code_cached(db_session, coupon.code).id == coupon.id
+        assert len(statements) == 1
+
+        update_coupon(db_session, coupon, {"name": "Renamed"})
+        assert get_coupon_by_code_cached(db_session, coupon.code).name == "Renamed"
+    finally:
+        event.remove(db_session.get_bind(), "before_cursor_execute", listener)
+
+
+def test_cached_lookup_keeps_session_state(db_session, normal_user):
+    """Test a cache hit does not overwrite a coupon the session already loaded"""
+    coupon = create_coupon(db_session, _coupon_in())
+    get_coupon_by_code_cached(db_session, coupon.code)
+
+    assert claim_coupon_usage(db_session, coupon.id, normal_user.id, _order(db_session, normal_user.id).id)
+    db_session.commit()
+    assert coupon.current_usage == 1
+
+    cached = get_coupon_by_code_cached(db_session, coupon.code)
+    assert cached is coupon
+    assert cached.current_usage == 1
+
+
+def test_usage_claims_respect_limits_and_release_on_cancel(db_session, normal_user, admin_user):
+    """Test global and per-user limits are enforced and cancelling frees the use"""
+    coupon = create_coupon(db_session, _coupon_in(usage_limit=1, usage_limit_per_user=1))
+    first = _order(db_session, normal_user.id)
+
+    assert claim_coupon_usage(db_session, coupon.id, normal_user.id, first.id)
+    db_session.commit()
+    # Global limit reached; a refused claim writes nothing
+    assert not claim_coupon_usage(db_session, coupon.id, admin_user.id, _order(db_session, admin_user.id).id)
+
+    update_order_status(db_session, first.id, OrderStatus.CANCELLED)
+    db_session.expire_all()
+    assert db_session.get(Coupon, coupon.id).current_usage == 0
+
+    assert claim_coupon_usage(db_session, coupon.id, normal_user.id, _order(db_session, normal_user.id).id)
+    db_session.commit()
+    update_coupon(db_session, coupon, {"usage_limit": 10})
+    # Per-user limit reached
+    assert not claim_coupon_usage(db_session, coupon.id, normal_user.id, _order(db_session, normal_user.id).id)
+
+
+def test_bulk_generate_skips_existing_codes(db_session, monkeypatch):
+    """Test bulk generation inserts unique codes and replaces ones already taken"""
+    taken = create_coupon(db_session, _coupon_in(code="BULK-TAKEN"))
+    calls = []
+
+    def fake_generate_codes(count, length, prefix="", exclude=None):
+        # First call returns a code that already exists
+        codes = generate_codes(count, length, prefix, exclude)
+        if not calls:
+            codes[0] = taken.code
+        calls.append(count)
+        return codes
+
+    monkeypatch.setattr(coupon_crud, "generate_codes", fake_generate_codes)
+    bulk_in = CouponBulkGenerate(
+        count=25, prefix="BULK-", name="Bulk", discount_type="fixed_amount", discount_value=5.0,
+        valid_from=datetime.utcnow(), valid_until=datetime.utcnow() + timedelta(days=7),
+    )
+    codes = bulk_create_coupons(db_session, bulk_in, batch_size=10)
+
+    assert len(codes) == len(set(codes)) == 25
+    assert taken.code not in codes
+    assert calls == [25, 1]
+    assert db_session.query(Coupon).filter(Coupon.code.like("BULK-%")).count() == 26
+    assert "".join(iter_codes_csv(codes, chunk_size=7)).splitlines()[1:] == codes
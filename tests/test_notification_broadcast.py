@@ -0,0 +1,54 @@
+from app.crud import notification as notification_crud
+from app.crud.notification import broadcast_notification_batch, get_unread_count
+from app.db import dialects
+from app.models.notification import Notification
+from app.schemas.notification import BroadcastSegment, NotificationBroadcast
+from app.services.notification_broadcast import (
+    create_broadcast_job, get_broadcast_job, run_broadcast
+)
+
+
+def test_broadcast_reaches_active_segment_in_batches(db_session, normal_user, admin_user):
+    """Test a broadcast inserts one notification per active user and reports progress"""
+    normal_user.is_active = False
+    db_session.commit()
+    # run_broadcast closes the session it is given
+    admin_id, inactive_id = admin_user.id, normal_user.id
+
+    broadcast = NotificationBroadcast(
+        title="Sale", message="Everything 10% off", segment=BroadcastSegment.ACTIVE
+    )
+    job = create_broadcast_job(broadcast)
+    sent = run_broadcast(
+        job.id, broadcast, session_factory=lambda: db_session,
+        batch_size=1, throttle_seconds=0,
+    )
+
+    job = get_broadcast_job(job.id)
+    assert job.status == "completed"
+    assert sent == job.sent == job.total
+    assert db_session.query(Notification).filter(
+        Notification.user_id == admin_id, Notification.title == "Sale"
+    ).count() == 1
+    assert db_session.query(Notification).filter(
+        Notification.user_id == inactive_id
+    ).count() == 0
+    assert get_unread_count(db_session, admin_id) == 1
+
+
+def test_broadcast_copy_payload_sends_null_and_flags(db_session, normal_user, pg_copy_session, monkeypatch):
+    """Test the PostgreSQL COPY rows carry NULL for missing data and every flag column"""
+    monkeypatch.setattr(notification_crud, "is_postgres", lambda db: True)
+    monkeypatch.setattr(
+        notification_crud, "copy_rows",
+        lambda db, *args, **kwargs: dialects.copy_rows(pg_copy_session, *args, **kwargs),
+    )
+
+    assert broadcast_notification_batch(db_session, [normal_user.id], "Sale", "10% off", "promotion") == 1
+
+    (sql, _), = pg_copy_session.copies
+    assert "NULL '\\N'" in sql
+    row, = pg_copy_session.copied_rows()
+    assert row["data"] == "\\N"
+    for flag in ("is_read", "is_sent", "sent_email", "sent_push", "sent_sms"):
+        assert row[flag] == "false"
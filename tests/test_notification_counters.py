@@ -0,0 +1,63 @@
+from app.crud.notification import (
+    bulk_create_notifications, create_notification, delete_notification,
+    get_unread_count, mark_all_notifications_as_read, mark_notification_as_read,
+    reconcile_unread_counters,
+)
+from app.models.notification import NotificationCounter
+from app.schemas.notification import NotificationCreate, NotificationType
+
+
+def _notification_in(user_id, title="Hello"):
+    return NotificationCreate(
+        user_id=user_id, title=title, message="World", type=NotificationType.SYSTEM
+    )
+
+
+def test_unread_counter_follows_notification_changes(db_session, normal_user):
+    """Test the counter is kept in step by create, read, delete and read-all"""
+    first = create_notification(db_session, _notification_in(normal_user.id))
+    second = create_notification(db_session, _notification_in(normal_user.id))
+    bulk_create_notifications(db_session, [_notification_in(normal_user.id)] * 2)
+    db_session.commit()
+    assert get_unread_count(db_session, normal_user.id) == 4
+
+    assert mark_notification_as_read(db_session, first.id)
+    # Marking twice must not decrement twice
+    assert mark_notification_as_read(db_session, first.id)
+    assert get_unread_count(db_session, normal_user.id) == 3
+
+    # Deleting a read notification leaves the count alone
+    assert delete_notification(db_session, first.id)
+    assert delete_notification(db_session, second.id)
+    db_session.expire_all()
+    assert get_unread_count(db_session, normal_user.id) == 2
+
+    assert mark_all_notifications_as_read(db_session, normal_user.id)
+    db_session.expire_all()
+    assert get_unread_count(db_session, normal_user.id) == 0
+
+
+def test_reconcile_repairs_drifted_counter(db_session, normal_user):
+    """Test reconciliation recomputes counters from the notification table"""
+    create_notification(db_session, _notification_in(normal_user.id))
+    counter = db_session.get(NotificationCounter, normal_user.id)
+    counter.unread_count = 42
+    db_session.commit()
+
+    assert reconcile_unread_counters(db_session, user_ids=[normal_user.id]) == 1
+    db_session.expire_all()
+    assert get_unread_count(db_session, normal_user.id) == 1
+    assert reconcile_unread_counters(db_session, user_ids=[normal_user.id]) == 0
+
+
+def test_reconcile_creates_missing_counters_in_batches(db_session, normal_user, admin_user):
+    """Test a full reconciliation adds counters that were never written"""
+    create_notification(db_session, _notification_in(normal_user.id))
+    create_notification(db_session, _notification_in(admin_user.id))
+    db_session.query(NotificationCounter).delete()
+    db_session.commit()
+
+    assert reconcile_unread_counters(db_session, batch_size=1) == 2
+    db_session.expire_all()
+    assert get_unread_count(db_session, normal_user.id) == 1
+    assert get_unread_count(db_session, admin_user.id) == 1
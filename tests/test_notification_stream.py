@@ -0,0 +1,49 @@
+import asyncio
+
+from sqlalchemy.engine import make_url
+
+from app.crud.notification import create_notification
+from app.schemas.notification import NotificationCreate, NotificationType
+from app.services.notification_broker import libpq_dsn, notification_broker, publish_after_commit
+
+
+def test_notification_published_to_subscriber_after_commit(db_session, normal_user):
+    """Test create_notification reaches the user's stream subscribers"""
+    async def scenario():
+        subscription = notification_broker.subscribe(normal_user.id)
+        try:
+            notification = create_notification(db_session, NotificationCreate(
+                user_id=normal_user.id,
+                title="Hello",
+                message="World",
+                type=NotificationType.SYSTEM,
+            ))
+            assert notification is not None
+            item = await asyncio.wait_for(subscription.queue.get(), timeout=1)
+            assert item["id"] == notification.id
+            assert item["title"] == "Hello"
+        finally:
+            notification_broker.unsubscribe(subscription)
+
+    asyncio.run(scenario())
+
+
+def test_notification_not_published_on_rollback(db_session, normal_user):
+    """Test events queued in a rolled back transaction are discarded"""
+    async def scenario():
+        subscription = notification_broker.subscribe(normal_user.id)
+        try:
+            publish_after_commit(db_session, normal_user.id, {"id": "discarded"})
+            db_session.rollback()
+            await asyncio.sleep(0.05)
+            assert subscription.queue.empty()
+        finally:
+            notification_broker.unsubscribe(subscription)
+
+    asyncio.run(scenario())
+
+
+def test_libpq_dsn_drops_driver_suffix():
+    """Test the LISTEN connection URL is one libpq accepts"""
+    url = make_url("postgresql+psycopg2://shop:p%40ss@db:5432/shop?sslmode=require")
+    assert libpq_dsn(url) == "postgresql://shop:p%40ss@db:5432/shop?sslmode=require"
@@ -0,0 +1,55 @@
+import sqlalchemy as sa
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+
+from app.db.migrations import backfill, create_index_concurrently, drop_index_concurrently
+
+
+def _operations(conn):
+    return Operations.context(MigrationContext.configure(conn))
+
+
+def test_backfill_updates_in_batches_and_resumes():
+    """Test backfill walks the table in key order and a rerun only touches what is left"""
+    engine = sa.create_engine("sqlite://")
+    with engine.begin() as conn:
+        conn.exec_driver_sql("CREATE TABLE item (id INTEGER PRIMARY KEY, price REAL, price_cents INTEGER)")
+        conn.exec_driver_sql(
+            "INSERT INTO item (id, price) VALUES " + ", ".join(f"({n}, {n}.5)" for n in range(1, 26))
+        )
+        # Already migrated rows are skipped
+        conn.exec_driver_sql("UPDATE item SET price_cents = -1 WHERE id IN (3, 4)")
+
+        with _operations(conn):
+            updated = backfill(
+                "item", {"price_cents": "CAST(price * 100 AS INTEGER)"}, "price_cents IS NULL",
+                batch_size=4, pause=0,
+            )
+            assert updated == 23
+            assert backfill("item", {"price_cents": "0"}, "price_cents IS NULL", batch_size=4, pause=0) == 0
+
+        rows = dict(conn.exec_driver_sql("SELECT id, price_cents FROM item").all())
+        assert rows[1] == 150 and rows[25] == 2550
+        assert rows[3] == rows[4] == -1
+    engine.dispose()
+
+
+def test_create_index_concurrently_falls_back_on_sqlite():
+    """Test the partial index is created with the SQLite condition and dropped again"""
+    engine = sa.create_engine("sqlite://")
+    with engine.begin() as conn:
+        conn.exec_driver_sql("CREATE TABLE item (id INTEGER PRIMARY KEY, name TEXT, is_active BOOLEAN)")
+        with _operations(conn):
+            create_index_concurrently(
+                "ix_item_active_name", "item", ["name"],
+                postgresql_where="is_active = true", sqlite_where="is_active = 1",
+            )
+        sql = conn.exec_driver_sql(
+            "SELECT sql FROM sqlite_master WHERE type = 'index' AND name = 'ix_item_active_name'"
+        ).scalar()
+        assert sql is not None and "WHERE is_active = 1" in sql
+
+        with _operations(conn):
+            drop_index_concurrently("ix_item_active_name", "item")
+        assert "ix_item_active_name" not in {index["name"] for index in sa.inspect(conn).get_indexes("item")}
+    engine.dispose()
@@ -0,0 +1,47 @@
+import csv
+import io
+import json
+import uuid
+from datetime import datetime
+
+from app.models.order import Order
+from app.services.order_export import stream_order_export
+
+
+def _order(db_session, user, status, created_at, total):
+    order = Order(
+        id=str(uuid.uuid4()), order_number=f"ORD-{uuid.uuid4().hex}", user_id=user.id,
+        status=status, subtotal=total, total_amount=total, created_at=created_at,
+    )
+    db_session.add(order)
+    db_session.commit()
+    return order.order_number
+
+
+def test_export_filters_and_encodes(db_session, normal_user):
+    """Test exports stream matching orders in placement order as CSV and NDJSON"""
+    early = _order(db_session, normal_user, "delivered", datetime(2026, 3, 1, 9), 12.5)
+    late = _order(db_session, normal_user, "pending", datetime(2026, 3, 2, 23, 59), 30.0)
+    _order(db_session, normal_user, "cancelled", datetime(2026, 3, 2, 10), 8.0)
+    _order(db_session, normal_user, "pending", datetime(2026, 3, 3, 0, 0), 5.0)
+
+    def export(export_format, **filters):
+        chunks = stream_order_export(
+            export_format, session_factory=lambda: db_session, batch_size=1, **filters
+        )
+        return "".join(chunks)
+
+    statuses = ["delivered", "pending"]
+    rows = list(csv.DictReader(io.StringIO(
+        export("csv", start=datetime(2026, 3, 1).date(), end=datetime(2026, 3, 2).date(), statuses=statuses)
+    )))
+    assert [row["order_number"] for row in rows] == [early, late]
+    assert rows[0]["customer_email"] == "user@example.com"
+    assert rows[0]["total_amount"] == "12.5"
+    assert rows[1]["created_at"] == "2026-03-02T23:59:00"
+
+    lines = export("ndjson", statuses=statuses).splitlines()
+    records = [json.loads(line) for line in lines]
+    assert [record["status"] for record in records] == ["delivered", "pending", "pending"]
+    assert records[0]["total_amount"] == 12.5
+    assert records[0]["delivered_at"] is None
@@ -0,0 +1,116 @@
+import uuid
+
+from sqlalchemy.orm import sessionmaker
+
+from app.crud.outbox import add_outbox_event
+from app.models.outbox import OutboxEvent
+from app.services.outbox import OutboxRelay, register_consumer
+
+
+def test_relay_delivers_batch_to_consumer_once(db_session):
+    """Test consumers get one call per batch and events are marked processed"""
+    event_type = f"test.{uuid.uuid4().hex}"
+    calls = []
+    register_consumer(event_type, lambda db, events: calls.append([e.aggregate_id for e in events]))
+
+    add_outbox_event(db_session, "test", "a", event_type, {"n": 1})
+    add_outbox_event(db_session, "test", "b", event_type, {"n": 2})
+    db_session.commit()
+
+    relay = OutboxRelay(session_factory=lambda: db_session, batch_size=10)
+    assert relay.drain() == 2
+
+    assert calls == [["a", "b"]]
+    pending = db_session.query(OutboxEvent).filter(
+        OutboxEvent.event_type == event_type,
+        OutboxEvent.processed_at.is_(None)
+    ).count()
+    assert pending == 0
+
+
+def test_relay_records_failures_and_dead_letters(db_engine, caplog):
+    """Test a failing consumer leaves events pending until max attempts"""
+    # The relay rolls back failed batches, so use a real session instead of
+    # the per-test transaction
+    db = sessionmaker(bind=db_engine)()
+    event_type = f"test.{uuid.uuid4().hex}"
+
+    def failing_consumer(db, events):
+        raise RuntimeError("boom")
+
+    register_consumer(event_type, failing_consumer)
+    event = add_outbox_event(db, "test", "a", event_type)
+    db.commit()
+    event_id = event.id
+
+    relay = OutboxRelay(
+        session_factory=sessionmaker(bind=db_engine), batch_size=10, max_attempts=2
+    )
+    try:
+        relay.drain_once()
+        event = db.get(OutboxEvent, event_id, populate_existing=True)
+        assert event.attempts == 1
+        assert event.processed_at is None
+        assert "boom" in event.last_error
+        assert "Dead-lettered" not in caplog.text
+
+        relay.drain_once()
+        event = db.get(OutboxEvent, event_id, populate_existing=True)
+        assert event.attempts == 2
+        assert event.processed_at is not None
+        assert any(
+            record.levelname == "ERROR" and event_id in record.getMessage() for record in caplog.records
+        )
+    finally:
+        db.query(OutboxEvent).filter(OutboxEvent.event_type == event_type).delete()
+        db.commit()
+        db.close()
+
+
+def test_failing_event_does_not_hold_back_its_batch(db_engine):
+    """Test one bad event is retried and dead-lettered alone while the rest of its batch is delivered"""
+    db = sessionmaker(bind=db_engine)()
+    event_type = f"test.{uuid.uuid4().hex}"
+    delivered = []
+
+    def picky_consumer(db, events):
+        if any(event.aggregate_id == "bad" for event in events):
+            raise RuntimeError("bad event")
+        delivered.extend(event.aggregate_id for event in events)
+
+    register_consumer(event_type, picky_consumer)
+    # The bad event is the oldest, so it heads every batch
+    bad = add_outbox_event(db, "test", "bad", event_type)
+    db.commit()
+    for name in ("good-1", "good-2", "good-3"):
+        add_outbox_event(db, "test", name, event_type)
+        db.commit()
+    bad_id = bad.id
+
+    relay = OutboxRelay(
+        session_factory=sessionmaker(bind=db_engine), batch_size=10, max_attempts=2
+    )
+    try:
+        assert relay.drain_once() == 3
+        assert delivered == ["good-1", "good-2", "good-3"]
+
+        events = {
+            event.aggregate_id: event for event in
+            db.query(OutboxEvent).filter(OutboxEvent.event_type == event_type).populate_existing()
+        }
+        for name in ("good-1", "good-2", "good-3"):
+            assert events[name].processed_at is not None
+            assert (events[name].attempts, events[name].last_error) == (0, None)
+        assert events["bad"].attempts == 1
+        assert events["bad"].processed_at is None
+
+        # Only the bad event is left; its second failure dead-letters it
+        assert relay.drain_once() == 0
+        event = db.get(OutboxEvent, bad_id, populate_existing=True)
+        assert event.attempts == 2
+        assert event.processed_at is not None
+        assert delivered == ["good-1", "good-2", "good-3"]
+    finally:
+        db.query(OutboxEvent).filter(OutboxEvent.event_type == event_type).delete()
+        db.commit()
+        db.close()
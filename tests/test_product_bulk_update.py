@@ -0,0 +1,28 @@
+from app.crud.product import bulk_update_products_by_sku
+from app.models.product import Product
+
+
+def test_bulk_update_sets_only_given_fields(db_session, product_factory):
+    """Test a bulk update changes the supplied columns by SKU and leaves the rest alone"""
+    apple = product_factory(sku="APPLE", price=1.0, stock_quantity=5, in_stock=True)
+    pear = product_factory(sku="PEAR", price=2.0, stock_quantity=8, in_stock=True)
+    plum = product_factory(sku="PLUM", price=3.0, stock_quantity=0, in_stock=False)
+    ids = {"APPLE": apple.id, "PEAR": pear.id, "PLUM": plum.id}
+
+    updated, not_found = bulk_update_products_by_sku(db_session, [
+        {"sku": "APPLE", "price": 1.5},
+        {"sku": "PEAR", "stock_quantity": 0, "in_stock": False},
+        {"sku": "GHOST", "price": 9.0},
+        {"sku": "PLUM", "stock_quantity": 4, "in_stock": True},
+        {"sku": "PLUM", "stock_quantity": 12, "in_stock": True},
+    ], batch_size=2)
+    db_session.commit()
+
+    assert updated == 3
+    assert not_found == ["GHOST"]
+    db_session.expire_all()
+    products = {sku: db_session.get(Product, product_id) for sku, product_id in ids.items()}
+    assert (products["APPLE"].price, products["APPLE"].stock_quantity, products["APPLE"].in_stock) == (1.5, 5, True)
+    assert (products["PEAR"].price, products["PEAR"].stock_quantity, products["PEAR"].in_stock) == (2.0, 0, False)
+    # The last update for a repeated SKU wins
+    assert (products["PLUM"].price, products["PLUM"].stock_quantity, products["PLUM"].in_stock) == (3.0, 12, True)
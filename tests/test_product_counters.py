@@ -0,0 +1,83 @@
+from sqlalchemy.exc import OperationalError
+
+from app.crud.cart import add_item_to_cart
+from app.crud.order import create_order
+from app.crud.product import get_products
+from app.models.product import Product
+from app.schemas.cart import CartItemCreate
+from app.schemas.order import OrderCreate
+from app.services.product_counters import ProductCounterBuffer, product_counters
+
+
+def test_buffer_flushes_aggregated_counts(db_session, product_factory):
+    """Test views and purchases are summed in memory and written in one flush"""
+    viewed_id = product_factory(view_count=None).id
+    bought_id = product_factory(purchase_count=4).id
+    buffer = ProductCounterBuffer(session_factory=lambda: db_session)
+
+    for _ in range(3):
+        buffer.record_view(viewed_id)
+    buffer.record_purchases({bought_id: 2})
+    buffer.record_purchases({bought_id: 1, viewed_id: 1})
+    assert buffer.flush() == 2
+    assert buffer.flush() == 0
+
+    # The flush closed the session, so load fresh instances
+    viewed = db_session.get(Product, viewed_id)
+    bought = db_session.get(Product, bought_id)
+    assert (viewed.view_count, viewed.purchase_count) == (3, 1)
+    assert (bought.view_count, bought.purchase_count) == (0, 7)
+
+
+def test_failed_flush_keeps_counts():
+    """Test increments survive a flush that fails"""
+    def broken_session():
+        raise RuntimeError("database unavailable")
+
+    buffer = ProductCounterBuffer(session_factory=broken_session)
+    buffer.record_view("product-id", 2)
+    try:
+        buffer.flush()
+    except RuntimeError:
+        pass
+    assert buffer.drain() == {"product-id": (2, 0)}
+
+
+def test_popular_sort(db_session, product_factory):
+    """Test the popular sort ranks by purchases, then views"""
+    quiet = product_factory(purchase_count=0, view_count=0)
+    browsed = product_factory(purchase_count=5, view_count=100)
+    bought = product_factory(purchase_count=5, view_count=300)
+    top = product_factory(purchase_count=9, view_count=1)
+
+    products = get_products(db_session, sort_by="popular")
+    assert [p.id for p in products] == [top.id, bought.id, browsed.id, quiet.id]
+
+
+def test_orders_feed_purchase_counts(db_session, normal_user, product_factory):
+    """Test a placed order buffers its quantities per product"""
+    product = product_factory()
+    add_item_to_cart(db_session, normal_user.id, CartItemCreate(product_id=product.id, quantity=3))
+    product_counters.drain()
+
+    assert create_order(db_session, normal_user.id, OrderCreate())
+    assert product_counters.drain() == {product.id: (0, 3)}
+
+
+def test_failed_order_commit_records_no_purchases(db_session, normal_user, product_factory, monkeypatch):
+    """Test purchases are not counted for an order whose commit fails"""
+    product = product_factory()
+    add_item_to_cart(db_session, normal_user.id, CartItemCreate(product_id=product.id, quantity=2))
+    product_counters.drain()
+
+    commit = db_session.commit
+    failures = [OperationalError("COMMIT", {}, Exception("could not serialize access"))]
+
+    def fail_first_commit():
+        if failures:
+            raise failures.pop()
+        commit()
+
+    monkeypatch.setattr(db_session, "commit", fail_first_commit)
+    assert create_order(db_session, normal_user.id, OrderCreate()) is None
+    assert product_counters.drain() == {}
@@ -0,0 +1,104 @@
+import io
+import json
+
+from app.crud.product import upsert_products_by_sku
+from app.models.category import Category
+from app.models.product import Product
+from app.services.product_import import import_products
+
+
+def _csv(*lines):
+    return io.BytesIO("\n".join(lines).encode())
+
+
+def _ndjson(*records):
+    return io.BytesIO("\n".join(json.dumps(record) for record in records).encode())
+
+
+def test_csv_import_creates_and_updates(db_session, category, product_factory):
+    """Test a CSV import inserts new SKUs and updates only the supplied columns of existing ones"""
+    existing = product_factory(sku="EXIST-1", price=3.0, stock_quantity=7, brand="Old")
+    existing_id = existing.id
+
+    result = import_products(db_session, _csv(
+        "sku,name,price,stock_quantity,brand,category_slug,tags",
+        f"EXIST-1,{existing.name},4.5,,New,,",
+        "NEW-1,Green Apple,1.25,30,,test-category,fruit|fresh",
+    ), "csv", batch_size=1)
+
+    assert result["received"] == 2
+    assert (result["created"], result["updated"], result["failed"]) == (1, 1, 0)
+
+    db_session.expire_all()
+    updated = db_session.query(Product).filter(Product.sku == "EXIST-1").one()
+    assert updated.id == existing_id
+    assert (updated.price, updated.brand) == (4.5, "New")
+    # Empty cells leave the current value alone
+    assert updated.stock_quantity == 7
+
+    created = db_session.query(Product).filter(Product.sku == "NEW-1").one()
+    assert created.slug == "green-apple-new-1"
+    assert created.category_id == category.id
+    assert created.tags == ["fruit", "fresh"]
+    assert (created.view_count, created.purchase_count, created.is_active) == (0, 0, True)
+
+    db_session.refresh(category)
+    assert (category.product_count, category.active_product_count) == (2, 2)
+
+
+def test_ndjson_import_reports_row_errors(db_session, category, product_factory):
+    """Test bad rows are reported by row number without stopping the import"""
+    product_factory(sku="TAKEN", slug="taken-slug")
+    stream = _ndjson(
+        {"sku": "A-1", "name": "Pear", "price": 2.0, "category_id": category.id},
+        {"sku": "A-2", "name": "Plum", "price": -1, "category_id": category.id},
+        {"sku": "A-3", "name": "Fig", "price": 1.0, "category_slug": "no-such-category"},
+        {"sku": "A-4", "name": "Kiwi", "price": 1.0},
+        {"sku": "A-5", "name": "Lime", "price": 1.0, "category_id": category.id, "slug": "taken-slug"},
+    )
+    stream = io.BytesIO(stream.getvalue() + b"\n{not json\n")
+
+    result = import_products(db_session, stream, "ndjson")
+
+    assert (result["received"], result["created"], result["failed"]) == (6, 1, 5)
+    errors = {error["row"]: error for error in result["errors"]}
+    assert sorted(errors) == [2, 3, 4, 5, 6]
+    assert errors[2]["sku"] == "A-2" and "price" in errors[2]["error"]
+    assert "no-such-category" in errors[3]["error"]
+    assert errors[4]["error"] == "category_id required for new products"
+    assert "TAKEN" in errors[5]["error"]
+    assert errors[6]["error"].startswith("Invalid JSON")
+    assert db_session.query(Product).filter(Product.sku.like("A-%")).count() == 1
+
+
+def test_import_last_row_for_a_sku_wins(db_session, category):
+    """Test a SKU repeated within a feed is written once, with its last row"""
+    other = Category(id="other-category-id", name="Other", slug="other")
+    db_session.add(other)
+    db_session.commit()
+
+    result = import_products(db_session, _ndjson(
+        {"sku": "DUP", "name": "First", "price": 1.0, "category_id": category.id},
+        {"sku": "DUP", "name": "Second", "price": 2.0, "category_slug": "other"},
+    ), "ndjson")
+
+    assert (result["created"], result["updated"]) == (1, 0)
+    product = db_session.query(Product).filter(Product.sku == "DUP").one()
+    assert (product.name, product.price, product.category_id) == ("Second", 2.0, other.id)
+
+
+def test_postgres_import_copies_explicit_nulls_as_null(pg_copy_session, category):
+    """Test nulls in a feed reach the staging COPY as NULL, not as empty strings"""
+    upsert_products_by_sku(pg_copy_session, [{
+        "id": "copy-null-id", "sku": "NULL-1", "name": "Quince", "slug": "quince-null-1",
+        "price": 2.0, "category_id": category.id, "brand": "",
+        "original_price": None, "images": None, "tags": None,
+    }], update_columns=["price", "original_price", "images", "tags"])
+
+    (sql, _), = pg_copy_session.copies
+    assert sql.startswith("COPY product_import (") and "NULL '\\N'" in sql
+    row, = pg_copy_session.copied_rows()
+    assert (row["original_price"], row["images"], row["tags"]) == ("\\N", "\\N", "\\N")
+    # An empty string stays an empty string
+    assert row["brand"] == ""
+    assert row["price"] == "2.0"
@@ -0,0 +1,138 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.api import profiling
+from app.api.api import api_router
+from app.api.profiling import profile_request
+from app.core.config import settings
+from app.db.session import get_db
+from app.services.profiler import SamplingProfiler
+
+
+def _spin(stop: threading.Event):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def test_profiler_samples_busy_threads_only():
+    """Test busy threads are recorded with their stacks and parked threads are skipped"""
+    stop = threading.Event()
+    busy = threading.Thread(target=_spin, args=(stop,), name="busy-worker")
+    idle = threading.Thread(target=stop.wait, name="idle-worker")
+    busy.start()
+    idle.start()
+
+    profiler = SamplingProfiler(interval=0.002)
+    assert profiler.start()
+    try:
+        # Only one profile at a time
+        assert not SamplingProfiler().start()
+        time.sleep(0.2)
+    finally:
+        profiler.stop()
+        stop.set()
+        busy.join()
+        idle.join()
+
+    assert profiler.samples > 0
+    threads = {stack[0] for stack in profiler.stacks}
+    assert "busy-worker" in threads
+    assert "idle-worker" not in threads
+
+    lines = profiler.collapsed().splitlines()
+    _, count = lines[0].rsplit(" ", 1)
+    assert int(count) > 0
+    assert any(line.startswith("busy-worker;") and "_spin (tests/test_profiler.py:" in line for line in lines)
+
+    tree = profiler.call_tree()
+    assert tree["samples"] == sum(profiler.stacks.values())
+    worker = next(child for child in tree["children"] if child["name"] == "busy-worker")
+    assert worker["samples"] <= tree["samples"]
+
+    # The lock was released, so a new profile can start
+    again = SamplingProfiler()
+    assert again.start()
+    again.stop()
+
+
+@pytest.fixture
+def profiled_client(db_session, monkeypatch):
+    """The API with the ?profile=1 middleware installed, as PROFILING_ENABLED does in main.py"""
+    app = FastAPI()
+    app.middleware("http")(profile_request)
+    app.include_router(api_router, prefix=settings.API_V1_STR)
+
+    async def forever():
+        while True:
+            yield b": keepalive\n\n"
+            await asyncio.sleep(0.01)
+
+    @app.get("/forever")
+    def never_ending_stream():
+        return StreamingResponse(forever(), media_type="text/event-stream")
+
+    app.dependency_overrides[get_db] = lambda: db_session
+    # The admin check opens its own session; keep it on the test transaction
+    monkeypatch.setattr(profiling, "SessionLocal", lambda: Session(bind=db_session.connection()))
+    with TestClient(app) as client:
+        yield client
+
+
+def _auth(token):
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_profile_endpoint_requires_enabled_setting_and_bounded_seconds(client, admin_token, monkeypatch):
+    """Test the worker profile is hidden unless enabled and refuses runs past the limit"""
+    response = client.post("/api/v1/admin/profile?seconds=0.05", headers=_auth(admin_token))
+    assert response.status_code == 404
+
+    monkeypatch.setattr(settings, "PROFILING_ENABLED", True)
+    monkeypatch.setattr(settings, "PROFILING_MAX_SECONDS", 1.0)
+    response = client.post("/api/v1/admin/profile?seconds=5", headers=_auth(admin_token))
+    assert response.status_code == 400
+
+    response = client.post("/api/v1/admin/profile?seconds=0.05", headers=_auth(admin_token))
+    assert response.status_code == 200
+    assert response.headers["content-disposition"].endswith('.folded"')
+
+
+def test_request_profile_requires_admin_token(profiled_client, user_token):
+    """Test ?profile=1 is refused without a token and for non-admins"""
+    assert profiled_client.get("/api/v1/products/?profile=1").status_code == 403
+    response = profiled_client.get("/api/v1/products/?profile=1", headers=_auth(user_token))
+    assert response.status_code == 403
+
+
+def test_request_profile_returns_call_tree_for_admin(profiled_client, admin_token, product_factory):
+    """Test an admin's ?profile=1 gets the call tree in place of the response"""
+    product_factory()
+    plain = profiled_client.get("/api/v1/products/")
+    assert isinstance(plain.json(), list)
+
+    response = profiled_client.get("/api/v1/products/?profile=1", headers=_auth(admin_token))
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["path"], body["status_code"], body["truncated"]) == ("/api/v1/products/", 200, False)
+    assert body["samples"] > 0
+    assert {"name", "samples", "children"} <= set(body["call_tree"])
+
+
+def test_request_profile_stops_at_max_seconds(profiled_client, admin_token, monkeypatch):
+    """Test a never-ending response is profiled for at most PROFILING_MAX_SECONDS"""
+    monkeypatch.setattr(settings, "PROFILING_MAX_SECONDS", 0.2)
+    response = profiled_client.get("/forever?profile=1", headers=_auth(admin_token))
+    assert response.status_code == 200
+    assert response.json()["truncated"] is True
+
+    # The profiler was released for the next profile
+    profiler = SamplingProfiler()
+    assert profiler.start()
+    profiler.stop()
@@ -0,0 +1,133 @@
+import uuid
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+from app.crud.address import get_user_addresses
+from app.crud.cart import get_user_cart_items
+from app.crud.notification import get_user_notifications
+from app.crud.order import get_all_orders, get_order, get_user_orders, query_orders_for_export
+from app.crud.product import get_featured_products, get_products
+from app.crud.review import get_product_reviews, get_user_reviews
+from app.crud.wishlist import get_user_wishlist
+from app.models.address import Address
+from app.models.cart import CartItem
+from app.models.notification import Notification
+from app.models.order import Order, OrderItem
+from app.models.product import Product
+from app.models.review import Review
+from app.models.user import User
+from app.models.wishlist import WishlistItem
+
+USERS = 20
+PRODUCTS = 60
+
+
+@pytest.fixture
+def seeded(db_session, category):
+    """A few users with orders, reviews, notifications, addresses, wishlists and carts"""
+    now = datetime.utcnow()
+    products = [Product(
+        id=str(uuid.uuid4()), name=f"Product {n:03d}", slug=f"index-product-{n}", sku=f"IDX-{n}",
+        price=1.0 + n, category_id=category.id, is_active=n % 10 != 0, is_featured=n % 15 == 0,
+    ) for n in range(PRODUCTS)]
+    users = [User(
+        id=str(uuid.uuid4()), email=f"index{n}@example.com", username=f"index{n}", hashed_password="x",
+    ) for n in range(USERS)]
+    db_session.add_all(products + users)
+    db_session.flush()
+
+    rows = []
+    for n, user in enumerate(users):
+        for k in range(5):
+            product = products[(n * 5 + k) % PRODUCTS]
+            order = Order(
+                id=str(uuid.uuid4()), order_number=f"IDX-{n}-{k}", user_id=user.id,
+                subtotal=product.price, total_amount=product.price, created_at=now - timedelta(days=k + n),
+            )
+            rows += [
+                order,
+                OrderItem(
+                    id=str(uuid.uuid4()), order_id=order.id, product_id=product.id, product_name=product.name,
+                    product_sku=product.sku, quantity=1, unit_price=product.price, total_price=product.price,
+                ),
+                Review(id=str(uuid.uuid4()), user_id=user.id, product_id=product.id, rating=1 + k),
+                Notification(
+                    id=str(uuid.uuid4()), user_id=user.id, title="Hello", message="Hi", type="system",
+                    is_read=k >= 3, created_at=now - timedelta(hours=k),
+                ),
+                WishlistItem(id=str(uuid.uuid4()), user_id=user.id, product_id=product.id),
+                CartItem(id=str(uuid.uuid4()), user_id=user.id, product_id=product.id, quantity=1, price_at_time=1.0),
+            ]
+        rows.append(Address(
+            id=str(uuid.uuid4()), user_id=user.id, type="home", first_name="A", last_name="B",
+            street="1 Main St", city="Town", state="CA", zip_code="90000",
+        ))
+    db_session.add_all(rows)
+    db_session.commit()
+    # Give the planner statistics, as a production database would have
+    db_session.connection().exec_driver_sql("ANALYZE")
+    return {"user_id": users[3].id, "product_id": products[7].id, "order_id": rows[0].id, "category_id": category.id}
+
+
+def _query_plans(db, run):
+    """Run a crud call and EXPLAIN QUERY PLAN every SELECT it issued"""
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    conn = db.connection()
+    event.listen(conn, "before_cursor_execute", capture)
+    try:
+        run()
+    finally:
+        event.remove(conn, "before_cursor_execute", capture)
+
+    return [
+        "\n".join(row[-1] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters))
+        for statement, parameters in statements if statement.lstrip().upper().startswith("SELECT")
+    ]
+
+
+# (crud call, table, index it must use, whether the index also provides the ORDER BY)
+HOT_QUERIES = {
+    "cart": (lambda db, d: get_user_cart_items(db, d["user_id"]), "cartitem", "sqlite_autoindex_cartitem_", False),
+    "user-orders": (lambda db, d: get_user_orders(db, d["user_id"]), "order", "ix_order_user_created", True),
+    "all-orders": (lambda db, d: get_all_orders(db), "order", "ix_order_created", True),
+    "order-export": (
+        lambda db, d: query_orders_for_export(db, date.today() - timedelta(days=7), date.today()).all(),
+        "order", "ix_order_created", True,
+    ),
+    "order-items": (lambda db, d: get_order(db, d["order_id"]).items, "orderitem", "ix_orderitem_order_product", False),
+    "product-reviews": (lambda db, d: get_product_reviews(db, d["product_id"]), "review", "ix_review_product_created", True),
+    "user-reviews": (lambda db, d: get_user_reviews(db, d["user_id"]), "review", "ix_review_user_created", True),
+    "notifications": (
+        lambda db, d: get_user_notifications(db, d["user_id"]), "notification", "ix_notification_user_created", True,
+    ),
+    "unread-notifications": (
+        lambda db, d: get_user_notifications(db, d["user_id"], unread_only=True),
+        "notification", "ix_notification_user_unread", True,
+    ),
+    "addresses": (lambda db, d: get_user_addresses(db, d["user_id"]), "address", "ix_address_user_id", False),
+    "wishlist": (lambda db, d: get_user_wishlist(db, d["user_id"]), "wishlistitem", "ix_wishlistitem_user_product", False),
+    "category-products": (
+        lambda db, d: get_products(db, filters={"category": d["category_id"]}),
+        "product", "ix_product_category_active_name", True,
+    ),
+    "featured-products": (lambda db, d: get_featured_products(db), "product", "ix_product_featured", False),
+}
+
+
+@pytest.mark.parametrize("name", list(HOT_QUERIES))
+def test_hot_query_uses_index(db_session, seeded, name):
+    """Test each hot crud query reads its table through the intended index"""
+    run, table, index, ordered = HOT_QUERIES[name]
+    plans = _query_plans(db_session, lambda: run(db_session, seeded))
+
+    plan = next((plan for plan in plans if f" {table} " in f" {plan} "), None)
+    assert plan is not None, f"no query on {table}: {plans}"
+    assert f"{table} USING INDEX {index}" in plan or f"{table} USING COVERING INDEX {index}" in plan, plan
+    if ordered:
+        assert "TEMP B-TREE" not in plan, plan
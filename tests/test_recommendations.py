@@ -0,0 +1,67 @@
+import uuid
+
+import pytest
+
+from app.crud.product import get_related_products
+from app.models.order import Order, OrderItem
+from app.models.product import ProductRecommendation
+
+
+def _order(db_session, user_id, products, status="delivered"):
+    order = Order(
+        id=str(uuid.uuid4()), order_number=uuid.uuid4().hex, user_id=user_id,
+        status=status, subtotal=0.0, total_amount=0.0,
+    )
+    db_session.add(order)
+    for product in products:
+        db_session.add(OrderItem(
+            id=str(uuid.uuid4()), order_id=order.id, product_id=product.id,
+            product_name=product.name, product_sku=product.sku, quantity=1,
+            unit_price=1.0, total_price=1.0,
+        ))
+    db_session.commit()
+
+
+def test_related_products_fall_back_to_category_best_sellers(db_session, product_factory):
+    """Test recommendations come first, then same-category products by purchase count"""
+    product = product_factory()
+    recommended = product_factory(purchase_count=0)
+    best_seller = product_factory(purchase_count=50)
+    runner_up = product_factory(purchase_count=10)
+    inactive = product_factory(is_active=False)
+
+    assert [p.id for p in get_related_products(db_session, product, limit=2)] == [
+        best_seller.id, runner_up.id,
+    ]
+
+    db_session.add(ProductRecommendation(
+        product_id=product.id,
+        related_product_ids=[inactive.id, recommended.id],
+        scores=[0.9, 0.5],
+    ))
+    db_session.commit()
+    assert [p.id for p in get_related_products(db_session, product, limit=3)] == [
+        recommended.id, best_seller.id, runner_up.id,
+    ]
+
+
+def test_rebuild_from_co_purchases(db_session, normal_user, product_factory):
+    """Test the offline build ranks products by co-purchase similarity"""
+    pytest.importorskip("scipy")
+    from app.services.recommendations import rebuild_recommendations
+
+    bread, butter, jam, milk = (product_factory() for _ in range(4))
+    for _ in range(3):
+        _order(db_session, normal_user.id, [bread, butter, butter])
+    _order(db_session, normal_user.id, [bread, jam])
+    _order(db_session, normal_user.id, [bread, jam])
+    _order(db_session, normal_user.id, [bread, milk])
+    _order(db_session, normal_user.id, [milk, butter], status="cancelled")
+
+    assert rebuild_recommendations(db_session, top_k=5, min_co_purchases=2) == 3
+    recommendation = db_session.get(ProductRecommendation, bread.id)
+    assert recommendation.related_product_ids == [butter.id, jam.id]
+    assert recommendation.scores[0] == pytest.approx(3 / (6 * 3) ** 0.5, abs=1e-6)
+    assert db_session.get(ProductRecommendation, milk.id) is None
+
+    assert [p.id for p in get_related_products(db_session, bread, limit=2)] == [butter.id, jam.id]
@@ -0,0 +1,48 @@
+import uuid
+
+from app.crud.cart import add_item_to_cart, reorder_to_cart
+from app.models.order import Order, OrderItem
+from app.schemas.cart import CartItemCreate
+
+
+def _order_with_items(db_session, user_id, lines):
+    order = Order(
+        id=str(uuid.uuid4()), order_number=uuid.uuid4().hex, user_id=user_id,
+        status="delivered", subtotal=0.0, total_amount=0.0,
+    )
+    db_session.add(order)
+    for product, quantity in lines:
+        db_session.add(OrderItem(
+            id=str(uuid.uuid4()), order_id=order.id, product_id=product.id,
+            product_name=product.name, product_sku=product.sku, quantity=quantity,
+            unit_price=1.0, total_price=quantity * 1.0,
+        ))
+    db_session.commit()
+    return order
+
+
+def test_reorder_copies_lines_at_current_price_and_stock(db_session, normal_user, product_factory):
+    """Test reorder merges into the cart, caps at stock and skips unavailable products"""
+    in_cart = product_factory(price=3.0)
+    low_stock = product_factory(price=5.0, stock_quantity=2)
+    low_stock_in_cart = product_factory(price=2.0, stock_quantity=4)
+    sold_out = product_factory(stock_quantity=0)
+    order = _order_with_items(db_session, normal_user.id, [
+        (in_cart, 1), (in_cart, 1), (low_stock, 4), (low_stock_in_cart, 3), (sold_out, 1),
+    ])
+    add_item_to_cart(db_session, normal_user.id, CartItemCreate(product_id=in_cart.id, quantity=1))
+    add_item_to_cart(db_session, normal_user.id, CartItemCreate(product_id=low_stock_in_cart.id, quantity=2))
+    # The price changed since the line was added
+    low_stock_in_cart.price = 2.5
+    db_session.commit()
+
+    items, skipped = reorder_to_cart(db_session, normal_user.id, order.id)
+
+    lines = {item.product_id: item for item in items}
+    assert lines[in_cart.id].quantity == 3
+    assert lines[low_stock.id].quantity == 2
+    assert lines[low_stock.id].price_at_time == 5.0
+    assert len(lines[low_stock.id].id) == 36
+    assert lines[low_stock_in_cart.id].quantity == 4
+    assert lines[low_stock_in_cart.id].price_at_time == 2.5
+    assert skipped == [sold_out.id]
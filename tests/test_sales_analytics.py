@@ -0,0 +1,82 @@
+import uuid
+from datetime import timedelta
+
+import pytest
+
+from app.crud.analytics import (
+    get_sales_series, get_top_selling_products, rebuild_sales_rollups, summarize_sales
+)
+from app.crud.cart import add_item_to_cart
+from app.crud.order import create_order, update_order_status
+from app.models.outbox import OutboxEvent
+from app.schemas.cart import CartItemCreate
+from app.schemas.order import OrderCreate, OrderStatus
+from app.services.order_events import update_sales_rollups
+
+
+@pytest.fixture(autouse=True)
+def unique_order_numbers(monkeypatch):
+    # Order numbers have one-second resolution; these tests place several per second
+    monkeypatch.setattr("app.crud.order.generate_order_number", lambda: f"ORD-{uuid.uuid4().hex}")
+
+
+def _place_order(db_session, user, lines):
+    for product, quantity in lines:
+        add_item_to_cart(db_session, user.id, CartItemCreate(product_id=product.id, quantity=quantity))
+    return create_order(db_session, user.id, OrderCreate())
+
+
+def _consume_order_events(db_session):
+    events = db_session.query(OutboxEvent).filter(
+        OutboxEvent.processed_at.is_(None)
+    ).order_by(OutboxEvent.created_at).all()
+    update_sales_rollups(db_session, events)
+    for event in events:
+        db_session.delete(event)
+    db_session.commit()
+
+
+def _report(db_session, day):
+    series = get_sales_series(db_session, day, day)
+    return summarize_sales(series), get_top_selling_products(db_session, day, day)
+
+
+def test_rollups_follow_order_events_and_match_rebuild(db_session, normal_user, product_factory):
+    """Test order events keep the rollups equal to a full rebuild"""
+    apple, pear = product_factory(price=2.0), product_factory(price=5.0)
+    first = _place_order(db_session, normal_user, [(apple, 4), (pear, 1)])
+    second = _place_order(db_session, normal_user, [(pear, 2)])
+    _consume_order_events(db_session)
+
+    day = first.created_at.date()
+    totals, top = _report(db_session, day)
+    assert totals["order_count"] == 2
+    assert totals["items_sold"] == 7
+    assert totals["revenue"] == round(first.total_amount + second.total_amount, 2)
+    assert totals["average_order_value"] == round(totals["revenue"] / 2, 2)
+    assert [(p["product_id"], p["quantity"], p["revenue"]) for p in top] == [
+        (apple.id, 4, 8.0), (pear.id, 3, 15.0),
+    ]
+
+    update_order_status(db_session, second.id, OrderStatus.CANCELLED)
+    _consume_order_events(db_session)
+    totals, top = _report(db_session, day)
+    assert (totals["order_count"], totals["items_sold"]) == (1, 5)
+    assert [(p["product_id"], p["quantity"]) for p in top] == [(apple.id, 4), (pear.id, 1)]
+
+    assert rebuild_sales_rollups(db_session) == 1
+    assert _report(db_session, day) == (totals, top)
+
+
+def test_series_fills_empty_periods(db_session, normal_user, product_factory):
+    """Test days and hours without orders are reported as zero"""
+    order = _place_order(db_session, normal_user, [(product_factory(), 1)])
+    _consume_order_events(db_session)
+    day = order.created_at.date()
+
+    daily = get_sales_series(db_session, day - timedelta(days=2), day)
+    assert [point["order_count"] for point in daily] == [0, 0, 1]
+
+    hourly = get_sales_series(db_session, day, day, granularity="hour")
+    assert len(hourly) == 24
+    assert hourly[order.created_at.hour]["order_count"] == 1
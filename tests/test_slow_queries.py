@@ -0,0 +1,62 @@
+from sqlalchemy import create_engine, text
+
+from app.services.slow_queries import SlowQueryLog, normalize_sql, parameter_shape, request_scope
+
+
+def test_normalize_sql_collapses_literals_and_lists():
+    """Test statements differing only in values and list lengths normalize the same"""
+    first = normalize_sql("SELECT * FROM product\n WHERE price > 10 AND name = 'a''b' AND id IN (?, ?, ?)")
+    second = normalize_sql("SELECT * FROM product WHERE price > 2.5 AND name = 'x' AND id IN (?, ?)")
+    assert first == second == "SELECT * FROM product WHERE price > ? AND name = ? AND id IN (?, ...)"
+
+    assert normalize_sql(
+        'INSERT INTO "order" (id, total) VALUES (%(id_m0)s, %(total_m0)s), (%(id_m1)s, %(total_m1)s)'
+    ) == 'INSERT INTO "order" (id, total) VALUES (?, ...), ...'
+    # Identifiers ending in digits are left alone
+    assert normalize_sql("SELECT product_1.id FROM product AS product_1") == "SELECT product_1.id FROM product AS product_1"
+
+
+def test_parameter_shape_hides_values():
+    """Test only parameter types are kept"""
+    assert parameter_shape({"email": "a@b.c", "limit": 5}, False) == "{email: str, limit: int}"
+    assert parameter_shape(("x", None), False) == "(str, NoneType)"
+    assert parameter_shape([("x", 1), ("y", 2)], True) == "2 x (str, int)"
+
+
+def test_log_ranks_statements_and_explains(db_engine):
+    """Test slow statements are grouped by route, ranked by total time and explained on request"""
+    # A separate engine, so the listeners do not outlive the test
+    engine = create_engine(db_engine.url)
+    log = SlowQueryLog(threshold_ms=0, max_statements=2)
+    log.install(engine)
+
+    token = request_scope.set({"method": "GET", "path": "/api/v1/products/abc"})
+    try:
+        with engine.connect() as conn:
+            for product_id in ("a", "b", "c"):
+                conn.execute(text("SELECT id FROM product WHERE id = :id"), {"id": product_id})
+            conn.execute(text("SELECT count(*) FROM category"))
+            # A third distinct statement does not fit
+            conn.execute(text("SELECT count(*) FROM review"))
+    finally:
+        request_scope.reset(token)
+
+    log.record("SELECT id FROM product WHERE id = ?", ("d",), False, 1000.0, "thread:relay")
+    report = log.report()
+    assert (len(log), log.dropped) == (2, 1)
+    top = report[0]
+    assert top["statement"] == "SELECT id FROM product WHERE id = ?"
+    assert top["calls"] == 4
+    assert top["max_ms"] == 1000.0
+    assert top["parameters"] == "(str)"
+    assert top["routes"] == {"GET /api/v1/products/abc": 3, "thread:relay": 1}
+
+    assert log.explain() == 2
+    plan = log.report()[0]["plan"]
+    assert "product" in plan
+    # Already explained statements are skipped
+    assert log.explain() == 0
+
+    log.reset()
+    assert (len(log), log.dropped, log.report()) == (0, 0, [])
+    engine.dispose()
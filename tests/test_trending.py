@@ -0,0 +1,60 @@
+from datetime import datetime, timedelta
+
+from app.crud.product import get_trending_products
+from app.models.product import ProductSalesHourly
+from app.services.trending import TrendingEngine
+
+
+class Clock:
+    def __init__(self):
+        self.now = datetime(2026, 10, 19, 12, 30)
+
+    def __call__(self):
+        return self.now
+
+
+def test_windows_slide_hour_by_hour():
+    """Test sales leave the 24h window after a day and the 7d window after a week"""
+    clock = Clock()
+    engine = TrendingEngine(clock=clock)
+    engine.record_sales({"apple": 5, "pear": 1})
+    clock.now += timedelta(hours=3)
+    engine.record_sales({"pear": 2})
+    assert engine.top("24h", 5) == [("apple", 5), ("pear", 3)]
+
+    clock.now += timedelta(hours=22)
+    assert engine.top("24h", 5) == [("pear", 2)]
+    assert engine.top("7d", 5) == [("apple", 5), ("pear", 3)]
+
+    clock.now += timedelta(days=7)
+    assert engine.top("7d", 5) == []
+
+
+def test_sync_merges_workers(db_session):
+    """Test each worker's sales are persisted and reloaded by every worker"""
+    clock = Clock()
+    first, second = TrendingEngine(clock=clock), TrendingEngine(clock=clock)
+    first.record_sales({"apple": 2})
+    second.record_sales({"apple": 1, "pear": 4})
+
+    first.sync(db_session)
+    second.sync(db_session)
+    first.reload(db_session)
+    assert first.top("24h", 5) == second.top("24h", 5) == [("pear", 4), ("apple", 3)]
+    assert db_session.query(ProductSalesHourly).count() == 2
+
+    # Unsynced sales survive a reload
+    first.record_sales({"apple": 2})
+    first.reload(db_session)
+    assert first.top("24h", 1) == [("apple", 5)]
+
+
+def test_trending_products_skip_inactive(db_session, product_factory, monkeypatch):
+    """Test trending products are loaded in rank order without inactive ones"""
+    apple, pear, hidden = product_factory(), product_factory(), product_factory(is_active=False)
+    engine = TrendingEngine()
+    engine.record_sales({apple.id: 1, pear.id: 3, hidden.id: 9})
+    monkeypatch.setattr("app.crud.product.trending", engine)
+
+    products = get_trending_products(db_session, window="7d", limit=5)
+    assert [product.id for product in products] == [pear.id, apple.id]